@@ -1,16 +1,56 @@
 from django.contrib import admin, messages
-from django.shortcuts import render, redirect
-from django.urls import path
-from django.utils.html import format_html
-from django.http import HttpResponse
-from django.core.cache import cache
-
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+from django.http import HttpResponse, JsonResponse
+from django.core.exceptions import PermissionDenied
+from django.views.decorators.http import require_POST
+from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
+
+import json
 import uuid
 
-from .models import Category, Quiz, Question, Choice, Attempt, Answer
-from myapp.forms import ExcelUploadForm
-from myapp.utils.excel_importer import parse_excel, import_parsed_data
+from .models import Category, Quiz, Question, Choice, Attempt, Answer, ImportJob
+from myapp.forms import ExcelUploadForm, QuestionEditorForm
+from myapp.utils.excel_importer import iter_excel_rows, read_page, summarize_rows
+from myapp.utils.import_jobs import enqueue_import
 from myapp.utils.excel_template import generate_template
+from myapp.utils import search
+from myapp.utils.estimated_count import EstimatedCountPaginator
+from myapp.utils.question_editor import question_page, parse_choices, save_question
+
+
+PREVIEW_ROWS_PER_PAGE = 50
+SEARCH_RESULTS_LIMIT = 1000
+
+
+# =============================
+# LIST FILTERS
+# =============================
+
+class QuizFilter(admin.SimpleListFilter):
+    """
+    Filter by quiz without listing every quiz in the sidebar: only the
+    selected one is shown. Reached from the Questions / Attempts links on
+    the quiz changelist.
+    """
+    title = "quiz"
+    parameter_name = "quiz"
+
+    def lookups(self, request, model_admin):
+        quiz = Quiz.objects.filter(pk=self._quiz_id()).only("title").first()
+        return [(quiz.pk, quiz.title)] if quiz else []
+
+    def queryset(self, request, queryset):
+        quiz_id = self._quiz_id()
+        if quiz_id is not None:
+            return queryset.filter(quiz_id=quiz_id)
+        return queryset
+
+    def _quiz_id(self):
+        value = self.value()
+        return int(value) if value and value.isdigit() else None
 
 
 # =============================
@@ -22,11 +62,6 @@ class ChoiceInline(admin.TabularInline):
     extra = 4
 
 
-class QuestionInline(admin.StackedInline):
-    model = Question
-    extra = 1
-
-
 # =============================
 # CATEGORY ADMIN
 # =============================
@@ -44,7 +79,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Quiz)
 class QuizAdmin(admin.ModelAdmin):
-    list_display = ("title", "is_published", "time_limit", "excel_tools")
+    list_display = ("title", "is_published", "time_limit", "related_links", "excel_tools")
     list_filter = ("is_published",)
     search_fields = ("title",)
 
@@ -59,6 +94,8 @@ class QuizAdmin(admin.ModelAdmin):
                 "rules",
                 "difficulty_label",
                 "time_limit",
+                "pass_percentage",
+                "selection_mode",
             )
         }),
     )
@@ -74,6 +111,11 @@ class QuizAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.upload_excel),
                 name="quiz_upload_excel",
             ),
+            path(
+                "preview-excel/",
+                self.admin_site.admin_view(self.preview_excel),
+                name="quiz_preview_excel",
+            ),
             path(
                 "confirm-import/",
                 self.admin_site.admin_view(self.confirm_import),
@@ -84,9 +126,39 @@ class QuizAdmin(admin.ModelAdmin):
                 self.admin_site.admin_view(self.download_template),
                 name="quiz_download_template",
             ),
+            path(
+                "<int:pk>/questions/",
+                self.admin_site.admin_view(self.question_editor),
+                name="quiz_questions",
+            ),
+            path(
+                "<int:pk>/questions/page.json",
+                self.admin_site.admin_view(self.question_editor_page),
+                name="quiz_questions_page",
+            ),
+            path(
+                "<int:pk>/questions/save/",
+                self.admin_site.admin_view(require_POST(self.question_editor_save)),
+                name="quiz_questions_save",
+            ),
+            path(
+                "<int:pk>/questions/<int:question_id>/delete/",
+                self.admin_site.admin_view(require_POST(self.question_editor_delete)),
+                name="quiz_questions_delete",
+            ),
         ]
         return custom_urls + urls
 
+    def related_links(self, obj):
+        return format_html(
+            '<a href="{}">Edit questions</a> | <a href="{}?quiz={}">Questions</a> | '
+            '<a href="{}?quiz={}">Attempts</a>',
+            reverse("admin:quiz_questions", args=[obj.pk]),
+            reverse("admin:myapp_question_changelist"), obj.pk,
+            reverse("admin:myapp_attempt_changelist"), obj.pk,
+        )
+    related_links.short_description = "Related"
+
     # -----------------------------
     # EXCEL ACTION BUTTONS
     # -----------------------------
@@ -98,28 +170,34 @@ class QuizAdmin(admin.ModelAdmin):
     excel_tools.short_description = "Excel Tools"
 
     # =====================================================
-    # STEP 1 — UPLOAD & PREVIEW (CACHE-BASED)
+    # STEP 1 — UPLOAD (STAGED ON DISK)
     # =====================================================
     def upload_excel(self, request):
         if request.method == "POST":
             form = ExcelUploadForm(request.POST, request.FILES)
             if form.is_valid():
-                try:
-                    parsed_data = parse_excel(request.FILES["file"])
-
-                    cache_key = f"excel_preview_{uuid.uuid4()}"
-                    cache.set(cache_key, parsed_data, timeout=600)
+                upload = request.FILES["file"]
 
-                    request.session["excel_preview_key"] = cache_key
+                try:
+                    # One streaming pass: validates headers, keeps only counts
+                    summary = summarize_rows(iter_excel_rows(upload))
+                except Exception as e:
+                    messages.error(request, str(e))
+                else:
+                    self._discard_staged_upload(request)
 
-                    return render(
-                        request,
-                        "admin/excel_preview.html",
-                        {"data": parsed_data},
+                    # Stored once; preview and the import job read this file
+                    file_name = default_storage.save(
+                        f"imports/{uuid.uuid4()}.xlsx", upload
                     )
 
-                except Exception as e:
-                    messages.error(request, str(e))
+                    request.session["excel_upload"] = {
+                        "file": file_name,
+                        "name": upload.name,
+                        "summary": summary,
+                    }
+
+                    return redirect("admin:quiz_preview_excel")
         else:
             form = ExcelUploadForm()
 
@@ -129,34 +207,66 @@ class QuizAdmin(admin.ModelAdmin):
             {"form": form, "title": "Upload Quiz via Excel"},
         )
 
+    def _discard_staged_upload(self, request):
+        upload = request.session.pop("excel_upload", None)
+        if upload and default_storage.exists(upload["file"]):
+            default_storage.delete(upload["file"])
+
     # =====================================================
-    # STEP 2 — CONFIRM & IMPORT
+    # STEP 1b — PAGINATED PREVIEW
+    # =====================================================
+    def preview_excel(self, request):
+        upload = request.session.get("excel_upload")
+
+        if not upload or not default_storage.exists(upload["file"]):
+            messages.error(request, "Preview expired. Please upload again.")
+            return redirect("admin:quiz_upload_excel")
+
+        summary = upload["summary"]
+        paginator = Paginator(
+            range(summary["total_rows"]), PREVIEW_ROWS_PER_PAGE
+        )
+        page_obj = paginator.get_page(request.GET.get("page"))
+
+        with default_storage.open(upload["file"], "rb") as f:
+            rows = read_page(f, page_obj.number, PREVIEW_ROWS_PER_PAGE)
+
+        return render(request, "admin/excel_preview.html", {
+            **self.admin_site.each_context(request),
+            "title": "Preview Quiz Questions",
+            "file_name": upload["name"],
+            "summary": summary,
+            "rows": rows,
+            "page_obj": page_obj,
+        })
+
+    # =====================================================
+    # STEP 2 — CONFIRM & QUEUE IMPORT
     # =====================================================
     def confirm_import(self, request):
-        cache_key = request.session.get("excel_preview_key")
+        upload = request.session.get("excel_upload")
 
-        if not cache_key:
+        if request.method != "POST" or not upload:
             messages.error(request, "Preview expired. Please upload again.")
             return redirect("../")
 
-        parsed_data = cache.get(cache_key)
-
-        if not parsed_data:
+        if not default_storage.exists(upload["file"]):
             messages.error(request, "Preview data not found.")
             return redirect("../")
 
-        try:
-            import_parsed_data(parsed_data)
-
-            cache.delete(cache_key)
-            del request.session["excel_preview_key"]
+        # The import itself runs in the `run_import_jobs` worker
+        job = enqueue_import(
+            upload["file"],
+            user=request.user,
+            original_name=upload["name"],
+            total_rows=upload["summary"]["total_rows"],
+        )
 
-            messages.success(request, "Quiz imported successfully!")
+        del request.session["excel_upload"]
 
-        except Exception as e:
-            messages.error(request, f"Import failed: {e}")
+        messages.success(request, f"Import #{job.pk} queued.")
 
-        return redirect("../")
+        return redirect("admin:myapp_importjob_status", job.pk)
 
     # =====================================================
     # DOWNLOAD TEMPLATE
@@ -171,16 +281,160 @@ class QuizAdmin(admin.ModelAdmin):
         return response
 
 
+    # =====================================================
+    # QUESTION EDITOR (PAGED, ONE QUESTION PER SAVE)
+    # =====================================================
+    # Questions are fetched a page at a time and saved one at a time,
+    # so big quizzes never build a form with every question and choice.
+    def _editable_quiz(self, request, pk):
+        quiz = get_object_or_404(Quiz, pk=pk)
+        if not self.has_change_permission(request, quiz):
+            raise PermissionDenied
+        return quiz
+
+    def question_editor(self, request, pk):
+        quiz = self._editable_quiz(request, pk)
+
+        return render(request, "admin/question_editor.html", {
+            **self.admin_site.each_context(request),
+            "title": f"Questions: {quiz.title}",
+            "opts": self.model._meta,
+            "quiz": quiz,
+            "question_count": quiz.questions.count(),
+            "difficulty_choices": Question.DIFFICULTY_CHOICES,
+        })
+
+    def question_editor_page(self, request, pk):
+        quiz = self._editable_quiz(request, pk)
+        after = request.GET.get("after", "")
+
+        questions, next_after = question_page(
+            quiz.pk, int(after) if after.isdigit() else None
+        )
+
+        return JsonResponse({"questions": questions, "next_after": next_after})
+
+    def question_editor_save(self, request, pk):
+        quiz = self._editable_quiz(request, pk)
+
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            return JsonResponse({"errors": {"__all__": ["Invalid JSON"]}}, status=400)
+
+        question_id = payload.get("id")
+        if question_id is None:
+            question = Question(quiz=quiz)
+        elif isinstance(question_id, int):
+            question = get_object_or_404(Question, pk=question_id, quiz=quiz)
+        else:
+            return JsonResponse({"errors": {"id": ["Invalid question id"]}}, status=400)
+
+        form = QuestionEditorForm(payload, instance=question)
+        if not form.is_valid():
+            return JsonResponse({"errors": {
+                field: [e["message"] for e in errors]
+                for field, errors in form.errors.get_json_data().items()
+            }}, status=400)
+
+        try:
+            saved = save_question(form.save(commit=False), parse_choices(payload.get("choices")))
+        except ValueError as exc:
+            return JsonResponse({"errors": {"choices": [str(exc)]}}, status=400)
+
+        return JsonResponse({"question": saved})
+
+    def question_editor_delete(self, request, pk, question_id):
+        quiz = self._editable_quiz(request, pk)
+        get_object_or_404(Question, pk=question_id, quiz=quiz).delete()
+        return JsonResponse({"deleted": question_id})
+
+
 # =============================
 # QUESTION ADMIN
 # =============================
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ("text", "quiz", "difficulty", "marks")
-    list_filter = ("difficulty", "quiz")
+    list_display = (
+        "text", "quiz", "difficulty", "marks",
+        "responses", "difficulty_index", "discrimination_index",
+    )
+    list_filter = ("difficulty", QuizFilter)
+    list_select_related = ("quiz", "stats")
     search_fields = ("text",)
+    autocomplete_fields = ("quiz",)
+    readonly_fields = ("item_analysis",)
     inlines = [ChoiceInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # -----------------------------
+    # ITEM ANALYSIS (refresh_item_stats)
+    # -----------------------------
+    def _stat(self, obj, field, places=2):
+        stats = getattr(obj, "stats", None)
+        value = getattr(stats, field, None)
+        if value is None:
+            return "-"
+        return round(value, places) if isinstance(value, float) else value
+
+    def responses(self, obj):
+        return self._stat(obj, "responses")
+    responses.short_description = "Responses"
+    responses.admin_order_field = "stats__responses"
+
+    def difficulty_index(self, obj):
+        return self._stat(obj, "difficulty_index")
+    difficulty_index.short_description = "Difficulty (p)"
+    difficulty_index.admin_order_field = "stats__difficulty_index"
+
+    def discrimination_index(self, obj):
+        return self._stat(obj, "discrimination_index")
+    discrimination_index.short_description = "Discrimination (D)"
+    discrimination_index.admin_order_field = "stats__discrimination_index"
+
+    def item_analysis(self, obj):
+        stats = getattr(obj, "stats", None) if obj.pk else None
+        if stats is None or not stats.responses:
+            return "No answers analysed yet (run refresh_item_stats)."
+
+        rows = format_html_join(
+            "",
+            "<tr><td>{}</td><td>{}</td><td>{}</td><td>{}%</td></tr>",
+            (
+                (
+                    choice.text,
+                    "yes" if choice.is_correct else "",
+                    stats.choice_counts.get(str(choice.id), 0),
+                    round(100 * stats.choice_counts.get(str(choice.id), 0) / stats.responses, 1),
+                )
+                for choice in obj.choices.order_by("id")
+            ),
+        )
+
+        return format_html(
+            "<p>{} responses, difficulty p = {}, discrimination D = {}, "
+            "average marks {}</p>"
+            "<table><thead><tr><th>Choice</th><th>Correct</th><th>Selected</th>"
+            "<th>Share</th></tr></thead><tbody>{}</tbody></table>",
+            stats.responses,
+            self._stat(obj, "difficulty_index"),
+            self._stat(obj, "discrimination_index"),
+            self._stat(obj, "avg_marks"),
+            rows,
+        )
+    item_analysis.short_description = "Item analysis"
+
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text index instead of an icontains scan over every question
+        if search_term and search.is_available():
+            ids = search.search_question_ids(search_term, limit=SEARCH_RESULTS_LIMIT)
+            return queryset.filter(id__in=ids), False
+
+        return super().get_search_results(request, queryset, search_term)
 
 
 # =============================
@@ -191,17 +445,92 @@ class QuestionAdmin(admin.ModelAdmin):
 class ChoiceAdmin(admin.ModelAdmin):
     list_display = ("text", "question", "is_correct")
     list_filter = ("is_correct",)
+    list_select_related = ("question",)
     search_fields = ("text",)
+    raw_id_fields = ("question",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Attempt)
 class AttemptAdmin(admin.ModelAdmin):
     list_display = ("user", "quiz", "score", "total_marks", "completed_at")
-    list_filter = ("quiz",)
+    list_filter = (QuizFilter,)
+    list_select_related = ("user", "quiz")
     search_fields = ("user__username",)
+    raw_id_fields = ("user",)
+    autocomplete_fields = ("quiz",)
+    # Served by attempt_completed_idx
+    date_hierarchy = "completed_at"
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "__str__", "original_name", "status", "progress",
+        "failed_rows", "created_by", "created_at",
+    )
+    list_filter = ("status",)
+    list_select_related = ("created_by",)
+    readonly_fields = (
+        "file", "original_name", "status", "created_by",
+        "total_rows", "processed_rows", "failed_rows", "errors",
+        "created_at", "started_at", "finished_at", "heartbeat_at",
+    )
+
+    def has_add_permission(self, request):
+        # Jobs are created through Quiz > Upload Excel
+        return False
+
+    def progress(self, obj):
+        url = reverse("admin:myapp_importjob_status", args=[obj.pk])
+        return format_html('<a href="{}">{}%</a>', url, obj.progress_percent)
+    progress.short_description = "Progress"
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                "<int:pk>/status/",
+                self.admin_site.admin_view(self.job_status),
+                name="myapp_importjob_status",
+            ),
+            path(
+                "<int:pk>/status.json",
+                self.admin_site.admin_view(self.job_status_json),
+                name="myapp_importjob_status_json",
+            ),
+        ]
+        return custom_urls + urls
+
+    def job_status(self, request, pk):
+        job = get_object_or_404(ImportJob, pk=pk)
+        return render(request, "admin/import_job_status.html", {
+            **self.admin_site.each_context(request),
+            "title": f"Import #{job.pk}",
+            "job": job,
+        })
+
+    def job_status_json(self, request, pk):
+        job = get_object_or_404(ImportJob, pk=pk)
+        return JsonResponse({
+            "status": job.status,
+            "status_display": job.get_status_display(),
+            "total_rows": job.total_rows,
+            "processed_rows": job.processed_rows,
+            "failed_rows": job.failed_rows,
+            "progress": job.progress_percent,
+            "errors": job.errors,
+        })
 
 
 @admin.register(Answer)
 class AnswerAdmin(admin.ModelAdmin):
     list_display = ("attempt", "question", "is_correct", "marks_awarded")
     list_filter = ("is_correct",)
+    list_select_related = ("attempt__user", "attempt__quiz", "question")
+    raw_id_fields = ("attempt", "question", "selected_choice")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,217 @@
+"""
+Async variants of the read-heavy and quiz-submission views, served in
+place of their myapp.views counterparts when settings.ASYNC_VIEWS is on
+(the ASGI entry point sets it).
+
+Plain reads use the async ORM. Work that needs a transaction or row
+locks (grading, autosave merge) and the cache-backed helpers run through
+sync_to_async, as does template rendering: templates may still touch the
+session / request.user lazily, which is synchronous.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
+
+from .models import Quiz, Attempt, AttemptDraft
+from .utils import site_stats, catalogue, search
+from .utils.answer_key import get_answer_key
+from .utils.attempts import (
+    is_submission_late,
+    parse_draft_updates,
+    save_draft,
+    adraft_selections,
+)
+from .utils.cache_versions import get_version
+from .utils.grading import (
+    selections_from_post,
+    grade_submission,
+    complete_attempt,
+)
+from .utils.page_cache import cache_anonymous_page
+from .utils.results import arender_result_answers
+from .views import (
+    QUIZ_PAGE_SIZE,
+    SEARCH_RESULTS_LIMIT,
+    INDEX_CACHE_TIMEOUT,
+    CATALOGUE_CACHE_TIMEOUT,
+)
+
+arender = sync_to_async(render)
+
+
+# =========================
+# HOME PAGE
+# =========================
+
+@cache_anonymous_page(INDEX_CACHE_TIMEOUT, versions=("catalogue",))
+async def index(request):
+    stats = await sync_to_async(site_stats.get_site_stats)()
+
+    return await arender(request, "myapp/index.html", {
+        # Evaluated only when the cached fragment in index.html has expired
+        "latest_quizzes": Quiz.objects.filter(is_published=True).order_by("-created_at")[:6],
+        "catalogue_version": await sync_to_async(get_version)("catalogue"),
+        "total_quizzes": stats[site_stats.PUBLISHED_QUIZZES],
+        "total_users": stats[site_stats.ACTIVE_USERS],
+        "total_attempts": stats[site_stats.TOTAL_ATTEMPTS],
+    })
+
+
+# =========================
+# QUIZ LIST
+# =========================
+
+@cache_anonymous_page(CATALOGUE_CACHE_TIMEOUT, versions=("catalogue",))
+async def quiz_list(request):
+    query = request.GET.get("q", "").strip()
+    category_slug = request.GET.get("category", "").strip()
+
+    quizzes = Quiz.objects.filter(is_published=True)
+
+    categories = await sync_to_async(catalogue.category_question_counts)()
+    active_category = next(
+        (c for c in categories if c["slug"] == category_slug), None
+    )
+
+    if active_category:
+        quizzes = quizzes.filter(category_id=active_category["id"])
+    elif category_slug:
+        quizzes = quizzes.none()
+
+    if query:
+        categories = [c for c in categories if query.lower() in c["name"].lower()]
+
+    if query and search.is_available():
+        # Published / category filters run inside the search, before its limit
+        ranked_ids = await sync_to_async(search.search_quiz_ids)(
+            query, limit=SEARCH_RESULTS_LIMIT, quizzes=quizzes
+        )
+        by_id = await quizzes.ain_bulk(ranked_ids)
+        quizzes = [by_id[qid] for qid in ranked_ids if qid in by_id]
+        next_cursor = None
+    else:
+        if query:
+            quizzes = quizzes.filter(title__icontains=query)
+
+        quizzes, next_cursor = await catalogue.akeyset_page(
+            quizzes, request.GET.get("after"), QUIZ_PAGE_SIZE
+        )
+
+    return await arender(request, "myapp/quiz_list.html", {
+        "quizzes": quizzes,
+        "categories": categories,
+        "query": query,
+        "active_category": active_category,
+        "next_cursor": next_cursor,
+    })
+
+
+# =========================
+# QUIZ DETAIL
+# =========================
+
+@cache_anonymous_page(CATALOGUE_CACHE_TIMEOUT, versions=("quiz:{pk}",))
+async def quiz_detail(request, pk):
+    quiz = await aget_object_or_404(
+        Quiz.objects.select_related("stats"), pk=pk, is_published=True
+    )
+    return await arender(request, "myapp/quiz_detail.html", {
+        "quiz": quiz,
+        "stats": getattr(quiz, "stats", None),
+    })
+
+
+# =========================
+# AUTOSAVE / SUBMIT
+# =========================
+
+@login_required
+@require_POST
+async def autosave_attempt(request, pk, attempt_id):
+    attempt = await aget_object_or_404(
+        Attempt.objects.select_related("quiz"),
+        id=attempt_id,
+        user=await request.auser(),
+        quiz_id=pk,
+        adaptive_level__isnull=True,
+    )
+
+    if attempt.completed_at is not None or is_submission_late(attempt):
+        return JsonResponse({"error": "This attempt is closed."}, status=409)
+
+    try:
+        updates = parse_draft_updates(json.loads(request.body), attempt.question_ids)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    draft = await sync_to_async(save_draft)(attempt, updates)
+
+    return JsonResponse({
+        "saved": len(updates),
+        "answered": sum(1 for choice_ids in draft.selections.values() if choice_ids),
+        "saves": draft.saves,
+    })
+
+
+@login_required
+@require_POST
+async def submit_quiz(request, pk, attempt_id):
+    attempt = await aget_object_or_404(
+        Attempt.objects.select_related("quiz"),
+        id=attempt_id,
+        user=await request.auser(),
+        quiz_id=pk,
+        adaptive_level__isnull=True,
+    )
+
+    if attempt.completed_at is not None:
+        return redirect("myapp:result", pk=pk, attempt_id=attempt.id)
+
+    answer_key = await sync_to_async(get_answer_key)(attempt.quiz_id)
+    question_ids = [qid for qid in attempt.question_ids if qid in answer_key]
+
+    if is_submission_late(attempt):
+        selections = await adraft_selections(attempt)
+        messages.warning(
+            request,
+            "Time limit exceeded. Only answers saved before the deadline were counted.",
+        )
+    elif request.POST.get("from_draft"):
+        selections = await adraft_selections(attempt)
+    else:
+        selections = selections_from_post(request.POST, question_ids)
+
+    results, score = grade_submission(answer_key, question_ids, selections)
+
+    if await sync_to_async(complete_attempt)(attempt, results, score):
+        await AttemptDraft.objects.filter(attempt=attempt).adelete()
+
+    return redirect(
+        "myapp:result",
+        pk=pk,
+        attempt_id=attempt.id,
+    )
+
+
+# =========================
+# RESULT
+# =========================
+
+@login_required
+async def result(request, pk, attempt_id):
+    attempt = await aget_object_or_404(
+        Attempt.objects.select_related("quiz"),
+        id=attempt_id,
+        user=await request.auser(),
+        quiz_id=pk
+    )
+
+    return await arender(request, "myapp/result.html", {
+        "attempt": attempt,
+        "answers_html": await arender_result_answers(attempt),
+    })
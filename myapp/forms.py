@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from django.contrib.auth import get_user_model
 
+from .models import Question
+
 
 class SignUpForm(forms.ModelForm):
     """
@@ -105,4 +107,13 @@ class ProfileUpdateForm(forms.ModelForm):
         email = self.cleaned_data.get("email")
         if User.objects.exclude(pk=self.instance.pk).filter(email=email).exists():
             raise forms.ValidationError("This email is already in use.")
-        return email
\ No newline at end of file
+        return email
+
+class QuestionEditorForm(forms.ModelForm):
+    """
+    Question fields of the admin question editor (choices are validated
+    separately, see utils.question_editor.parse_choices).
+    """
+    class Meta:
+        model = Question
+        fields = ["text", "marks", "difficulty"]
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.utils.user_stats import backfill, find_mismatches
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user stats from Attempt, or verify the stored rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only compare stored stats with fresh aggregates",
+        )
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            mismatches = find_mismatches()
+
+            for user_id, field, stored, expected in mismatches[:50]:
+                self.stdout.write(
+                    f"user {user_id}: {field} stored={stored} expected={expected}"
+                )
+
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} mismatched value(s)")
+
+            self.stdout.write(self.style.SUCCESS("User stats are consistent"))
+            return
+
+        count = backfill()
+        self.stdout.write(self.style.SUCCESS(f"Backfilled stats for {count} user(s)"))
@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.utils import benchmark
+
+SERVERS = ("wsgi", "asgi")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent-request throughput of the WSGI deployment (sync "
+        "views) with the ASGI deployment (myapp.async_views)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--requests", type=int, default=200,
+                            help="Requests per view")
+        parser.add_argument("--only", nargs="+",
+                            help="Benchmark only these views")
+        parser.add_argument("--server", choices=SERVERS,
+                            help="Run one side in this process and print JSON "
+                                 "(used internally)")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2 * options["concurrency"]:
+            raise CommandError("--requests must be at least twice --concurrency")
+
+        if options["server"]:
+            self.stdout.write(json.dumps(self._run_server(options)))
+            return
+
+        # ASYNC_VIEWS is read when the URLConf is imported, so each
+        # deployment gets a fresh interpreter, like a real server
+        results = {server: self._spawn(server, options) for server in SERVERS}
+
+        self.stdout.write(
+            f"{'view':<14}{'wsgi rps':>10}{'asgi rps':>10}{'ratio':>8}"
+            f"{'wsgi p95':>10}{'asgi p95':>10}"
+        )
+        for name, wsgi in results["wsgi"].items():
+            asgi = results["asgi"][name]
+            self.stdout.write(
+                f"{name:<14}{wsgi['rps']:>10.1f}{asgi['rps']:>10.1f}"
+                f"{asgi['rps'] / wsgi['rps']:>7.2f}x"
+                f"{wsgi['p95_ms']:>10.2f}{asgi['p95_ms']:>10.2f}"
+            )
+
+    def _spawn(self, server, options):
+        command = [
+            sys.executable, "-m", "django", "benchmark_servers",
+            "--server", server,
+            "--concurrency", str(options["concurrency"]),
+            "--requests", str(options["requests"]),
+        ]
+        if options["only"]:
+            command += ["--only", *options["only"]]
+
+        env = dict(os.environ, DJANGO_ASYNC_VIEWS="1" if server == "asgi" else "0")
+
+        self.stderr.write(f"Running {server.upper()} side...")
+        done = subprocess.run(
+            command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+
+        if done.returncode:
+            raise CommandError(f"{server} benchmark failed:\n{done.stderr}")
+
+        return json.loads(done.stdout.strip().splitlines()[-1])
+
+    def _run_server(self, options):
+        expected = options["server"] == "asgi"
+        if settings.ASYNC_VIEWS != expected:
+            raise CommandError(
+                f"--server {options['server']} needs DJANGO_ASYNC_VIEWS={int(expected)}"
+            )
+
+        attempt = benchmark.pick_attempt()
+        if attempt is None:
+            raise CommandError(
+                "No completed attempts to benchmark with; run seed_load_data first"
+            )
+
+        run = (
+            benchmark.run_asgi_throughput if expected
+            else benchmark.run_wsgi_throughput
+        )
+
+        return {
+            name: run(attempt.user, path, options["concurrency"], options["requests"])
+            for name, path in benchmark.throughput_paths(attempt).items()
+            if not options["only"] or name in options["only"]
+        }
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.utils import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the main views through the test client and report latency "
+        "percentiles and query counts, optionally against a JSON baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument(
+            "--only",
+            nargs="+",
+            help="Benchmark only these views (e.g. index result)",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Compare with this baseline file and fail on regressions",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            help="Write the results to this baseline file",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed p95 slowdown against the baseline (0.25 = 25%%)",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 2:
+            raise CommandError("--iterations must be at least 2")
+
+        results = benchmark.run(
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            only=options["only"],
+        )
+
+        if results is None:
+            raise CommandError(
+                "No completed attempts to benchmark with; run seed_load_data first"
+            )
+
+        self.stdout.write(
+            f"{'view':<16}{'p50':>9}{'p95':>9}{'p99':>9}{'mean':>9}{'queries':>9}"
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f"{name:<16}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['p99_ms']:>9.2f}{row['mean_ms']:>9.2f}{row['queries']:>9}"
+            )
+
+        if options["save_baseline"]:
+            benchmark.save_baseline(options["save_baseline"], results, options["iterations"])
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+
+        if options["baseline"]:
+            regressions = benchmark.compare(
+                results,
+                benchmark.load_baseline(options["baseline"]),
+                options["tolerance"],
+            )
+
+            for name, message in regressions:
+                self.stdout.write(self.style.ERROR(f"REGRESSION  {name}: {message}"))
+
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against the baseline")
+
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from myapp.utils.excel_importer import (
+    IMPORT_BATCH_SIZE,
+    iter_excel_rows,
+    import_rows,
+)
+
+
+class Command(BaseCommand):
+    help = "Stream a quiz Excel sheet into the database in bulk batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path to the .xlsx file")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Rows written per bulk INSERT",
+        )
+
+    def handle(self, *args, **options):
+        def progress(report):
+            self.stdout.write(f"  {report}")
+
+        try:
+            with transaction.atomic():
+                report = import_rows(
+                    iter_excel_rows(options["path"]),
+                    batch_size=options["batch_size"],
+                    on_progress=progress,
+                )
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Import failed: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {report}"))
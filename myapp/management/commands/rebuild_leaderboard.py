@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Min, OuterRef, Q, Subquery, Sum
+
+from myapp.models import Attempt, LeaderboardEntry
+from myapp.utils.leaderboard import invalidate_all
+
+
+class Command(BaseCommand):
+    help = "Rebuild the leaderboard summary table from completed attempts"
+
+    def handle(self, *args, **options):
+        per_quiz = (
+            Attempt.objects
+            .filter(completed_at__isnull=False)
+            .values("user_id", "quiz_id")
+            .annotate(
+                best_score=Max("score"),
+                attempt_count=Count("id"),
+                last_completed=Max("completed_at"),
+            )
+            .order_by()
+        )
+
+        # Like record_attempt: best_at is when the best score was first
+        # reached, so later ties rank behind
+        first_best_at = (
+            Attempt.objects
+            .filter(
+                user_id=OuterRef("user_id"),
+                quiz_id=OuterRef("quiz_id"),
+                score=OuterRef("best_score"),
+                completed_at__isnull=False,
+            )
+            .order_by("completed_at")
+            .values("completed_at")[:1]
+        )
+
+        with transaction.atomic():
+            LeaderboardEntry.objects.all().delete()
+
+            LeaderboardEntry.objects.bulk_create(
+                (LeaderboardEntry(**row) for row in per_quiz.iterator()),
+                batch_size=1000,
+            )
+            LeaderboardEntry.objects.update(best_at=Subquery(first_best_at))
+
+            # The global row's best_at moves whenever a per-quiz best
+            # improves. With nothing gained (all zero) it stays at the
+            # first attempt, the earliest zero-score per-quiz best_at.
+            overall = (
+                LeaderboardEntry.objects
+                .values("user_id")
+                .annotate(
+                    total_best=Sum("best_score"),
+                    improved_at=Max("best_at", filter=Q(best_score__gt=0)),
+                    first_at=Min("best_at"),
+                    attempts=Sum("attempt_count"),
+                    last_attempt=Max("last_completed"),
+                )
+                .order_by()
+            )
+
+            LeaderboardEntry.objects.bulk_create(
+                (
+                    LeaderboardEntry(
+                        user_id=row["user_id"],
+                        quiz=None,
+                        best_score=row["total_best"],
+                        best_at=row["improved_at"] or row["first_at"],
+                        attempt_count=row["attempts"],
+                        last_completed=row["last_attempt"],
+                    )
+                    for row in overall.iterator()
+                ),
+                batch_size=1000,
+            )
+
+        invalidate_all()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Leaderboard rebuilt: {LeaderboardEntry.objects.count()} entries"
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from myapp.utils.quiz_stats import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-quiz summary rows (QuizStats) from Attempt and Question"
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {count} quiz(zes)"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from myapp.utils import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over quizzes and questions"
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError("Full-text search needs SQLite (FTS5) or PostgreSQL")
+
+        with transaction.atomic():
+            count = search.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} document(s)"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from myapp.utils.item_analysis import ANALYSIS_CHUNK_SIZE, refresh
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold answers recorded since the last run into the per-question item "
+        "analysis (QuestionStats). Answers from the last few minutes wait for "
+        "the next run. Run it periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Discard the stored stats and analyse every answer again",
+        )
+        parser.add_argument("--chunk-size", type=int, default=ANALYSIS_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        processed = refresh(
+            full=options["full"],
+            chunk_size=options["chunk_size"],
+            on_progress=lambda n: self.stderr.write(f"{n} answers analysed..."),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Analysed {processed} new answer(s)"))
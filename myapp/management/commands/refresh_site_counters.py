@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from myapp.utils.site_stats import refresh_all, get_site_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute homepage counters from the source tables"
+
+    def handle(self, *args, **options):
+        refresh_all()
+
+        for name, value in get_site_stats().items():
+            self.stdout.write(f"{name}: {value}")
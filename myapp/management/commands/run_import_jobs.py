@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapp.utils.import_jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Background worker that processes queued Excel import jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the current queue and exit",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_pending_jobs()
+
+            if count:
+                self.stdout.write(f"Processed {count} import job(s)")
+
+            if options["once"]:
+                return
+
+            time.sleep(options["interval"])
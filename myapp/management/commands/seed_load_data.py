@@ -0,0 +1,58 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from myapp.utils import search, quiz_stats
+from myapp.utils.cache_versions import bump_version
+from myapp.utils.load_data import seed
+from myapp.utils.site_stats import refresh_all
+from myapp.utils.user_stats import backfill
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk insert a synthetic dataset (categories, quizzes, questions, "
+        "choices, users, completed attempts and answers) for load testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--quizzes", type=int, default=100)
+        parser.add_argument("--questions", type=int, default=200,
+                            help="Questions per quiz")
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--attempts", type=int, default=5,
+                            help="Completed attempts per user")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=None,
+                            help="Random seed for a reproducible dataset")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        counts = seed(
+            categories=options["categories"],
+            quizzes=options["quizzes"],
+            questions_per_quiz=options["questions"],
+            users=options["users"],
+            attempts_per_user=options["attempts"],
+            batch_size=options["batch_size"],
+            seed=options["seed"],
+        )
+
+        for name, value in counts.items():
+            self.stdout.write(f"{name}: {value}")
+
+        # Bulk inserts skip the signals that keep these in sync
+        self.stdout.write("Rebuilding summary tables, counters and search index...")
+        call_command("rebuild_leaderboard", stdout=self.stdout)
+        backfill()
+        quiz_stats.rebuild()
+        refresh_all()
+        search.rebuild()
+        bump_version("catalogue")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded in {time.perf_counter() - start:.1f}s"
+        ))
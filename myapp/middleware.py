@@ -0,0 +1,176 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import Template
+
+from myapp.utils.metrics import record_request
+
+logger = logging.getLogger("myapp.requests")
+
+# Per-request accumulator, set by the middleware (None outside a request)
+_current = ContextVar("myapp_request_metrics", default=None)
+
+
+class _RequestMetrics:
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.statements = Counter()
+
+    # connection.execute_wrapper hook
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.queries += 1
+            self.statements[sql] += 1
+
+
+# ------------------------------------------------
+# QUERY TIMING
+# ------------------------------------------------
+# One permanent wrapper per connection that reports to whichever request
+# is current. ContextVars follow sync_to_async into the ORM's thread, so
+# async views are attributed correctly too.
+def _dispatch(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def _install(connection):
+    if _dispatch not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_dispatch)
+
+
+@receiver(connection_created)
+def _on_connection_created(sender, connection, **kwargs):
+    _install(connection)
+
+
+# ------------------------------------------------
+# TEMPLATE TIMING
+# ------------------------------------------------
+# The backend Template.render() runs once per render() / TemplateResponse;
+# {% include %} / {% extends %} stay inside it, so nothing is counted twice.
+_original_render = Template.render
+
+
+def _timed_render(self, context=None, request=None):
+    metrics = _current.get()
+    if metrics is None:
+        return _original_render(self, context, request)
+
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        metrics.template_seconds += time.perf_counter() - start
+
+
+Template.render = _timed_render
+
+
+# ------------------------------------------------
+# MIDDLEWARE
+# ------------------------------------------------
+class RequestMetricsMiddleware:
+    """
+    Records query count, DB time, template time and total latency per view.
+    Adds a Server-Timing header, feeds the histograms served by the metrics
+    view and logs slow requests with their most repeated SQL (N+1 hints).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "REQUEST_METRICS_SLOW_MS", 500)
+        self.top_sql = getattr(settings, "REQUEST_METRICS_TOP_SQL", 5)
+        self.server_timing = getattr(settings, "REQUEST_METRICS_SERVER_TIMING", True)
+
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        # Connections opened before this module was imported
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+
+        metrics = _RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        return self._finish(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        metrics = _RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        return self._finish(request, response, metrics, start)
+
+    def _finish(self, request, response, metrics, start):
+        total = time.perf_counter() - start
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "<unresolved>"
+
+        record_request(
+            view, total, metrics.db_seconds, metrics.template_seconds, metrics.queries,
+        )
+
+        if self.server_timing:
+            response["Server-Timing"] = (
+                f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.queries} queries", '
+                f"tpl;dur={metrics.template_seconds * 1000:.1f}, "
+                f"total;dur={total * 1000:.1f}"
+            )
+
+        if self.slow_ms is not None and total * 1000 >= self.slow_ms:
+            self._log_slow(request, view, total, metrics)
+
+        return response
+
+    def _log_slow(self, request, view, total, metrics):
+        repeated = [
+            (count, sql) for sql, count in metrics.statements.most_common(self.top_sql)
+            if count > 1
+        ]
+
+        lines = [
+            f"Slow request {request.method} {request.path} ({view}): "
+            f"{total * 1000:.0f}ms total, {metrics.queries} queries in "
+            f"{metrics.db_seconds * 1000:.0f}ms, templates "
+            f"{metrics.template_seconds * 1000:.0f}ms"
+        ]
+        lines += [f"  {count}x {sql[:300]}" for count, sql in repeated]
+
+        logger.warning("\n".join(lines))
+
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_quiz_difficulty_label_quiz_overview_quiz_rules_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attempt',
+            name='question_ids',
+            field=models.JSONField(blank=True, default=list, help_text='Ordered IDs of the questions sampled when the attempt started'),
+        ),
+    ]
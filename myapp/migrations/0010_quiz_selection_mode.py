@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_attempt_question_ids'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='selection_mode',
+            field=models.CharField(choices=[('random', 'Random'), ('stratified', 'Stratified by difficulty')], default='random', help_text='How questions are sampled for each attempt', max_length=20),
+        ),
+    ]
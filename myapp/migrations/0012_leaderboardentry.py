@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_importjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('best_score', models.FloatField(default=0)),
+                ('best_at', models.DateTimeField(blank=True, null=True)),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('last_completed', models.DateTimeField(blank=True, null=True)),
+                ('quiz', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='myapp.quiz')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['quiz', '-best_score', 'best_at'], name='leaderboard_rank_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'quiz'), name='unique_leaderboard_user_quiz'), models.UniqueConstraint(condition=models.Q(('quiz__isnull', True)), fields=('user',), name='unique_leaderboard_user_global')],
+            },
+        ),
+    ]
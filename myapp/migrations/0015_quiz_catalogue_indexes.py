@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_sitecounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['is_published', '-created_at', '-id'], name='quiz_published_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['category', 'is_published', '-created_at', '-id'], name='quiz_category_published_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS myapp_search_fts USING fts5("
+            "title, body, quiz_id UNINDEXED, tokenize='porter unicode61')"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS myapp_search_document ("
+            "id bigint PRIMARY KEY, quiz_id bigint NOT NULL, document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS myapp_search_document_gin "
+            "ON myapp_search_document USING gin (document)"
+        )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS myapp_search_fts")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP TABLE IF EXISTS myapp_search_document")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_quiz_catalogue_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0016_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='quiz',
+            name='quiz_published_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='quiz',
+            name='quiz_category_published_idx',
+        ),
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(condition=models.Q(('completed_at__isnull', True)), fields=['user', 'quiz', '-started_at'], name='attempt_in_progress_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(condition=models.Q(('completed_at__isnull', False)), fields=['user', '-completed_at'], name='attempt_user_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(fields=['-completed_at'], name='attempt_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='choice',
+            index=models.Index(condition=models.Q(('is_correct', True)), fields=['question'], name='choice_correct_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['quiz', 'difficulty'], name='question_quiz_difficulty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-created_at', '-id'], name='quiz_published_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['category', '-created_at', '-id'], name='quiz_category_published_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0017_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attempt',
+            name='attempt_user_completed_idx',
+        ),
+        migrations.AddIndex(
+            model_name='attempt',
+            index=models.Index(condition=models.Q(('completed_at__isnull', False)), fields=['user', '-completed_at', '-id'], name='attempt_user_completed_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0018_attempt_history_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='selected_choice_ids',
+            field=models.JSONField(blank=True, default=list, help_text='IDs of every choice the user selected (multi-select safe)'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0019_answer_selected_choice_ids'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttemptDraft',
+            fields=[
+                ('attempt', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='draft', serialize=False, to='myapp.attempt')),
+                ('selections', models.JSONField(blank=True, default=dict)),
+                ('saves', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0020_attemptdraft'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='myapp.question')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('marks_total', models.FloatField(default=0)),
+                ('upper_responses', models.PositiveIntegerField(default=0)),
+                ('upper_correct', models.PositiveIntegerField(default=0)),
+                ('lower_responses', models.PositiveIntegerField(default=0)),
+                ('lower_correct', models.PositiveIntegerField(default=0)),
+                ('choice_counts', models.JSONField(blank=True, default=dict)),
+                ('difficulty_index', models.FloatField(blank=True, null=True)),
+                ('discrimination_index', models.FloatField(blank=True, null=True)),
+                ('avg_marks', models.FloatField(blank=True, null=True)),
+                ('last_answer_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Question stats',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:04
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0021_questionstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizStats',
+            fields=[
+                ('quiz', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='myapp.quiz')),
+                ('attempt_count', models.PositiveIntegerField(default=0)),
+                ('score_total', models.FloatField(default=0)),
+                ('duration_total', models.FloatField(default=0, help_text='Seconds')),
+                ('score_histogram', models.JSONField(blank=True, default=list)),
+                ('question_counts', models.JSONField(blank=True, default=dict)),
+            ],
+            options={
+                'verbose_name_plural': 'Quiz stats',
+            },
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='pass_percentage',
+            field=models.PositiveSmallIntegerField(default=50, help_text='Minimum score (% of total marks) that counts as a pass', validators=[django.core.validators.MaxValueValidator(100)]),
+        ),
+    ]
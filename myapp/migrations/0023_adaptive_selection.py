@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0022_quiz_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attempt',
+            name='adaptive_level',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='quiz',
+            name='selection_mode',
+            field=models.CharField(choices=[('random', 'Random'), ('stratified', 'Stratified by difficulty'), ('adaptive', 'Adaptive (difficulty follows performance)')], default='random', help_text='How questions are sampled for each attempt', max_length=20),
+        ),
+    ]
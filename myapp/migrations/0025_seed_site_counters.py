@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+def seed_counters(apps, schema_editor):
+    """
+    Counters are only ever incremented after this point, so start them
+    from the existing rows
+    """
+    Attempt = apps.get_model("myapp", "Attempt")
+    Quiz = apps.get_model("myapp", "Quiz")
+    SiteCounter = apps.get_model("myapp", "SiteCounter")
+
+    completed = Attempt.objects.filter(completed_at__isnull=False)
+    values = {
+        "published_quizzes": Quiz.objects.filter(is_published=True).count(),
+        "active_users": completed.values("user_id").distinct().count(),
+        "total_attempts": completed.count(),
+    }
+
+    for name, value in values.items():
+        SiteCounter.objects.update_or_create(name=name, defaults={"value": value})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0024_import_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
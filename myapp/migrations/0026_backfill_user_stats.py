@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import Count, Max, Sum
+
+
+def backfill_user_stats(apps, schema_editor):
+    """
+    Rows are otherwise created by a user's next completed attempt, so
+    existing users would show empty profiles until then
+    """
+    Attempt = apps.get_model("myapp", "Attempt")
+    UserStats = apps.get_model("myapp", "UserStats")
+
+    rows = (
+        Attempt.objects
+        .filter(completed_at__isnull=False)
+        .values("user_id")
+        .annotate(
+            total_attempts=Count("id"),
+            total_score=Sum("score"),
+            best_score=Max("score"),
+            last_attempt_at=Max("completed_at"),
+        )
+        .order_by()
+    )
+
+    UserStats.objects.bulk_create(
+        [UserStats(**row) for row in rows.iterator()],
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["total_attempts", "total_score", "best_score", "last_attempt_at"],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0025_seed_site_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
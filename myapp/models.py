@@ -1,3 +1,6 @@
+from datetime import timedelta
+
+from django.core.validators import MaxValueValidator
 from django.db import models
 from django.contrib.auth import get_user_model
 
@@ -24,6 +27,13 @@ class Category(models.Model):
 # =====================
 
 class Quiz(models.Model):
+
+    SELECTION_MODE_CHOICES = [
+        ('random', 'Random'),
+        ('stratified', 'Stratified by difficulty'),
+        ('adaptive', 'Adaptive (difficulty follows performance)'),
+    ]
+
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
 
@@ -57,9 +67,39 @@ class Quiz(models.Model):
     )
 
     time_limit = models.PositiveIntegerField(default=20)
+
+    pass_percentage = models.PositiveSmallIntegerField(
+        default=50,
+        validators=[MaxValueValidator(100)],
+        help_text="Minimum score (% of total marks) that counts as a pass"
+    )
+
+    selection_mode = models.CharField(
+        max_length=20,
+        choices=SELECTION_MODE_CHOICES,
+        default='random',
+        help_text="How questions are sampled for each attempt"
+    )
+
     is_published = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Partial on is_published: Django emits filter(is_published=True)
+        # as a bare boolean, which SQLite won't match to an indexed column.
+        indexes = [
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_published=True),
+                name="quiz_published_created_idx",
+            ),
+            models.Index(
+                fields=["category", "-created_at", "-id"],
+                condition=models.Q(is_published=True),
+                name="quiz_category_published_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -88,9 +128,71 @@ class Question(models.Model):
         default='easy'
     )
 
+    class Meta:
+        indexes = [
+            # Question pools / per-difficulty counts: (quiz, difficulty) -> id
+            models.Index(
+                fields=["quiz", "difficulty"],
+                name="question_quiz_difficulty_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.text[:60]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What this row is counted under in QuizStats.question_counts;
+        # saves that keep it skip the recount (signals.question_saved_counts)
+        loaded = dict(zip(field_names, values))
+        instance._counted_as = (loaded.get("quiz_id"), loaded.get("difficulty"))
+        return instance
+
+
+# =====================
+# QUESTION STATS (ITEM ANALYSIS)
+# =====================
+
+class QuestionStats(models.Model):
+    """
+    Item analysis per question, accumulated from Answer in batches by
+    utils.item_analysis (refresh_item_stats command). The *_index /
+    avg_marks columns are derived from the counts on every refresh.
+    """
+    question = models.OneToOneField(
+        Question,
+        primary_key=True,
+        related_name="stats",
+        on_delete=models.CASCADE
+    )
+    responses = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    marks_total = models.FloatField(default=0)
+
+    # Answers from attempts in the quiz's top / bottom 27% by score
+    upper_responses = models.PositiveIntegerField(default=0)
+    upper_correct = models.PositiveIntegerField(default=0)
+    lower_responses = models.PositiveIntegerField(default=0)
+    lower_correct = models.PositiveIntegerField(default=0)
+
+    # {"<choice_id>": times selected}
+    choice_counts = models.JSONField(default=dict, blank=True)
+
+    difficulty_index = models.FloatField(null=True, blank=True)
+    discrimination_index = models.FloatField(null=True, blank=True)
+    avg_marks = models.FloatField(null=True, blank=True)
+
+    # Highest Answer.id included (incremental refresh watermark)
+    last_answer_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Question stats"
+
+    def __str__(self):
+        return f"Stats for question {self.question_id}"
+
 
 # =====================
 # CHOICE
@@ -105,6 +207,16 @@ class Choice(models.Model):
     text = models.CharField(max_length=300)
     is_correct = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Answer key: correct choices only (~1 in 4 rows)
+            models.Index(
+                fields=["question"],
+                condition=models.Q(is_correct=True),
+                name="choice_correct_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.text
 
@@ -129,9 +241,67 @@ class Attempt(models.Model):
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    question_ids = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Ordered IDs of the questions sampled when the attempt started"
+    )
+
+    # Adaptive quizzes: index into utils.adaptive.LEVELS of the current question's
+    # difficulty; question_ids grows one question per answer. NULL otherwise.
+    adaptive_level = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Resume: the user's in-progress attempt for a quiz
+            models.Index(
+                fields=["user", "quiz", "-started_at"],
+                condition=models.Q(completed_at__isnull=True),
+                name="attempt_in_progress_idx",
+            ),
+            # Profile / score history: the user's completed attempts, newest first
+            models.Index(
+                fields=["user", "-completed_at", "-id"],
+                condition=models.Q(completed_at__isnull=False),
+                name="attempt_user_completed_idx",
+            ),
+            # Admin date hierarchy / site-wide recent activity
+            models.Index(
+                fields=["-completed_at"],
+                name="attempt_completed_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.quiz} - {self.score}"
 
+    @property
+    def deadline(self):
+        return self.started_at + timedelta(minutes=self.quiz.time_limit)
+
+
+# =====================
+# ATTEMPT DRAFT (AUTOSAVE)
+# =====================
+
+class AttemptDraft(models.Model):
+    """
+    Selections autosaved while an attempt is in progress, one row per
+    attempt: {"<question_id>": [choice_id, ...]}
+    """
+    attempt = models.OneToOneField(
+        Attempt,
+        primary_key=True,
+        related_name="draft",
+        on_delete=models.CASCADE
+    )
+    selections = models.JSONField(default=dict, blank=True)
+    saves = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Draft for attempt {self.attempt_id}"
+
 
 # =====================
 # ANSWER
@@ -153,5 +323,225 @@ class Answer(models.Model):
         blank=True,
         on_delete=models.SET_NULL
     )
+    selected_choice_ids = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="IDs of every choice the user selected (multi-select safe)"
+    )
     is_correct = models.BooleanField(default=False)
     marks_awarded = models.FloatField(default=0)
+
+
+# =====================
+# LEADERBOARD
+# =====================
+
+class LeaderboardEntry(models.Model):
+    """
+    One row per (user, quiz), updated when an attempt completes.
+    quiz = NULL holds the user's global row (sum of per-quiz best scores).
+    """
+    user = models.ForeignKey(
+        User,
+        related_name="leaderboard_entries",
+        on_delete=models.CASCADE
+    )
+    quiz = models.ForeignKey(
+        Quiz,
+        related_name="leaderboard_entries",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+    best_score = models.FloatField(default=0)
+    best_at = models.DateTimeField(null=True, blank=True)
+    attempt_count = models.PositiveIntegerField(default=0)
+    last_completed = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "quiz"],
+                name="unique_leaderboard_user_quiz",
+            ),
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(quiz__isnull=True),
+                name="unique_leaderboard_user_global",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["quiz", "-best_score", "best_at"],
+                name="leaderboard_rank_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.quiz or 'Global'} - {self.best_score}"
+
+
+# =====================
+# USER STATS
+# =====================
+
+class UserStats(models.Model):
+    """
+    Running totals per user, updated when an attempt completes
+    """
+    user = models.OneToOneField(
+        User,
+        related_name="quiz_stats",
+        on_delete=models.CASCADE
+    )
+    total_attempts = models.PositiveIntegerField(default=0)
+    total_score = models.FloatField(default=0)
+    best_score = models.FloatField(default=0)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "User stats"
+
+    def __str__(self):
+        return f"{self.user} - {self.total_attempts} attempts"
+
+    @property
+    def avg_score(self):
+        if not self.total_attempts:
+            return 0
+        return self.total_score / self.total_attempts
+
+
+# =====================
+# QUIZ STATS
+# =====================
+
+class QuizStats(models.Model):
+    """
+    Per-quiz aggregates shown on the quiz page, updated when an attempt
+    completes (utils.quiz_stats). Scores are percentages of total marks.
+    """
+    quiz = models.OneToOneField(
+        Quiz,
+        primary_key=True,
+        related_name="stats",
+        on_delete=models.CASCADE
+    )
+    attempt_count = models.PositiveIntegerField(default=0)
+    score_total = models.FloatField(default=0)
+    duration_total = models.FloatField(default=0, help_text="Seconds")
+
+    # score_histogram[p]: attempts that scored p% (rounded down), p = 0..100
+    score_histogram = models.JSONField(default=list, blank=True)
+
+    # {"easy": 12, "medium": 30, ...}
+    question_counts = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        verbose_name_plural = "Quiz stats"
+
+    def __str__(self):
+        return f"{self.quiz} - {self.attempt_count} attempts"
+
+    @property
+    def avg_score(self):
+        if not self.attempt_count:
+            return 0
+        return self.score_total / self.attempt_count
+
+    @property
+    def avg_duration(self):
+        if not self.attempt_count:
+            return None
+        return timedelta(seconds=round(self.duration_total / self.attempt_count))
+
+    @property
+    def median_score(self):
+        # Lower median, to the histogram's 1% resolution
+        seen = 0
+        for percent, count in enumerate(self.score_histogram):
+            seen += count
+            if 2 * seen >= self.attempt_count:
+                return percent
+        return 0
+
+    @property
+    def pass_rate(self):
+        if not self.attempt_count:
+            return 0
+        passed = sum(self.score_histogram[self.quiz.pass_percentage:])
+        return 100 * passed / self.attempt_count
+
+    @property
+    def question_total(self):
+        return sum(self.question_counts.values())
+
+
+# =====================
+# SITE COUNTERS
+# =====================
+
+class SiteCounter(models.Model):
+    """
+    Named site-wide totals shown on the homepage
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+# =====================
+# IMPORT JOB
+# =====================
+
+class ImportJob(models.Model):
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    file = models.FileField(upload_to="imports/")
+    original_name = models.CharField(max_length=255, blank=True)
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending',
+        db_index=True
+    )
+
+    created_by = models.ForeignKey(
+        User,
+        related_name="import_jobs",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    processed_rows = models.PositiveIntegerField(default=0)
+    failed_rows = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Set by the worker after every chunk; a running job that stops
+    # beating is taken over by another worker (utils.import_jobs)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.status})"
+
+    @property
+    def progress_percent(self):
+        if not self.total_rows:
+            return 100 if self.status == 'done' else 0
+        done = self.processed_rows + self.failed_rows
+        return min(100, round(100 * done / self.total_rows))
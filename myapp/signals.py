@@ -0,0 +1,165 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
+
+from .models import Category, Quiz, Question, Choice
+from .utils.answer_key import invalidate_quiz
+from .utils.cache_versions import bump_version
+from .utils import leaderboard, user_stats, site_stats, search, quiz_stats
+
+
+# Sent inside the grading transaction once an Attempt is completed.
+# Receivers update summary tables: kwargs `attempt`.
+attempt_completed = Signal()
+
+
+def _invalidate_on_commit(quiz_id=None, catalogue=False):
+    # Bumping before the commit would let a concurrent read recompile the
+    # old rows and cache them under the new version
+    if quiz_id is not None:
+        transaction.on_commit(partial(invalidate_quiz, quiz_id))
+    if catalogue:
+        transaction.on_commit(partial(bump_version, "catalogue"))
+
+
+def _cascaded_from(kwargs, *models):
+    """
+    True when a post_delete runs inside the cascade of deleting one of
+    `models` (an instance or a queryset). The origin's own receiver then
+    does the work once, instead of once per related row.
+    """
+    origin = kwargs.get("origin")
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model in models
+
+
+# =========================
+# QUIZ CATALOGUE
+# =========================
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def quiz_changed(sender, instance, **kwargs):
+    # Cached detail page (and answer key) of this quiz
+    _invalidate_on_commit(instance.pk, catalogue=True)
+    site_stats.refresh_published_quizzes()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    # Category filters and names on the list pages
+    _invalidate_on_commit(catalogue=True)
+
+
+# =========================
+# ANSWER KEY INVALIDATION
+# =========================
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    if _cascaded_from(kwargs, Quiz):
+        return
+    # catalogue: category question counts
+    _invalidate_on_commit(instance.quiz_id, catalogue=True)
+
+
+@receiver(post_save, sender=Choice)
+@receiver(post_delete, sender=Choice)
+def choice_changed(sender, instance, **kwargs):
+    if _cascaded_from(kwargs, Quiz, Question):
+        return
+
+    quiz_id = (
+        Question.objects
+        .filter(pk=instance.question_id)
+        .values_list("quiz_id", flat=True)
+        .first()
+    )
+
+    if quiz_id is not None:
+        _invalidate_on_commit(quiz_id)
+
+
+# =========================
+# QUIZ STATS (QUESTION COUNTS)
+# =========================
+
+@receiver(post_save, sender=Question)
+def question_saved_counts(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    counted_as = getattr(instance, "_counted_as", None)
+    current = (instance.quiz_id, instance.difficulty)
+
+    if created or counted_as != current:
+        quiz_stats.refresh_question_counts(instance.quiz_id, create=True)
+
+        # Moved to another quiz: recount the one it left too
+        if counted_as and counted_as[0] not in (None, instance.quiz_id):
+            quiz_stats.refresh_question_counts(counted_as[0])
+
+    instance._counted_as = current
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted_counts(sender, instance, **kwargs):
+    # The quiz's stats row goes with the quiz
+    if _cascaded_from(kwargs, Quiz):
+        return
+    quiz_stats.refresh_question_counts(instance.quiz_id)
+
+
+# =========================
+# ATTEMPT COMPLETED
+# =========================
+
+@receiver(attempt_completed)
+def update_leaderboard(sender, attempt, **kwargs):
+    leaderboard.record_attempt(attempt)
+
+
+@receiver(attempt_completed)
+def update_quiz_stats(sender, attempt, **kwargs):
+    quiz_stats.record_attempt(attempt)
+
+
+@receiver(attempt_completed)
+def update_user_stats(sender, attempt, **kwargs):
+    first_attempt = user_stats.record_attempt(attempt)
+
+    site_stats.increment(site_stats.TOTAL_ATTEMPTS)
+    if first_attempt:
+        site_stats.increment(site_stats.ACTIVE_USERS)
+
+
+# =========================
+# SEARCH INDEX
+# =========================
+
+@receiver(post_save, sender=Quiz)
+def index_quiz(sender, instance, **kwargs):
+    search.index_quizzes([instance])
+
+
+@receiver(post_delete, sender=Quiz)
+def unindex_quiz(sender, instance, **kwargs):
+    # Its questions' documents too, in one statement
+    search.remove_quiz(instance.pk)
+
+
+@receiver(post_save, sender=Question)
+def index_question(sender, instance, **kwargs):
+    search.index_questions([instance])
+
+
+@receiver(post_delete, sender=Question)
+def unindex_question(sender, instance, **kwargs):
+    if _cascaded_from(kwargs, Quiz):
+        return
+    search.remove(search.QUESTION, [instance.pk])
@@ -0,0 +1,1258 @@
+import csv
+import json
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from io import BytesIO, StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
+
+from . import async_views
+from .models import (
+    Category, Quiz, Question, Choice, Attempt, AttemptDraft, Answer, ImportJob, LeaderboardEntry,
+    QuestionStats, QuizStats, SiteCounter, UserStats,
+)
+from .utils.answer_key import get_answer_key
+from .utils.attempts import (
+    QUESTIONS_PER_ATTEMPT, MAX_DRAFT_CHOICES, SUBMIT_GRACE, draft_selections, history_page,
+)
+from .utils.cache_versions import get_version
+from .utils.grading import complete_attempt
+from .utils.excel_importer import REQUIRED_HEADERS, import_parsed_data, import_rows
+from .utils.import_jobs import STALE_JOB_TIMEOUT, claim_next_job, run_pending_jobs
+from .utils import (
+    search, metrics, item_analysis, adaptive, sampling, site_stats, leaderboard, quiz_stats,
+)
+from .utils.query_plans import seed, check_plans
+from .utils.question_editor import (
+    CHOICE_TEXT_MAX_LENGTH, MAX_CHOICES, parse_choices, save_question,
+)
+from .utils.user_stats import find_mismatches
+
+seed_site_counters = import_module("myapp.migrations.0025_seed_site_counters")
+backfill_user_stats = import_module("myapp.migrations.0026_backfill_user_stats")
+
+
+# Tests must not share version stamps or cached pages with a dev server
+TEST_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CacheTestCase(TestCase):
+    """
+    Starts every test with an empty cache: ids are reused after each
+    test's rollback, and on_commit invalidation never runs inside one
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        sampling._local_pools.clear()
+
+
+def make_quiz(question_count, title="Quiz", category=None):
+    """
+    Published quiz with `question_count` questions of 4 choices each;
+    every fifth question has two correct choices
+    """
+    if category is None:
+        category, _ = Category.objects.get_or_create(name="General", slug="general")
+
+    quiz = Quiz.objects.create(title=title, category=category, is_published=True)
+    difficulties = [value for value, _ in Question.DIFFICULTY_CHOICES]
+
+    questions = Question.objects.bulk_create([
+        Question(
+            quiz=quiz,
+            text=f"Question {i}",
+            marks=2,
+            difficulty=difficulties[i % len(difficulties)],
+        )
+        for i in range(question_count)
+    ])
+    Choice.objects.bulk_create([
+        Choice(
+            question=question,
+            text=f"Choice {j}",
+            is_correct=j == 0 or (i % 5 == 0 and j == 1),
+        )
+        for i, question in enumerate(questions)
+        for j in range(4)
+    ])
+
+    return quiz
+
+
+# =========================
+# SUBMISSION QUERY BUDGET
+# =========================
+
+class SubmitQuizQueryBudgetTests(CacheTestCase):
+    """
+    Grading reads the cached answer key and writes all Answers in one bulk
+    INSERT, so a warm submission costs the same whatever the question count
+    """
+
+    # session, user, attempt, the Attempt UPDATE, the Answer INSERT, the
+    # leaderboard and user stats receivers with their savepoints, the draft
+    # DELETE, then after the commit the quiz stats row and site counter
+    SUBMIT_QUERIES = 23
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+        self.client.force_login(self.user)
+
+    def start(self, quiz):
+        """
+        New attempt via take_quiz, plus a POST answering every question
+        with its first choice
+        """
+        self.client.get(reverse("myapp:take_quiz", args=[quiz.pk]))
+        attempt = Attempt.objects.get(user=self.user, quiz=quiz, completed_at__isnull=True)
+
+        first_choices = dict(
+            Choice.objects
+            .filter(question_id__in=attempt.question_ids)
+            .order_by("-id")
+            .values_list("question_id", "id")
+        )
+        data = {f"question_{qid}": first_choices[qid] for qid in attempt.question_ids}
+
+        return attempt, data
+
+    def submit(self, quiz):
+        # Earlier submission: answer key cached, summary rows already exist
+        attempt, data = self.start(quiz)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("myapp:submit_quiz", args=[quiz.pk, attempt.pk]), data)
+
+        attempt, data = self.start(quiz)
+
+        # Includes the summary updates deferred until after the commit
+        with self.assertNumQueries(self.SUBMIT_QUERIES), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("myapp:submit_quiz", args=[quiz.pk, attempt.pk]), data
+            )
+
+        self.assertRedirects(
+            response,
+            reverse("myapp:result", args=[quiz.pk, attempt.pk]),
+            fetch_redirect_response=False,
+        )
+        return attempt
+
+    def test_small_quiz(self):
+        attempt = self.submit(make_quiz(5))
+
+        self.assertEqual(Answer.objects.filter(attempt=attempt).count(), 5)
+
+    def test_large_quiz(self):
+        attempt = self.submit(make_quiz(QUESTIONS_PER_ATTEMPT * 3))
+
+        attempt.refresh_from_db()
+        self.assertEqual(Answer.objects.filter(attempt=attempt).count(), QUESTIONS_PER_ATTEMPT)
+        self.assertIsNotNone(attempt.completed_at)
+        # Warm-up and measured submission, applied after each commit
+        self.assertEqual(QuizStats.objects.get(quiz_id=attempt.quiz_id).attempt_count, 2)
+
+    def test_double_submit_is_ignored(self):
+        quiz = make_quiz(5)
+        attempt = self.submit(quiz)
+
+        self.client.post(reverse("myapp:submit_quiz", args=[quiz.pk, attempt.pk]), {})
+
+        self.assertEqual(Answer.objects.filter(attempt=attempt).count(), 5)
+
+
+# =========================
+# RESULT PAGE
+# =========================
+
+class ResultPageQueryTests(CacheTestCase):
+    """
+    The per-question breakdown loads in a fixed number of queries and is
+    then cached per completed attempt
+    """
+
+    # session, user, attempt, answers with questions, their choices
+    RESULT_QUERIES = 5
+    # session, user, attempt
+    CACHED_RESULT_QUERIES = 3
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+        self.client.force_login(self.user)
+
+    def complete(self, question_count):
+        """
+        Completed attempt answering every question with all its correct choices
+        """
+        quiz = make_quiz(question_count, title=f"Quiz {question_count}")
+        questions = list(quiz.questions.order_by("id").prefetch_related("choices"))
+        attempt = Attempt.objects.create(
+            user=self.user, quiz=quiz,
+            question_ids=[q.id for q in questions], total_marks=2 * len(questions),
+        )
+        results = [
+            {
+                "question_id": q.id,
+                "selected_choice_ids": [c.id for c in q.choices.all() if c.is_correct],
+                "is_correct": True,
+                "marks_awarded": 2,
+            }
+            for q in questions
+        ]
+        complete_attempt(attempt, results, 2 * len(questions))
+        return attempt
+
+    def get(self, attempt):
+        return self.client.get(reverse("myapp:result", args=[attempt.quiz_id, attempt.pk]))
+
+    def test_queries_do_not_grow_with_answers(self):
+        for question_count in (5, 20):
+            attempt = self.complete(question_count)
+            with self.subTest(questions=question_count), self.assertNumQueries(self.RESULT_QUERIES):
+                response = self.get(attempt)
+
+            self.assertContains(response, "Correct</span>", count=question_count)
+
+    def test_multi_select_answer_lists_every_choice(self):
+        # Question 0 has two correct choices (make_quiz)
+        response = self.get(self.complete(5))
+
+        self.assertContains(response, "Choice 0, Choice 1", count=1)
+
+    def test_second_load_is_cached(self):
+        attempt = self.complete(5)
+        first = self.get(attempt)
+
+        with self.assertNumQueries(self.CACHED_RESULT_QUERIES):
+            second = self.get(attempt)
+
+        self.assertEqual(second.content, first.content)
+
+
+# =========================
+# SCORE HISTORY
+# =========================
+
+class ScoreHistoryTests(CacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+        self.client.force_login(self.user)
+
+        quiz = make_quiz(1)
+        now = timezone.now().replace(microsecond=0)
+        # Three attempts share each completion time
+        self.completed = [
+            Attempt.objects.create(
+                user=self.user, quiz=quiz, question_ids=[], total_marks=10, score=i,
+                completed_at=now - timedelta(minutes=i // 3),
+            )
+            for i in range(8)
+        ]
+        # In progress: never listed
+        Attempt.objects.create(user=self.user, quiz=quiz, question_ids=[], total_marks=10)
+
+    def newest_first(self):
+        return sorted(self.completed, key=lambda a: (a.completed_at, a.id), reverse=True)
+
+    def test_keyset_pages_have_no_gaps_or_duplicates(self):
+        seen, after = [], None
+
+        while True:
+            attempts, after = history_page(self.user, after, 3)
+            seen.extend(a.id for a in attempts)
+            if after is None:
+                break
+
+        self.assertEqual(seen, [a.id for a in self.newest_first()])
+
+    @mock.patch("myapp.views.SCORES_PAGE_SIZE", 3)
+    def test_page_view_follows_cursor(self):
+        response = self.client.get(reverse("myapp:my_scores"))
+        second = self.client.get(
+            reverse("myapp:my_scores"), {"after": response.context["next_cursor"]}
+        )
+
+        pages = list(response.context["attempts"]) + list(second.context["attempts"])
+        self.assertEqual(pages, self.newest_first()[:6])
+
+    def test_export_streams_completed_attempts(self):
+        response = self.client.get(reverse("myapp:my_scores_export"))
+
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], ["Quiz", "Score", "Total marks", "Started", "Completed"])
+        self.assertEqual(
+            [(row[0], float(row[1]), row[4]) for row in rows[1:]],
+            [("Quiz", a.score, a.completed_at.isoformat()) for a in self.newest_first()],
+        )
+
+
+# =========================
+# AUTOSAVE DRAFTS
+# =========================
+
+class AutosaveDraftTests(CacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+        self.client.force_login(self.user)
+
+        self.quiz = make_quiz(5)
+        self.client.get(reverse("myapp:take_quiz", args=[self.quiz.pk]))
+        self.attempt = Attempt.objects.get(user=self.user, quiz=self.quiz)
+
+        # Every correct choice id per question
+        self.correct = {}
+        for question_id, choice_id in Choice.objects.filter(
+            question__quiz=self.quiz, is_correct=True
+        ).values_list("question_id", "id"):
+            self.correct.setdefault(question_id, []).append(choice_id)
+
+    def autosave(self, answers):
+        return self.client.post(
+            reverse("myapp:autosave_attempt", args=[self.quiz.pk, self.attempt.pk]),
+            json.dumps({"answers": answers}),
+            content_type="application/json",
+        )
+
+    def submit(self, data):
+        self.client.post(reverse("myapp:submit_quiz", args=[self.quiz.pk, self.attempt.pk]), data)
+        self.attempt.refresh_from_db()
+
+    def expire(self, after):
+        Attempt.objects.filter(pk=self.attempt.pk).update(
+            started_at=timezone.now() - timedelta(minutes=self.quiz.time_limit) - after
+        )
+
+    def test_invalid_payloads_are_rejected(self):
+        other_quiz = make_quiz(1, title="Other")
+        first = self.attempt.question_ids[0]
+        payloads = {
+            "foreign question": {str(other_quiz.questions.get().id): []},
+            "non-int question": {"abc": []},
+            "non-int choice": {str(first): ["1"]},
+            "too many choices": {str(first): list(range(MAX_DRAFT_CHOICES + 1))},
+        }
+
+        for name, answers in payloads.items():
+            with self.subTest(name):
+                self.assertEqual(self.autosave(answers).status_code, 400)
+
+        self.assertFalse(AttemptDraft.objects.filter(attempt=self.attempt).exists())
+
+    def test_saves_merge_into_one_draft(self):
+        first, second = self.attempt.question_ids[:2]
+
+        self.autosave({str(first): self.correct[first]})
+        response = self.autosave({str(second): self.correct[second]})
+
+        self.assertEqual(response.json(), {"saved": 1, "answered": 2, "saves": 2})
+        self.assertEqual(
+            draft_selections(self.attempt),
+            {first: set(self.correct[first]), second: set(self.correct[second])},
+        )
+
+    def test_closed_after_deadline_and_grace(self):
+        first = self.attempt.question_ids[0]
+
+        self.expire(SUBMIT_GRACE - timedelta(seconds=5))
+        self.assertEqual(self.autosave({str(first): []}).status_code, 200)
+
+        self.expire(SUBMIT_GRACE + timedelta(seconds=5))
+        self.assertEqual(self.autosave({str(first): []}).status_code, 409)
+
+    def test_submit_from_draft_grades_saved_answers(self):
+        first = self.attempt.question_ids[0]
+        self.autosave({str(first): self.correct[first]})
+
+        self.submit({"from_draft": "1"})
+
+        self.assertEqual(self.attempt.score, 2)
+        self.assertFalse(AttemptDraft.objects.filter(attempt=self.attempt).exists())
+
+    def test_late_submit_ignores_posted_answers(self):
+        first, second = self.attempt.question_ids[:2]
+        self.autosave({str(first): self.correct[first]})
+        self.expire(SUBMIT_GRACE + timedelta(seconds=5))
+
+        self.submit({f"question_{qid}": choice_ids for qid, choice_ids in self.correct.items()})
+
+        self.assertIsNotNone(self.attempt.completed_at)
+        self.assertEqual(
+            dict(Answer.objects.filter(attempt=self.attempt).values_list("question_id", "is_correct")),
+            {qid: qid == first for qid in self.attempt.question_ids},
+        )
+
+
+# =========================
+# ANSWER KEY INVALIDATION
+# =========================
+
+class AnswerKeyInvalidationTests(CacheTestCase):
+    """
+    Version stamps move only once the change is committed, so a read
+    during the transaction cannot cache old rows under the new version
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.quiz = make_quiz(3)
+        self.version = self.quiz_version()
+
+    def quiz_version(self):
+        return get_version(f"quiz:{self.quiz.id}")
+
+    def test_choice_change_invalidates_after_commit(self):
+        choice = Choice.objects.filter(question__quiz=self.quiz, is_correct=False).first()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            choice.is_correct = True
+            choice.save()
+            self.assertEqual(self.quiz_version(), self.version)
+
+        self.assertNotEqual(self.quiz_version(), self.version)
+        self.assertIn(choice.id, get_answer_key(self.quiz.id)[choice.question_id]["correct_ids"])
+
+    def test_import_invalidates_after_commit(self):
+        row = {
+            "Category": "General", "Quiz Title": self.quiz.title, "Question": "Imported",
+            "A": "a", "B": "b", "C": "c", "D": "d",
+            "Correct": "B", "Difficulty": "hard", "Marks": 3,
+        }
+
+        with self.captureOnCommitCallbacks(execute=True):
+            import_parsed_data([row])
+            self.assertEqual(self.quiz_version(), self.version)
+
+        self.assertNotEqual(self.quiz_version(), self.version)
+        self.assertEqual(len(get_answer_key(self.quiz.id)), 4)
+
+
+# =========================
+# CASCADE DELETES
+# =========================
+
+class CascadeDeleteTests(CacheTestCase):
+    """
+    Question / Choice receivers skip rows deleted by a quiz's cascade;
+    the quiz's own receivers clean up once
+    """
+
+    def delete_queries(self, question_count):
+        quiz = make_quiz(question_count, title=f"Quiz {question_count}")
+
+        with CaptureQueriesContext(connection) as captured:
+            quiz.delete()
+
+        return len(captured.captured_queries)
+
+    def test_quiz_delete_does_not_grow_with_questions(self):
+        # First delete also creates the published-quizzes counter row
+        self.delete_queries(1)
+        # 25 questions' choices still fit in one batch of the collector's
+        # DELETE ... IN (...), so any per-row receiver query shows up here
+        self.assertEqual(self.delete_queries(25), self.delete_queries(5))
+
+    def test_quiz_delete_unindexes_questions(self):
+        quiz = make_quiz(3)
+        search.rebuild()
+        self.assertTrue(search.search_question_ids("Question"))
+
+        quiz.delete()
+
+        self.assertEqual(search.search_question_ids("Question"), [])
+
+
+# =========================
+# EXCEL IMPORT
+# =========================
+
+def sheet_row(question, quiz="Imported", category="Science", correct="A"):
+    return {
+        "Category": category, "Quiz Title": quiz, "Question": question,
+        "A": "a", "B": "b", "C": "c", "D": "d",
+        "Correct": correct, "Difficulty": "easy", "Marks": 1,
+    }
+
+
+class ExcelImportTests(CacheTestCase):
+
+    def test_rows_are_written_in_chunks(self):
+        rows = [sheet_row(f"Q{i}", quiz=f"Quiz {i % 2}", correct="A,C") for i in range(5)]
+        progress = []
+
+        with CaptureQueriesContext(connection) as captured:
+            report = import_rows(rows, batch_size=2, on_progress=lambda r: progress.append(r.rows))
+
+        question_inserts = [
+            q for q in captured.captured_queries
+            if q["sql"].startswith('INSERT INTO "myapp_question"')
+        ]
+        self.assertEqual(len(question_inserts), 3)
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertEqual(
+            (report.rows, report.failed_rows, report.questions, report.choices,
+             report.categories_created, report.quizzes_created),
+            (5, 0, 5, 20, 1, 2),
+        )
+        self.assertEqual(Choice.objects.filter(is_correct=True).count(), 10)
+
+    def test_bad_row_skips_its_chunk(self):
+        rows = [sheet_row(f"Q{i}") for i in range(5)]
+        rows[2]["Question"] = None
+        errors = []
+
+        report = import_rows(
+            rows, batch_size=2, on_error=lambda *args: errors.append(args),
+        )
+
+        (first_row, chunk_size, exc), = errors
+        self.assertEqual((first_row, chunk_size, str(exc)), (3, 2, "Row 3: Question is blank"))
+        self.assertEqual((report.rows, report.failed_rows), (3, 2))
+        self.assertEqual(
+            list(Question.objects.values_list("text", flat=True).order_by("id")), ["Q0", "Q1", "Q4"]
+        )
+
+    def test_bad_row_aborts_all_or_nothing_import(self):
+        rows = [sheet_row("Q0"), sheet_row("Q1", category="  ")]
+
+        with self.assertRaisesMessage(ValueError, "Row 2: Category is blank"):
+            import_parsed_data(rows)
+
+        self.assertFalse(Question.objects.exists())
+
+    def test_command_reports_bad_row(self):
+        workbook = Workbook()
+        workbook.active.append(REQUIRED_HEADERS)
+        workbook.active.append(["Science", None, "Q0", "a", "b", "c", "d", "A", "easy", 1])
+
+        with tempfile.NamedTemporaryFile(suffix=".xlsx") as file:
+            workbook.save(file.name)
+            with self.assertRaisesMessage(CommandError, "Row 1: Quiz Title is blank"):
+                call_command("import_quiz_excel", file.name, stdout=StringIO())
+
+
+# =========================
+# IMPORT JOBS
+# =========================
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ImportJobTests(CacheTestCase):
+
+    def stage(self, rows, extra=()):
+        workbook = Workbook()
+        workbook.active.append(REQUIRED_HEADERS)
+        for i in range(rows):
+            workbook.active.append(["Science", "Imported", f"Q{i}", "a", "b", "c", "d", "A", "easy", 1])
+        for row in extra:
+            workbook.active.append(row)
+
+        buffer = BytesIO()
+        workbook.save(buffer)
+        return default_storage.save("imports/test.xlsx", ContentFile(buffer.getvalue()))
+
+    def test_done_job_deletes_staged_file(self):
+        file_name = self.stage(3)
+        job = ImportJob.objects.create(file=file_name, original_name="test.xlsx")
+
+        self.assertEqual(run_pending_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_rows, job.file.name), ("done", 3, ""))
+        self.assertFalse(default_storage.exists(file_name))
+
+    def test_stale_running_job_resumes_after_committed_rows(self):
+        stale = timezone.now() - STALE_JOB_TIMEOUT - timedelta(minutes=1)
+        job = ImportJob.objects.create(
+            file=self.stage(5), status="running", processed_rows=3, heartbeat_at=stale,
+        )
+
+        self.assertEqual(run_pending_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_rows, job.total_rows), ("done", 5, 5))
+        self.assertEqual(
+            list(Question.objects.values_list("text", flat=True).order_by("id")), ["Q3", "Q4"]
+        )
+
+    def test_failed_chunk_for_new_quiz_does_not_fail_job(self):
+        broken = ["Science", "Broken", None, "a", "b", "c", "d", "A", "easy", 1]
+        job = ImportJob.objects.create(file=self.stage(0, extra=[broken]))
+
+        self.assertEqual(run_pending_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_rows, job.failed_rows), ("done", 0, 1))
+        self.assertFalse(Quiz.objects.filter(title="Broken").exists())
+        self.assertFalse(QuizStats.objects.exists())
+
+    def test_live_running_job_is_not_claimed(self):
+        ImportJob.objects.create(
+            file=self.stage(1), status="running", heartbeat_at=timezone.now(),
+        )
+
+        self.assertIsNone(claim_next_job())
+
+
+# =========================
+# USER STATS
+# =========================
+
+class UserStatsTests(CacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.quiz = make_quiz(1)
+        self.users = [User.objects.create_user(name) for name in ("ann", "bob")]
+
+    def test_incremental_updates_match_aggregates(self):
+        for user, score in zip(self.users * 2, (2, 0.5, 1, 1.5)):
+            attempt = Attempt.objects.create(
+                user=user, quiz=self.quiz, question_ids=[], total_marks=2,
+            )
+            complete_attempt(attempt, [], score)
+
+        self.assertEqual(find_mismatches(), [])
+        self.assertEqual(UserStats.objects.get(user=self.users[0]).best_score, 2)
+
+    def test_migration_backfills_existing_users(self):
+        for user in self.users:
+            Attempt.objects.create(
+                user=user, quiz=self.quiz, question_ids=[], score=1,
+                completed_at=timezone.now(),
+            )
+        self.assertTrue(find_mismatches())
+
+        backfill_user_stats.backfill_user_stats(django_apps, None)
+
+        self.assertEqual(find_mismatches(), [])
+        self.assertEqual(UserStats.objects.count(), 2)
+
+
+# =========================
+# SITE COUNTERS
+# =========================
+
+class SiteCounterTests(CacheTestCase):
+
+    def complete(self, user, quiz, score):
+        attempt = Attempt.objects.create(user=user, quiz=quiz, question_ids=[], total_marks=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            complete_attempt(attempt, [], score)
+
+    def real_totals(self):
+        completed = Attempt.objects.filter(completed_at__isnull=False)
+        return {
+            site_stats.PUBLISHED_QUIZZES: Quiz.objects.filter(is_published=True).count(),
+            site_stats.ACTIVE_USERS: completed.values("user_id").distinct().count(),
+            site_stats.TOTAL_ATTEMPTS: completed.count(),
+        }
+
+    def counters(self):
+        cache.delete(site_stats.STATS_CACHE_KEY)
+        return site_stats.get_site_stats()
+
+    def test_counters_follow_completed_attempts(self):
+        quiz = make_quiz(1)
+        ann, bob = User.objects.create_user("ann"), User.objects.create_user("bob")
+
+        for user, score in ((ann, 2), (ann, 0), (bob, 1)):
+            self.complete(user, quiz, score)
+
+        self.assertEqual(self.counters(), self.real_totals())
+        self.assertEqual(self.counters()[site_stats.ACTIVE_USERS], 2)
+
+    def test_migration_seeds_counters_from_existing_rows(self):
+        quiz = make_quiz(1)
+        for name in ("ann", "bob"):
+            Attempt.objects.create(
+                user=User.objects.create_user(name), quiz=quiz, question_ids=[],
+                completed_at=timezone.now(),
+            )
+        SiteCounter.objects.all().delete()
+
+        seed_site_counters.seed_counters(django_apps, None)
+
+        self.assertEqual(self.counters(), self.real_totals())
+
+        site_stats.refresh_all()
+        self.assertEqual(self.counters(), self.real_totals())
+
+
+# =========================
+# LEADERBOARD REBUILD
+# =========================
+
+class LeaderboardRebuildTests(CacheTestCase):
+
+    def entries(self):
+        return list(
+            LeaderboardEntry.objects
+            .order_by("user_id", "quiz_id")
+            .values_list("user_id", "quiz_id", "best_score", "best_at", "attempt_count", "last_completed")
+        )
+
+    def test_rebuild_matches_incremental_updates(self):
+        quizzes = [make_quiz(1, title="First"), make_quiz(1, title="Second")]
+        users = [User.objects.create_user(name) for name in ("ann", "bob", "cy")]
+
+        # Ties after the best, a zero first attempt and a later improvement,
+        # and a user who never scores
+        for user, quiz, score in [
+            (users[0], quizzes[0], 5), (users[1], quizzes[0], 8),
+            (users[0], quizzes[0], 8), (users[0], quizzes[0], 8),
+            (users[1], quizzes[1], 0), (users[0], quizzes[1], 3),
+            (users[2], quizzes[1], 0), (users[2], quizzes[0], 0),
+            (users[1], quizzes[0], 2), (users[1], quizzes[1], 4),
+        ]:
+            attempt = Attempt.objects.create(user=user, quiz=quiz, question_ids=[], total_marks=10)
+            complete_attempt(attempt, [], score)
+
+        incremental = self.entries()
+        call_command("rebuild_leaderboard", stdout=StringIO())
+
+        self.assertEqual(self.entries(), incremental)
+
+
+class LeaderboardTopTests(CacheTestCase):
+
+    def complete(self, user, quiz, score):
+        attempt = Attempt.objects.create(user=user, quiz=quiz, question_ids=[], total_marks=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            complete_attempt(attempt, [], score)
+        return attempt
+
+    def test_zero_first_attempt_joins_cached_top(self):
+        quiz = make_quiz(1)
+        self.complete(User.objects.create_user("ann"), quiz, 5)
+        self.assertEqual(len(leaderboard.get_top(quiz.id)), 1)
+        self.assertEqual(len(leaderboard.get_top()), 1)
+
+        bob = User.objects.create_user("bob")
+        attempt = self.complete(bob, quiz, 0)
+
+        for quiz_id in (quiz.id, None):
+            with self.subTest(quiz_id=quiz_id):
+                self.assertEqual([row["username"] for row in leaderboard.get_top(quiz_id)], ["ann", "bob"])
+                entry = LeaderboardEntry.objects.get(user=bob, quiz_id=quiz_id)
+                self.assertEqual(entry.best_at, attempt.completed_at)
+
+
+# =========================
+# QUIZ CATALOGUE
+# =========================
+
+@mock.patch("myapp.views.QUIZ_PAGE_SIZE", 2)
+class QuizCatalogueTests(CacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        science = Category.objects.create(name="Science", slug="science")
+        history = Category.objects.create(name="History", slug="history")
+        self.science = [make_quiz(1, f"Science {i}", science) for i in range(3)]
+        self.history = make_quiz(1, "History 0", history)
+
+    def titles(self, **params):
+        response = self.client.get(reverse("myapp:quiz_list"), params)
+        self.assertEqual(response.status_code, 200)
+        return [q.title for q in response.context["quizzes"]], response.context["next_cursor"]
+
+    def test_cursor_pages_through_newest_first(self):
+        first, cursor = self.titles()
+        second, last_cursor = self.titles(after=cursor)
+
+        self.assertEqual(first, ["History 0", "Science 2"])
+        self.assertEqual(second, ["Science 1", "Science 0"])
+        self.assertIsNone(last_cursor)
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        for cursor in ("garbage", "1_x", "99999999999999999999999_1"):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.titles(after=cursor)[0], ["History 0", "Science 2"])
+
+    def test_category_filter(self):
+        titles, cursor = self.titles(category="science")
+        more, _ = self.titles(category="science", after=cursor)
+
+        self.assertEqual(titles + more, ["Science 2", "Science 1", "Science 0"])
+
+    def test_unknown_category_is_empty(self):
+        self.assertEqual(self.titles(category="nope"), ([], None))
+
+
+# =========================
+# QUIZ SEARCH
+# =========================
+
+class QuizSearchTests(CacheTestCase):
+    """
+    Filters apply before the search limit, so filtered-out quizzes
+    cannot use up the result slots
+    """
+
+    def setUp(self):
+        super().setUp()
+        maths = Category.objects.create(name="Maths", slug="maths")
+        other = Category.objects.create(name="Other", slug="other")
+
+        # Shorter titles rank first
+        Quiz.objects.create(title="Algebra", category=maths, is_published=False)
+        Quiz.objects.create(title="Algebra quiz", category=other, is_published=True)
+        self.match = Quiz.objects.create(
+            title="Algebra and geometry revision", category=maths, is_published=True,
+        )
+
+        # The category filter only lists categories with questions
+        Question.objects.bulk_create(
+            Question(quiz=quiz, text="Solve for x") for quiz in Quiz.objects.all()
+        )
+
+    def test_filters_apply_before_limit(self):
+        quizzes = Quiz.objects.filter(is_published=True, category__slug="maths")
+
+        self.assertEqual(search.search_quiz_ids("algebra", limit=1, quizzes=quizzes), [self.match.id])
+
+    def test_empty_queryset(self):
+        self.assertEqual(search.search_quiz_ids("algebra", quizzes=Quiz.objects.none()), [])
+
+    @mock.patch("myapp.views.SEARCH_RESULTS_LIMIT", 1)
+    def test_category_search_page(self):
+        response = self.client.get(reverse("myapp:quiz_list"), {"q": "algebra", "category": "maths"})
+
+        self.assertEqual(list(response.context["quizzes"]), [self.match])
+
+
+# =========================
+# QUERY PLANS
+# =========================
+
+class QueryPlanTests(TestCase):
+    """
+    EXPLAINs every hot query (utils.query_plans.HOT_QUERIES) on a seeded
+    test database and fails on a full table scan
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ctx = seed()
+
+    def test_hot_queries_use_indexes(self):
+        for name, plan, scanned in check_plans(self.ctx):
+            with self.subTest(name):
+                self.assertEqual(scanned, [], plan)
+
+
+# =========================
+# CACHE METRICS
+# =========================
+
+class CacheMetricsTests(CacheTestCase):
+    """
+    Hit / miss counters live in the worker's metrics registry; a cache
+    hit writes nothing to the shared cache
+    """
+
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+
+    def test_page_cache_hit_is_counted_without_cache_writes(self):
+        self.client.get(reverse("myapp:about"))
+
+        with mock.patch.object(cache, "set") as cache_set, mock.patch.object(cache, "incr") as cache_incr:
+            response = self.client.get(reverse("myapp:about"))
+
+        self.assertEqual(response["X-Page-Cache"], "hit")
+        cache_set.assert_not_called()
+        cache_incr.assert_not_called()
+        self.assertEqual(metrics.PAGE_CACHE.series, {"hit": 1, "miss": 1})
+
+    def test_answer_key_counters_are_exported(self):
+        quiz = make_quiz(2)
+        get_answer_key(quiz.id)
+        get_answer_key(quiz.id)
+
+        exported = metrics.render_prometheus()
+
+        self.assertIn('myapp_answer_key_cache_total{result="hit"} 1', exported)
+        self.assertIn('myapp_answer_key_cache_total{result="miss"} 1', exported)
+
+
+# =========================
+# ADMIN CHANGELISTS
+# =========================
+
+class AdminChangelistQueryTests(CacheTestCase):
+    """
+    Every changelist runs a fixed number of queries, however many rows the
+    page lists (no per-row queries from list_display / filters)
+    """
+
+    CHANGELIST_QUERIES = {
+        "category": 5,
+        "quiz": 5,
+        "question": 6,
+        "choice": 5,
+        "attempt": 8,
+        "answer": 5,
+        "importjob": 5,
+    }
+
+    # Seeded rows stay under one page, so per-row queries show in the count
+    ROWS = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("admin", "admin@example.com", None)
+        cls.seed_rows("admin_small")
+
+    @classmethod
+    def seed_rows(cls, tag):
+        seed(cls.ROWS, tag=tag)
+        ImportJob.objects.bulk_create(
+            ImportJob(file=f"imports/{tag}_{i}.xlsx", created_by=cls.admin) for i in range(5)
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def assert_changelist_queries(self):
+        for name, queries in self.CHANGELIST_QUERIES.items():
+            with self.subTest(name):
+                with self.assertNumQueries(queries):
+                    response = self.client.get(reverse(f"admin:myapp_{name}_changelist"))
+                self.assertEqual(response.status_code, 200)
+
+    def test_changelist_queries(self):
+        self.assert_changelist_queries()
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.seed_rows("admin_more")
+        self.assert_changelist_queries()
+
+
+# =========================
+# QUESTION EDITOR
+# =========================
+
+class QuestionEditorTests(CacheTestCase):
+
+    SAVE_QUERIES = 11
+
+    def setUp(self):
+        super().setUp()
+        self.quiz = make_quiz(1)
+        self.question = self.quiz.questions.get()
+        self.choices = list(self.question.choices.order_by("id"))
+
+    def payload(self, choices):
+        return [
+            {"id": c.id, "text": c.text, "is_correct": c.is_correct} for c in choices
+        ]
+
+    def test_parse_choices_rejects_invalid_payloads(self):
+        valid = {"id": None, "text": "a", "is_correct": True}
+        payloads = {
+            "not a list": {"choices": []},
+            "too few": [valid],
+            "too many": [valid] * (MAX_CHOICES + 1),
+            "not an object": [valid, "b"],
+            "bool id": [valid, {"id": True, "text": "b"}],
+            "blank text": [valid, {"id": None, "text": "  "}],
+            "text too long": [valid, {"id": None, "text": "b" * (CHOICE_TEXT_MAX_LENGTH + 1)}],
+            "nothing correct": [{"id": None, "text": "a"}, {"id": None, "text": "b"}],
+        }
+
+        for name, raw in payloads.items():
+            with self.subTest(name), self.assertRaises(ValueError):
+                parse_choices(raw)
+
+        self.assertEqual(
+            parse_choices([valid, {"id": 7, "text": " b ", "is_correct": "yes"}]),
+            [valid, {"id": 7, "text": "b", "is_correct": False}],
+        )
+
+    def test_save_adds_edits_and_removes_choices(self):
+        kept, edited, removed, _ = self.choices
+        answer = Answer.objects.create(
+            attempt=Attempt.objects.create(
+                user=User.objects.create_user("student"), quiz=self.quiz, question_ids=[],
+            ),
+            question=self.question,
+            selected_choice=removed,
+        )
+        edited.text = "Edited"
+        version = get_version(f"quiz:{self.quiz.id}")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            saved = save_question(self.question, parse_choices(
+                self.payload([kept, edited]) + [{"id": None, "text": "Added", "is_correct": False}]
+            ))
+
+        self.assertEqual([c["text"] for c in saved["choices"]], ["Choice 0", "Edited", "Added"])
+        self.assertEqual(self.question.choices.count(), 3)
+        answer.refresh_from_db()
+        self.assertIsNone(answer.selected_choice_id)
+        self.assertNotEqual(get_version(f"quiz:{self.quiz.id}"), version)
+
+    def test_save_queries_do_not_grow_with_choices(self):
+        # savepoint, question UPDATE and its search document, choices,
+        # Answer UPDATE, DELETE, bulk UPDATE, INSERT, re-read, release
+        big = make_quiz(1, title="Big").questions.get()
+        Choice.objects.bulk_create(
+            Choice(question=big, text=f"Extra {i}") for i in range(MAX_CHOICES - 4)
+        )
+
+        for question in (self.question, big):
+            choices = list(question.choices.order_by("id"))
+            choices[1].text = "Edited"
+            payload = parse_choices(
+                self.payload(choices[:2]) + [{"id": None, "text": "Added", "is_correct": False}]
+            )
+            with self.subTest(choices=len(choices)), self.assertNumQueries(self.SAVE_QUERIES):
+                save_question(question, payload)
+
+
+# =========================
+# ITEM ANALYSIS
+# =========================
+
+class ItemAnalysisRefreshTests(CacheTestCase):
+
+    def complete(self, quiz, user, minutes_ago):
+        questions = list(quiz.questions.order_by("id"))
+        attempt = Attempt.objects.create(
+            user=user, quiz=quiz, question_ids=[q.id for q in questions], total_marks=2 * len(questions),
+        )
+        results = [
+            {"question_id": q.id, "selected_choice_ids": [], "is_correct": False, "marks_awarded": 0}
+            for q in questions
+        ]
+        complete_attempt(attempt, results, 0)
+        Attempt.objects.filter(pk=attempt.pk).update(
+            completed_at=timezone.now() - timedelta(minutes=minutes_ago)
+        )
+        return attempt
+
+    def responses(self):
+        return sum(QuestionStats.objects.values_list("responses", flat=True))
+
+    def test_recent_answers_wait_for_a_later_run(self):
+        quiz = make_quiz(3)
+        settled = item_analysis.SETTLE_TIME.total_seconds() / 60
+        self.complete(quiz, User.objects.create_user("old"), minutes_ago=settled + 1)
+        recent = self.complete(quiz, User.objects.create_user("new"), minutes_ago=0)
+
+        self.assertEqual(item_analysis.refresh(), 3)
+
+        # Still open when the first run started: picked up once settled
+        Attempt.objects.filter(pk=recent.pk).update(
+            completed_at=timezone.now() - item_analysis.SETTLE_TIME - timedelta(minutes=1)
+        )
+        self.assertEqual(item_analysis.refresh(), 3)
+        self.assertEqual(self.responses(), 6)
+
+
+# =========================
+# QUIZ STATS (QUESTION COUNTS)
+# =========================
+
+class QuestionCountTests(CacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # bulk_create sends no signals: start from a counted quiz
+        self.quiz = make_quiz(3)
+        quiz_stats.refresh_question_counts(self.quiz.id, create=True)
+        self.question = Question.objects.get(quiz=self.quiz, difficulty="easy")
+
+    def counts(self, quiz):
+        return QuizStats.objects.get(quiz=quiz).question_counts
+
+    def stats_queries(self, save):
+        with CaptureQueriesContext(connection) as captured:
+            save()
+        return [q["sql"] for q in captured.captured_queries if "myapp_quizstats" in q["sql"]]
+
+    def test_created_question_is_counted(self):
+        Question.objects.create(quiz=self.quiz, text="New", difficulty="hard")
+
+        self.assertEqual(self.counts(self.quiz), {"easy": 1, "medium": 1, "hard": 2})
+
+    def test_text_edit_skips_recount(self):
+        self.question.text = "Edited"
+
+        self.assertEqual(self.stats_queries(self.question.save), [])
+
+    def test_difficulty_change_recounts(self):
+        self.question.difficulty = "hard"
+        self.question.save()
+
+        self.assertEqual(self.counts(self.quiz), {"medium": 1, "hard": 2})
+        self.assertEqual(self.stats_queries(self.question.save), [])
+
+    def test_move_recounts_both_quizzes(self):
+        other = make_quiz(1, title="Other")
+        self.question.quiz = other
+        self.question.save()
+
+        self.assertEqual(self.counts(self.quiz), {"medium": 1, "hard": 1})
+        self.assertEqual(self.counts(other), {"easy": 2})
+
+    def test_raw_save_skips_recount(self):
+        self.question.difficulty = "hard"
+
+        self.assertEqual(self.stats_queries(lambda: self.question.save_base(raw=True)), [])
+
+
+# =========================
+# ADAPTIVE ATTEMPTS
+# =========================
+
+class AdaptiveAttemptTests(CacheTestCase):
+    """
+    One question at a time through answer_question; the full-form submit
+    and autosave endpoints must not touch adaptive attempts
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user("student", "student@example.com", "pw")
+        self.client.force_login(self.user)
+
+        # Three questions per difficulty level
+        self.quiz = make_quiz(3 * len(adaptive.LEVELS))
+        Quiz.objects.filter(pk=self.quiz.pk).update(selection_mode="adaptive")
+        self.quiz.refresh_from_db()
+
+    def start(self):
+        self.client.get(reverse("myapp:take_quiz", args=[self.quiz.pk]))
+        return Attempt.objects.get(user=self.user, quiz=self.quiz)
+
+    def choices(self, question_id, correct):
+        """
+        Every correct choice, or a single wrong one
+        """
+        choice_ids = list(
+            Choice.objects
+            .filter(question_id=question_id, is_correct=correct)
+            .values_list("id", flat=True)
+        )
+        return choice_ids if correct else choice_ids[:1]
+
+    def answer(self, attempt, correct):
+        question_id = attempt.question_ids[-1]
+        response = self.client.post(
+            reverse("myapp:answer_question", args=[self.quiz.pk, attempt.pk]),
+            {"question_id": question_id, f"question_{question_id}": self.choices(question_id, correct)},
+        )
+        attempt.refresh_from_db()
+        return response
+
+    def test_start_shows_one_question_at_the_middle_level(self):
+        attempt = self.start()
+
+        self.assertEqual(attempt.adaptive_level, adaptive.START_LEVEL)
+        self.assertEqual(len(attempt.question_ids), 1)
+        self.assertEqual(
+            Question.objects.get(pk=attempt.question_ids[0]).difficulty,
+            adaptive.LEVELS[adaptive.START_LEVEL],
+        )
+
+    def test_level_follows_answers(self):
+        attempt = self.start()
+
+        self.answer(attempt, correct=True)
+        self.assertEqual(attempt.adaptive_level, adaptive.START_LEVEL + 1)
+
+        self.answer(attempt, correct=False)
+        self.answer(attempt, correct=False)
+        self.assertEqual(attempt.adaptive_level, adaptive.START_LEVEL - 1)
+        self.assertEqual(len(attempt.question_ids), 4)
+
+    def test_finish_grades_every_answer(self):
+        attempt = self.start()
+        expected = {}
+
+        # The quiz runs out of questions before QUESTIONS_PER_ATTEMPT
+        while attempt.completed_at is None:
+            correct = len(expected) % 2 == 0
+            expected[attempt.question_ids[-1]] = correct
+            response = self.answer(attempt, correct)
+
+        self.assertRedirects(
+            response,
+            reverse("myapp:result", args=[self.quiz.pk, attempt.pk]),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(len(expected), Question.objects.filter(quiz=self.quiz).count())
+        self.assertEqual(
+            dict(Answer.objects.filter(attempt=attempt).values_list("question_id", "is_correct")),
+            expected,
+        )
+        self.assertEqual(attempt.score, 2 * sum(expected.values()))
+        self.assertFalse(AttemptDraft.objects.filter(attempt=attempt).exists())
+
+    def test_submit_and_autosave_cannot_rewrite_answers(self):
+        attempt = self.start()
+        question_id = attempt.question_ids[0]
+        self.answer(attempt, correct=False)
+
+        response = self.client.post(
+            reverse("myapp:autosave_attempt", args=[self.quiz.pk, attempt.pk]),
+            json.dumps({"answers": {str(question_id): self.choices(question_id, correct=True)}}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(
+            reverse("myapp:submit_quiz", args=[self.quiz.pk, attempt.pk]), {"from_draft": "1"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+        attempt.refresh_from_db()
+        self.assertIsNone(attempt.completed_at)
+        self.assertEqual(
+            draft_selections(attempt)[question_id], set(self.choices(question_id, correct=False))
+        )
+
+    async def test_async_submit_and_autosave_reject_adaptive_attempts(self):
+        await sync_to_async(self.client.get)(reverse("myapp:take_quiz", args=[self.quiz.pk]))
+        attempt = await Attempt.objects.aget(user=self.user, quiz=self.quiz)
+
+        async def auser():
+            return self.user
+
+        factory = AsyncRequestFactory()
+        autosave = factory.post("/", {"answers": {}}, content_type="application/json")
+        submit = factory.post("/", {"from_draft": "1"})
+
+        for view, request in ((async_views.autosave_attempt, autosave), (async_views.submit_quiz, submit)):
+            request.auser = auser
+            with self.subTest(view=view.__name__), self.assertRaises(Http404):
+                await view(request, self.quiz.pk, attempt.pk)
@@ -1,19 +1,44 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# ASGI deployments serve the read-heavy and submission paths asynchronously
+hot_views = async_views if settings.ASYNC_VIEWS else views
 
 app_name = "myapp"
 
 urlpatterns = [
-    path("", views.index, name="index"),
-    path("quizzes/", views.quiz_list, name="quiz_list"),
-    path("quiz/<int:pk>/", views.quiz_detail, name="quiz_detail"),
+    path("", hot_views.index, name="index"),
+    path("quizzes/", hot_views.quiz_list, name="quiz_list"),
+    path("quiz/<int:pk>/", hot_views.quiz_detail, name="quiz_detail"),
     path("quiz/<int:pk>/take/", views.take_quiz, name="take_quiz"),
-    path("quiz/<int:pk>/result/<int:attempt_id>/", views.result, name="result"),
+    path(
+        "quiz/<int:pk>/attempt/<int:attempt_id>/submit/",
+        hot_views.submit_quiz,
+        name="submit_quiz",
+    ),
+    path(
+        "quiz/<int:pk>/attempt/<int:attempt_id>/answer/",
+        views.answer_question,
+        name="answer_question",
+    ),
+    path(
+        "quiz/<int:pk>/attempt/<int:attempt_id>/autosave/",
+        hot_views.autosave_attempt,
+        name="autosave_attempt",
+    ),
+    path("quiz/<int:pk>/result/<int:attempt_id>/", hot_views.result, name="result"),
+
+    path("leaderboard/", views.leaderboard, name="leaderboard"),
+    path("quiz/<int:pk>/leaderboard/", views.leaderboard, name="quiz_leaderboard"),
 
     path("signup/", views.signup, name="signup"),
     path("profile/", views.profile, name="profile"),
     path("my-scores/", views.my_scores, name="my_scores"),
+    path("my-scores/export.csv", views.my_scores_export, name="my_scores_export"),
 
     path("about/", views.about, name="about"),
     path("contact/", views.contact, name="contact"),
+
+    path("metrics/", views.metrics, name="metrics"),
 ]
@@ -0,0 +1,139 @@
+import random
+
+from django.db import transaction
+from django.utils import timezone
+
+from myapp.models import Attempt, AttemptDraft, Question
+from myapp.utils.answer_key import get_answer_key
+from myapp.utils.attempts import (
+    QUESTIONS_PER_ATTEMPT,
+    fetch_questions,
+    save_draft,
+    draft_selections,
+)
+from myapp.utils.grading import grade_question, grade_submission, complete_attempt
+from myapp.utils.sampling import get_question_pool
+
+
+# Easiest to hardest; Attempt.adaptive_level indexes into this
+LEVELS = [value for value, _ in Question.DIFFICULTY_CHOICES]
+START_LEVEL = len(LEVELS) // 2
+
+# Random draws from a stratum before falling back to listing what is left
+RANDOM_DRAWS = 8
+
+
+# ------------------------------------------------
+# NEXT QUESTION (IN MEMORY, FROM THE CACHED POOL)
+# ------------------------------------------------
+def next_level(level, is_correct):
+    """
+    One step up after a correct answer, one step down otherwise
+    """
+    return min(level + 1, len(LEVELS) - 1) if is_correct else max(level - 1, 0)
+
+
+def pick_question_id(pool, level, used):
+    """
+    Draws an unused question id at `level`, or from the nearest level that
+    still has one. Returns (question_id, level), or (None, level) when the
+    quiz has run out of questions.
+    """
+    nearest = sorted(range(len(LEVELS)), key=lambda other: (abs(other - level), other))
+
+    for candidate in nearest:
+        ids = pool.get(LEVELS[candidate])
+        if not ids:
+            continue
+
+        for _ in range(RANDOM_DRAWS):
+            question_id = ids[random.randrange(len(ids))]
+            if question_id not in used:
+                return question_id, candidate
+
+        # Small or nearly used-up stratum
+        remaining = [question_id for question_id in ids if question_id not in used]
+        if remaining:
+            return random.choice(remaining), candidate
+
+    return None, level
+
+
+# ------------------------------------------------
+# START / ANSWER / FINISH
+# ------------------------------------------------
+def start_adaptive_attempt(user, quiz):
+    """
+    Creates an adaptive Attempt holding only its first question.
+    Returns (attempt, questions) like attempts.start_attempt().
+    """
+    question_id, level = pick_question_id(get_question_pool(quiz.id), START_LEVEL, set())
+    questions = fetch_questions([question_id]) if question_id else []
+
+    attempt = Attempt.objects.create(
+        user=user,
+        quiz=quiz,
+        question_ids=[q.id for q in questions],
+        total_marks=sum(q.marks for q in questions),
+        adaptive_level=level,
+    )
+
+    return attempt, questions
+
+
+@transaction.atomic
+def answer_question(attempt, question_id, choice_ids):
+    """
+    Stores the answer to the attempt's current question in its draft and
+    appends the next question, one level harder or easier. Answers to any
+    other question (stale page, double submit) are ignored.
+    Returns True once the attempt has no further question to show.
+    """
+    locked = Attempt.objects.select_for_update().get(pk=attempt.pk)
+    locked.quiz = attempt.quiz
+
+    if locked.completed_at is not None or not locked.question_ids:
+        return True
+    if locked.question_ids[-1] != question_id:
+        return False
+
+    save_draft(locked, {question_id: sorted(choice_ids)})
+
+    answer_key = get_answer_key(locked.quiz_id)
+    entry = answer_key.get(question_id)
+    is_correct = bool(entry) and grade_question(entry, set(choice_ids))[0]
+
+    if len(locked.question_ids) >= QUESTIONS_PER_ATTEMPT or timezone.now() >= locked.deadline:
+        return True
+
+    used = set(locked.question_ids)
+    next_id, level = pick_question_id(
+        get_question_pool(locked.quiz_id), next_level(locked.adaptive_level, is_correct), used
+    )
+
+    if next_id is None or next_id not in answer_key:
+        return True
+
+    locked.question_ids.append(next_id)
+    locked.total_marks += answer_key[next_id]["marks"]
+    locked.adaptive_level = level
+    locked.save(update_fields=["question_ids", "total_marks", "adaptive_level"])
+
+    attempt.question_ids = locked.question_ids
+    attempt.total_marks = locked.total_marks
+    attempt.adaptive_level = level
+
+    return False
+
+
+def finish_attempt(attempt):
+    """
+    Grades every answered question from the draft and completes the attempt
+    """
+    answer_key = get_answer_key(attempt.quiz_id)
+    question_ids = [qid for qid in attempt.question_ids if qid in answer_key]
+
+    results, score = grade_submission(answer_key, question_ids, draft_selections(attempt))
+
+    if complete_attempt(attempt, results, score):
+        AttemptDraft.objects.filter(attempt=attempt).delete()
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+
+from myapp.models import Question, Choice
+from myapp.utils.cache_versions import bump_version, versioned_key
+from myapp.utils.metrics import ANSWER_KEY_CACHE
+
+
+ANSWER_KEY_TIMEOUT = 60 * 60 * 24
+
+
+def _quiz_version_name(quiz_id):
+    return f"quiz:{quiz_id}"
+
+
+# ------------------------------------------------
+# COMPILE
+# ------------------------------------------------
+def compile_answer_key(quiz_id):
+    """
+    Builds {question_id: {"marks", "correct_ids", "correct_count", "difficulty"}}
+    for every question of a quiz (one Question query + one Choice query).
+    """
+    answer_key = {
+        question_id: {
+            "marks": marks,
+            "correct_ids": set(),
+            "correct_count": 0,
+            "difficulty": difficulty,
+        }
+        for question_id, marks, difficulty in (
+            Question.objects
+            .filter(quiz_id=quiz_id)
+            .order_by("id")
+            .values_list("id", "marks", "difficulty")
+        )
+    }
+
+    correct_choices = Choice.objects.filter(
+        question__quiz_id=quiz_id,
+        is_correct=True,
+    ).values_list("question_id", "id")
+
+    for question_id, choice_id in correct_choices:
+        entry = answer_key[question_id]
+        entry["correct_ids"].add(choice_id)
+        entry["correct_count"] += 1
+
+    for entry in answer_key.values():
+        entry["correct_ids"] = frozenset(entry["correct_ids"])
+
+    return answer_key
+
+
+# ------------------------------------------------
+# CACHED ACCESS
+# ------------------------------------------------
+def get_answer_key(quiz_id):
+    """
+    Returns the compiled answer key for a quiz, from cache when warm
+    """
+    key = versioned_key(_quiz_version_name(quiz_id), "answer_key")
+    answer_key = cache.get(key)
+
+    if answer_key is not None:
+        ANSWER_KEY_CACHE.inc("hit")
+        return answer_key
+
+    ANSWER_KEY_CACHE.inc("miss")
+    answer_key = compile_answer_key(quiz_id)
+    cache.set(key, answer_key, timeout=ANSWER_KEY_TIMEOUT)
+
+    return answer_key
+
+
+def invalidate_quiz(quiz_id):
+    """
+    Bumps the quiz version stamp so the next read recompiles the key
+    """
+    bump_version(_quiz_version_name(quiz_id))
@@ -0,0 +1,203 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from myapp.models import Attempt, AttemptDraft, Question
+from myapp.utils.catalogue import keyset_page
+from myapp.utils.sampling import sample_question_ids
+
+
+QUESTIONS_PER_ATTEMPT = 20
+
+# Extra time allowed after the deadline for the auto-submit to arrive
+SUBMIT_GRACE = timedelta(seconds=60)
+
+
+# ------------------------------------------------
+# START
+# ------------------------------------------------
+def start_attempt(user, quiz):
+    """
+    Samples the questions once and persists them on a new Attempt.
+    Returns (attempt, questions) so the caller can render without refetching.
+    """
+    question_ids = sample_question_ids(
+        quiz,
+        QUESTIONS_PER_ATTEMPT,
+        stratified=quiz.selection_mode == "stratified",
+    )
+
+    questions = fetch_questions(question_ids)
+
+    attempt = Attempt.objects.create(
+        user=user,
+        quiz=quiz,
+        question_ids=[q.id for q in questions],
+        total_marks=sum(q.marks for q in questions),
+    )
+
+    return attempt, questions
+
+
+def get_active_attempt(user, quiz):
+    """
+    Returns the user's in-progress attempt for this quiz if it is still
+    within its time limit, so a page reload resumes instead of re-sampling.
+    """
+    attempt = (
+        Attempt.objects
+        .filter(user=user, quiz=quiz, completed_at__isnull=True)
+        .order_by("-started_at")
+        .first()
+    )
+
+    if attempt is None:
+        return None
+
+    attempt.quiz = quiz
+
+    if timezone.now() > attempt.deadline:
+        return None
+
+    return attempt
+
+
+def is_submission_late(attempt, now=None):
+    now = now or timezone.now()
+    return now > attempt.deadline + SUBMIT_GRACE
+
+
+# ------------------------------------------------
+# QUESTIONS FOR AN ATTEMPT
+# ------------------------------------------------
+def fetch_questions(question_ids):
+    """
+    Fetches only the given questions (with choices), in the given order
+    """
+    questions = Question.objects.filter(
+        id__in=question_ids
+    ).prefetch_related("choices")
+
+    by_id = {q.id: q for q in questions}
+
+    return [by_id[qid] for qid in question_ids if qid in by_id]
+
+
+def load_attempt_questions(attempt):
+    return fetch_questions(attempt.question_ids)
+
+
+# ------------------------------------------------
+# DRAFTS (AUTOSAVE)
+# ------------------------------------------------
+MAX_DRAFT_CHOICES = 10
+
+
+def parse_draft_updates(payload, question_ids):
+    """
+    Validates {"answers": {"<question_id>": [choice_id, ...]}} against the
+    attempt's questions. Returns {question_id: sorted choice ids}.
+    Raises ValueError for anything malformed.
+    """
+    answers = payload.get("answers") if isinstance(payload, dict) else None
+    if not isinstance(answers, dict):
+        raise ValueError("Expected an 'answers' object")
+
+    allowed = set(question_ids)
+    updates = {}
+
+    for key, choice_ids in answers.items():
+        try:
+            question_id = int(key)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid question id: {key!r}")
+
+        if question_id not in allowed:
+            raise ValueError(f"Question {question_id} is not part of this attempt")
+
+        if (not isinstance(choice_ids, list)
+                or len(choice_ids) > MAX_DRAFT_CHOICES
+                or not all(isinstance(c, int) and not isinstance(c, bool) for c in choice_ids)):
+            raise ValueError(f"Invalid choices for question {question_id}")
+
+        updates[question_id] = sorted(set(choice_ids))
+
+    return updates
+
+
+@transaction.atomic
+def save_draft(attempt, updates):
+    """
+    Merges updates into the attempt's draft row (created on first save).
+    The row lock keeps concurrent autosaves from losing each other's answers.
+    """
+    draft, _ = AttemptDraft.objects.select_for_update().get_or_create(attempt=attempt)
+
+    for question_id, choice_ids in updates.items():
+        draft.selections[str(question_id)] = choice_ids
+
+    draft.saves += 1
+    draft.save()
+
+    return draft
+
+
+def draft_selections(attempt):
+    """
+    {question_id: set(choice_ids)} from the draft, empty if none was saved
+    """
+    draft = AttemptDraft.objects.filter(attempt=attempt).only("selections").first()
+    return _selections_from_draft(draft)
+
+
+async def adraft_selections(attempt):
+    draft = await AttemptDraft.objects.filter(attempt=attempt).only("selections").afirst()
+    return _selections_from_draft(draft)
+
+
+def _selections_from_draft(draft):
+    if draft is None:
+        return {}
+
+    return {int(qid): set(choice_ids) for qid, choice_ids in draft.selections.items()}
+
+
+# ------------------------------------------------
+# SCORE HISTORY
+# ------------------------------------------------
+HISTORY_EXPORT_CHUNK_SIZE = 2000
+
+
+def completed_attempts(user):
+    """
+    Finished attempts only; abandoned in-progress ones are left out
+    """
+    return Attempt.objects.filter(user=user, completed_at__isnull=False)
+
+
+def history_page(user, after, size):
+    """
+    Newest-first keyset page on (completed_at, id), served by
+    attempt_user_completed_idx. Returns (attempts, next_cursor).
+    """
+    attempts = (
+        completed_attempts(user)
+        .select_related("quiz")
+        .only("id", "score", "total_marks", "completed_at", "quiz__id", "quiz__title")
+    )
+
+    return keyset_page(attempts, after, size, field="completed_at")
+
+
+def iter_history_rows(user):
+    """
+    (quiz title, score, total marks, started, completed) tuples, newest
+    first, streamed from the database in chunks
+    """
+    return (
+        completed_attempts(user)
+        .order_by("-completed_at", "-id")
+        .values_list("quiz__title", "score", "total_marks", "started_at", "completed_at")
+        .iterator(chunk_size=HISTORY_EXPORT_CHUNK_SIZE)
+    )
@@ -0,0 +1,325 @@
+import asyncio
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from myapp.models import Attempt, Choice
+
+
+# Statements added by the benchmark's own rollback transaction
+_TRANSACTION_NOISE = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+# Latency changes smaller than this are treated as noise
+NOISE_FLOOR_MS = 2.0
+
+
+# ------------------------------------------------
+# SCENARIOS
+# ------------------------------------------------
+class Scenario:
+    """
+    One view under test. prepare() runs untimed before every request.
+    """
+
+    def __init__(self, name, request, prepare=None, expect=200):
+        self.name = name
+        self.request = request
+        self.prepare = prepare
+        self.expect = expect
+
+
+def _close_active_attempts(ctx):
+    Attempt.objects.filter(
+        user=ctx["user"], quiz=ctx["quiz"], completed_at__isnull=True,
+    ).update(completed_at=timezone.now())
+
+
+def _start_attempt(ctx):
+    """
+    Starts an attempt through the view and builds an all-correct submission
+    """
+    _close_active_attempts(ctx)
+    ctx["user_client"].get(reverse("myapp:take_quiz", args=[ctx["quiz"].id]))
+
+    attempt = (
+        Attempt.objects
+        .filter(user=ctx["user"], quiz=ctx["quiz"], completed_at__isnull=True)
+        .latest("started_at")
+    )
+
+    post = {}
+    for question_id, choice_id in Choice.objects.filter(
+        question_id__in=attempt.question_ids, is_correct=True,
+    ).values_list("question_id", "id"):
+        post.setdefault(f"question_{question_id}", []).append(str(choice_id))
+
+    ctx["submit_url"] = reverse("myapp:submit_quiz", args=[ctx["quiz"].id, attempt.id])
+    ctx["submit_data"] = post
+
+
+def build_scenarios():
+    def get(client, url_name, *arg_keys):
+        def request(ctx):
+            args = [ctx[key].id for key in arg_keys]
+            return ctx[client].get(reverse(f"myapp:{url_name}", args=args))
+        return request
+
+    return [
+        Scenario("index", get("anon_client", "index")),
+        Scenario("quiz_list", get("anon_client", "quiz_list")),
+        Scenario("quiz_detail", get("anon_client", "quiz_detail", "quiz")),
+        Scenario(
+            "take_quiz_get",
+            get("user_client", "take_quiz", "quiz"),
+            prepare=_close_active_attempts,
+        ),
+        Scenario(
+            "take_quiz_post",
+            lambda ctx: ctx["user_client"].post(ctx["submit_url"], ctx["submit_data"]),
+            prepare=_start_attempt,
+            expect=302,
+        ),
+        Scenario("result", get("user_client", "result", "quiz", "attempt")),
+        Scenario("profile", get("user_client", "profile")),
+        Scenario("my_scores", get("user_client", "my_scores")),
+    ]
+
+
+def pick_attempt():
+    """
+    A completed attempt on a published quiz by the user with the most attempts
+    """
+    return (
+        Attempt.objects
+        .filter(completed_at__isnull=False, quiz__is_published=True)
+        .select_related("user", "quiz")
+        .order_by(F("user__quiz_stats__total_attempts").desc(nulls_last=True), "-id")
+        .first()
+    )
+
+
+def default_context():
+    attempt = pick_attempt()
+
+    if attempt is None:
+        return None
+
+    user_client = Client()
+    user_client.force_login(attempt.user)
+
+    return {
+        "user": attempt.user,
+        "quiz": attempt.quiz,
+        "attempt": attempt,
+        "anon_client": Client(),
+        "user_client": user_client,
+    }
+
+
+# ------------------------------------------------
+# MEASUREMENT
+# ------------------------------------------------
+def _count_queries(captured):
+    return sum(
+        1 for q in captured
+        if not q["sql"].startswith(_TRANSACTION_NOISE)
+    )
+
+
+def summarize(timings_ms, query_counts):
+    percentiles = statistics.quantiles(timings_ms, n=100, method="inclusive")
+
+    return {
+        "p50_ms": round(percentiles[49], 2),
+        "p95_ms": round(percentiles[94], 2),
+        "p99_ms": round(percentiles[98], 2),
+        "mean_ms": round(statistics.fmean(timings_ms), 2),
+        "queries": max(query_counts),
+    }
+
+
+def run_scenario(scenario, ctx, iterations, warmup):
+    timings, queries = [], []
+
+    for i in range(warmup + iterations):
+        if scenario.prepare:
+            scenario.prepare(ctx)
+
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = scenario.request(ctx)
+            elapsed = (time.perf_counter() - start) * 1000
+
+        if response.status_code != scenario.expect:
+            raise RuntimeError(
+                f"{scenario.name}: expected HTTP {scenario.expect}, "
+                f"got {response.status_code}"
+            )
+
+        if i >= warmup:
+            timings.append(elapsed)
+            queries.append(_count_queries(captured.captured_queries))
+
+    return summarize(timings, queries)
+
+
+def run(iterations=50, warmup=3, only=None):
+    """
+    Benchmarks every scenario inside a transaction that is rolled back,
+    so repeated runs see the same data. Returns {name: summary} or None
+    when there is no completed attempt to benchmark with.
+    """
+    results = {}
+
+    with transaction.atomic():
+        ctx = default_context()
+        if ctx is None:
+            return None
+
+        for scenario in build_scenarios():
+            if only and scenario.name not in only:
+                continue
+            results[scenario.name] = run_scenario(scenario, ctx, iterations, warmup)
+
+        transaction.set_rollback(True)
+
+    return results
+
+
+# ------------------------------------------------
+# BASELINE
+# ------------------------------------------------
+def save_baseline(path, results, iterations):
+    data = {
+        "meta": {
+            "created": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "iterations": iterations,
+        },
+        "views": results,
+    }
+
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)["views"]
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Returns [(view, message)] for views with more queries than the
+    baseline or a p95 more than `tolerance` slower (beyond the noise floor)
+    """
+    regressions = []
+
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+
+        if current["queries"] > previous["queries"]:
+            regressions.append((
+                name,
+                f"queries {previous['queries']} -> {current['queries']}",
+            ))
+
+        limit = previous["p95_ms"] * (1 + tolerance)
+        if (current["p95_ms"] > limit
+                and current["p95_ms"] - previous["p95_ms"] > NOISE_FLOOR_MS):
+            regressions.append((
+                name,
+                f"p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms",
+            ))
+
+    return regressions
+
+
+# ------------------------------------------------
+# THROUGHPUT (WSGI vs ASGI)
+# ------------------------------------------------
+# Closed-loop load: `concurrency` workers each send their share of the
+# requests back to back. WSGI workers are threads, each with its own
+# Client, standing in for sync worker processes. ASGI workers are
+# coroutines on one event loop, sharing the process like an ASGI server.
+
+def throughput_paths(attempt):
+    return {
+        "index": reverse("myapp:index"),
+        "quiz_list": reverse("myapp:quiz_list"),
+        "quiz_detail": reverse("myapp:quiz_detail", args=[attempt.quiz_id]),
+        "result": reverse("myapp:result", args=[attempt.quiz_id, attempt.id]),
+    }
+
+
+def _throughput_summary(latencies_ms, seconds):
+    percentiles = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+
+    return {
+        "rps": round(len(latencies_ms) / seconds, 1),
+        "p50_ms": round(percentiles[49], 2),
+        "p95_ms": round(percentiles[94], 2),
+    }
+
+
+def run_wsgi_throughput(user, path, concurrency, requests):
+    def worker(count):
+        client = Client()
+        client.force_login(user)
+        latencies = []
+
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                response = client.get(path)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path}: HTTP {response.status_code}")
+        finally:
+            connections.close_all()
+
+        return latencies
+
+    shares = [requests // concurrency] * concurrency
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [ms for batch in pool.map(worker, shares) for ms in batch]
+
+    return _throughput_summary(latencies, time.perf_counter() - start)
+
+
+def run_asgi_throughput(user, path, concurrency, requests):
+    async def worker(count):
+        client = AsyncClient()
+        await client.aforce_login(user)
+        latencies = []
+
+        for _ in range(count):
+            start = time.perf_counter()
+            response = await client.get(path)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path}: HTTP {response.status_code}")
+
+        return latencies
+
+    async def main():
+        start = time.perf_counter()
+        batches = await asyncio.gather(
+            *(worker(requests // concurrency) for _ in range(concurrency))
+        )
+        return [ms for batch in batches for ms in batch], time.perf_counter() - start
+
+    latencies, seconds = asyncio.run(main())
+    return _throughput_summary(latencies, seconds)
@@ -0,0 +1,52 @@
+import time
+
+from django.core.cache import cache
+
+
+# ------------------------------------------------
+# VERSION STAMPS
+# ------------------------------------------------
+# Cached data is stored under keys that include a version stamp.
+# Bumping the stamp makes every key built from the old one unreachable,
+# so invalidation never has to know which keys exist.
+
+def _version_key(name):
+    return f"version:{name}"
+
+
+def get_version(name):
+    """
+    Returns the current version stamp for `name`.
+    A missing stamp (first use or evicted) starts from the current time,
+    so it can never collide with a stamp used before.
+    """
+    key = _version_key(name)
+    version = cache.get(key)
+
+    if version is None:
+        version = int(time.time() * 1000)
+        cache.add(key, version, timeout=None)
+        version = cache.get(key, version)
+
+    return version
+
+
+def bump_version(name):
+    """
+    Invalidates everything cached under `name`
+    """
+    key = _version_key(name)
+
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Not cached yet: a fresh stamp is already a new version
+        return get_version(name)
+
+
+def versioned_key(name, *parts):
+    """
+    Builds a cache key tied to the current version of `name`
+    """
+    suffix = ":".join(str(p) for p in parts)
+    return f"{name}:v{get_version(name)}:{suffix}"
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from myapp.models import Category, Question
+from myapp.utils.cache_versions import versioned_key
+
+
+CATEGORY_COUNTS_TIMEOUT = 60 * 60
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+# ------------------------------------------------
+# CATEGORY QUESTION COUNTS (CACHED)
+# ------------------------------------------------
+def category_question_counts():
+    """
+    [{"id", "name", "slug", "question_count"}] for categories with
+    questions, ordered by name. Recomputed only when the catalogue changes.
+    """
+    key = versioned_key("catalogue", "category_counts")
+    categories = cache.get(key)
+
+    if categories is None:
+        counts = dict(
+            Question.objects
+            .filter(quiz__category__isnull=False)
+            .values("quiz__category")
+            .annotate(n=Count("id"))
+            .order_by()
+            .values_list("quiz__category", "n")
+        )
+
+        categories = [
+            {
+                "id": c.id,
+                "name": c.name,
+                "slug": c.slug,
+                "question_count": counts[c.id],
+            }
+            for c in Category.objects.filter(id__in=counts).order_by("name")
+        ]
+        cache.set(key, categories, timeout=CATEGORY_COUNTS_TIMEOUT)
+
+    return categories
+
+
+# ------------------------------------------------
+# KEYSET PAGINATION
+# ------------------------------------------------
+def encode_cursor(obj, field="created_at"):
+    micros = (getattr(obj, field) - EPOCH) // MICROSECOND
+    return f"{micros}_{obj.id}"
+
+
+def decode_cursor(token):
+    """
+    Returns (timestamp, id) or None for a missing / malformed cursor
+    """
+    try:
+        micros, obj_id = token.split("_")
+        return EPOCH + int(micros) * MICROSECOND, int(obj_id)
+    except (AttributeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def _keyset_queryset(queryset, after, field):
+    queryset = queryset.order_by(f"-{field}", "-id")
+
+    cursor = decode_cursor(after) if after else None
+    if cursor:
+        timestamp, obj_id = cursor
+        queryset = queryset.filter(
+            Q(**{f"{field}__lt": timestamp})
+            | Q(**{field: timestamp, "id__lt": obj_id})
+        )
+
+    return queryset
+
+
+def _split_page(items, size, field):
+    next_cursor = encode_cursor(items[size - 1], field) if len(items) > size else None
+    return items[:size], next_cursor
+
+
+def keyset_page(queryset, after, size, field="created_at"):
+    """
+    Newest-first page that starts after the cursor, served by an index
+    ending in (-<field>, -id). Returns (items, next_cursor).
+    """
+    queryset = _keyset_queryset(queryset, after, field)
+    return _split_page(list(queryset[:size + 1]), size, field)
+
+
+async def akeyset_page(queryset, after, size, field="created_at"):
+    """
+    keyset_page() for async views
+    """
+    queryset = _keyset_queryset(queryset, after, field)
+    return _split_page([obj async for obj in queryset[:size + 1]], size, field)
@@ -0,0 +1,63 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+# Below this many rows an exact COUNT(*) is cheap enough to keep
+EXACT_COUNT_THRESHOLD = 10_000
+
+
+# ------------------------------------------------
+# TABLE SIZE ESTIMATES
+# ------------------------------------------------
+def estimated_row_count(model, using="default"):
+    """
+    Approximate row count of `model`'s table without scanning it, or
+    None if the backend has no cheap estimate.
+    PostgreSQL: planner statistics (pg_class.reltuples, kept fresh by
+    autovacuum). Others: the highest primary key, which over-counts only
+    by the rows deleted so far.
+    """
+    connection = connections[using]
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # -1: never analyzed
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
+
+    if model._meta.pk.get_internal_type() not in ("AutoField", "BigAutoField"):
+        return None
+
+    return model._default_manager.using(using).aggregate(n=Max("pk"))["n"] or 0
+
+
+# ------------------------------------------------
+# ADMIN PAGINATOR
+# ------------------------------------------------
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the table size estimate for unfiltered changelists of big tables,
+    where COUNT(*) would read every row. Filtered or small result sets
+    are still counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+
+        if not getattr(queryset, "query", None) or queryset.query.where:
+            return super().count
+
+        estimate = estimated_row_count(queryset.model, queryset.db)
+        if estimate is None or estimate < EXACT_COUNT_THRESHOLD:
+            return super().count
+
+        return estimate
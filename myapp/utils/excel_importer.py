@@ -1,107 +1,345 @@
+import time
+from functools import partial
+from dataclasses import dataclass
+from collections import Counter
+from itertools import islice
+
 from openpyxl import load_workbook
+from django.db import transaction
 from django.utils.text import slugify
 
 from myapp.models import Category, Quiz, Question, Choice
+from myapp.utils.answer_key import invalidate_quiz
+from myapp.utils.cache_versions import bump_version
+from myapp.utils import search, quiz_stats
+
+
+REQUIRED_HEADERS = [
+    "Category", "Quiz Title", "Question",
+    "A", "B", "C", "D",
+    "Correct", "Difficulty", "Marks"
+]
+
+OPTION_LETTERS = ("A", "B", "C", "D")
+
+# Cells that must not be blank for a row to import
+REQUIRED_CELLS = ("Category", "Quiz Title", "Question")
+
+IMPORT_BATCH_SIZE = 1000
 
 
 # ------------------------------------------------
 # STEP 1: READ & PARSE EXCEL
 # ------------------------------------------------
+def iter_excel_rows(file):
+    """
+    Streams row dictionaries from the active sheet (openpyxl read-only mode),
+    so memory does not grow with the number of rows
+    """
+    wb = load_workbook(file, read_only=True, data_only=True)
+
+    try:
+        sheet = wb.active
+        rows = sheet.iter_rows(values_only=True)
+
+        headers = list(next(rows, None) or [])
+
+        for h in REQUIRED_HEADERS:
+            if h not in headers:
+                raise ValueError(f"Missing required column: {h}")
+
+        for row in rows:
+            if not row or not row[0]:
+                continue
+
+            yield dict(zip(headers, row))
+    finally:
+        wb.close()
+
+
 def parse_excel(file):
     """
     Reads Excel file and returns list of row dictionaries
     """
-    wb = load_workbook(file)
-    sheet = wb.active
+    return list(iter_excel_rows(file))
 
-    headers = [cell.value for cell in sheet[1]]
 
-    required_headers = [
-        "Category", "Quiz Title", "Question",
-        "A", "B", "C", "D",
-        "Correct", "Difficulty", "Marks"
-    ]
+# ------------------------------------------------
+# PREVIEW HELPERS (BOUNDED MEMORY)
+# ------------------------------------------------
+def preview_row(row):
+    """
+    Small, template-friendly view of one sheet row
+    """
+    return {
+        "category": row.get("Category"),
+        "quiz": row.get("Quiz Title"),
+        "question": row.get("Question"),
+        "difficulty": row.get("Difficulty"),
+        "marks": row.get("Marks"),
+        "correct": row.get("Correct"),
+    }
 
-    for h in required_headers:
-        if h not in headers:
-            raise ValueError(f"Missing required column: {h}")
 
-    data = []
+def read_page(file, page, per_page):
+    """
+    Returns the rows of one preview page without loading the whole sheet
+    """
+    start = (page - 1) * per_page
+    rows = iter_excel_rows(file)
 
-    for row in sheet.iter_rows(min_row=2, values_only=True):
-        if not row[0]:
-            continue
+    try:
+        return [
+            preview_row(row)
+            for row in islice(rows, start, start + per_page)
+        ]
+    finally:
+        rows.close()
 
-        row_data = dict(zip(headers, row))
-        data.append(row_data)
 
-    return data
+def summarize_rows(rows, top=20):
+    """
+    One streaming pass over the sheet: counts only, never the rows
+    """
+    total = 0
+    invalid = 0
+    quizzes = Counter()
+    categories = Counter()
+    difficulties = Counter()
+
+    for row in rows:
+        total += 1
+
+        if not row.get("Question") or not row.get("Correct"):
+            invalid += 1
+
+        quizzes[str(row.get("Quiz Title") or "").strip()] += 1
+        categories[str(row.get("Category") or "").strip()] += 1
+        difficulties[str(row.get("Difficulty") or "easy").lower()] += 1
+
+    return {
+        "total_rows": total,
+        "invalid_rows": invalid,
+        "quiz_count": len(quizzes),
+        "category_count": len(categories),
+        "top_quizzes": quizzes.most_common(top),
+        "difficulties": sorted(difficulties.items()),
+    }
 
 
 # ------------------------------------------------
 # STEP 2: IMPORT INTO DATABASE
 # ------------------------------------------------
-def import_parsed_data(parsed_data):
+@dataclass
+class ImportReport:
+    rows: int = 0
+    failed_rows: int = 0
+    questions: int = 0
+    choices: int = 0
+    categories_created: int = 0
+    quizzes_created: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.rows} rows, {self.questions} questions, "
+            f"{self.choices} choices in {self.seconds:.1f}s "
+            f"({self.rows_per_sec:.0f} rows/sec)"
+        )
+
+
+class _Resolver:
     """
-    Creates Category, Quiz, Question & Choices from parsed excel data
+    In-memory Category / Quiz lookup so each name hits the DB at most once
     """
 
-    for row in parsed_data:
+    def __init__(self, report):
+        self.report = report
+        self.categories = {}
+        self.quizzes = {}
+        # Quizzes of committed chunks / of the chunk being written
+        self.touched_quiz_ids = set()
+        self.chunk_quiz_ids = set()
 
-        # -----------------------------
-        # CATEGORY
-        # -----------------------------
-        category, _ = Category.objects.get_or_create(
-            name=row["Category"].strip(),
-            defaults={"slug": slugify(row["Category"])}
-        )
+    def commit(self):
+        self.touched_quiz_ids |= self.chunk_quiz_ids
+        self.chunk_quiz_ids.clear()
 
-        # -----------------------------
-        # QUIZ
-        # -----------------------------
-        quiz, _ = Quiz.objects.get_or_create(
-            title=row["Quiz Title"].strip(),
-            defaults={
-                "category": category,
-                "description": "Imported via Excel",
-                "is_published": True,
-                "time_limit": 10,
-            }
-        )
+    def reset(self):
+        # Objects created inside a rolled-back chunk no longer exist
+        self.categories.clear()
+        self.quizzes.clear()
+        self.chunk_quiz_ids.clear()
+
+    def category(self, name):
+        name = name.strip()
+
+        if name not in self.categories:
+            category, created = Category.objects.get_or_create(
+                name=name,
+                defaults={"slug": slugify(name)}
+            )
+            self.report.categories_created += created
+            self.categories[name] = category
+
+        return self.categories[name]
+
+    def quiz(self, title, category):
+        title = title.strip()
+
+        if title not in self.quizzes:
+            quiz = Quiz.objects.filter(title=title).order_by("id").first()
 
-        # -----------------------------
-        # QUESTION
-        # -----------------------------
-        question = Question.objects.create(
+            if quiz is None:
+                quiz = Quiz.objects.create(
+                    title=title,
+                    category=category,
+                    description="Imported via Excel",
+                    is_published=True,
+                    time_limit=10,
+                )
+                self.report.quizzes_created += 1
+
+            self.quizzes[title] = quiz
+            self.chunk_quiz_ids.add(quiz.id)
+
+        return self.quizzes[title]
+
+
+def _correct_letters(row):
+    # CORRECT ANSWERS (A,B,C or A)
+    return (
+        str(row["Correct"] or "")
+        .upper()
+        .replace(" ", "")
+        .split(",")
+    )
+
+
+def _validate_row(row, row_number):
+    for header in REQUIRED_CELLS:
+        if not str(row.get(header) or "").strip():
+            raise ValueError(f"Row {row_number}: {header} is blank")
+
+
+def _import_chunk(rows, resolver, report, first_row):
+    """
+    Writes one chunk: one bulk INSERT for questions, one for choices.
+    Runs inside the chunk's transaction (see import_rows).
+    Raises ValueError naming the first invalid row.
+    """
+    questions = []
+
+    for row_number, row in enumerate(rows, start=first_row):
+        _validate_row(row, row_number)
+
+        category = resolver.category(str(row["Category"]))
+        quiz = resolver.quiz(str(row["Quiz Title"]), category)
+
+        questions.append(Question(
             quiz=quiz,
-            text=row["Question"].strip(),
+            text=str(row["Question"]).strip(),
             difficulty=(row.get("Difficulty") or "easy").lower(),
             marks=int(row.get("Marks") or 1),
-        )
+        ))
 
-        # -----------------------------
-        # CORRECT ANSWERS (A,B,C or A)
-        # -----------------------------
-        correct_letters = (
-            row["Correct"]
-            .upper()
-            .replace(" ", "")
-            .split(",")
-        )
+    Question.objects.bulk_create(questions)
 
-        # -----------------------------
-        # OPTIONS
-        # -----------------------------
-        options = {
-            "A": row["A"],
-            "B": row["B"],
-            "C": row["C"],
-            "D": row["D"],
-        }
-
-        for letter, text in options.items():
-            Choice.objects.create(
+    # bulk_create sends no post_save: index in the same transaction
+    search.index_questions(questions)
+
+    choices = []
+
+    for row, question in zip(rows, questions):
+        correct_letters = _correct_letters(row)
+
+        for letter in OPTION_LETTERS:
+            choices.append(Choice(
                 question=question,
-                text=str(text).strip(),
+                text=str(row[letter]).strip(),
                 is_correct=letter in correct_letters
-            )
+            ))
+
+    Choice.objects.bulk_create(choices)
+
+    report.rows += len(rows)
+    report.questions += len(questions)
+    report.choices += len(choices)
+
+
+def _invalidate_quizzes(quiz_ids):
+    for quiz_id in quiz_ids:
+        invalidate_quiz(quiz_id)
+    bump_version("catalogue")
+
+
+def import_rows(rows, batch_size=IMPORT_BATCH_SIZE, on_progress=None, on_error=None):
+    """
+    Creates Category, Quiz, Question & Choices from any iterable of row
+    dictionaries, in chunks of `batch_size` rows.
+    Each chunk is its own transaction; wrap the call in transaction.atomic()
+    for all-or-nothing behaviour. Returns an ImportReport.
+
+    If `on_error(first_row, chunk_size, exc)` is given (first_row being the
+    1-based data row the chunk starts at), a failing chunk is
+    rolled back, reported and skipped instead of aborting the import.
+
+    `on_progress(report)` runs after each chunk, inside the chunk's
+    transaction when it succeeded, so progress it records always matches
+    the committed rows.
+    """
+    report = ImportReport()
+    resolver = _Resolver(report)
+    started = time.monotonic()
+    rows = iter(rows)
+
+    try:
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+
+            first_row = report.rows + report.failed_rows + 1
+
+            try:
+                with transaction.atomic():
+                    _import_chunk(chunk, resolver, report, first_row)
+                    report.seconds = time.monotonic() - started
+
+                    if on_progress:
+                        on_progress(report)
+                resolver.commit()
+            except Exception as e:
+                if on_error is None:
+                    raise
+                resolver.reset()
+                on_error(first_row, len(chunk), e)
+                report.failed_rows += len(chunk)
+                report.seconds = time.monotonic() - started
+
+                if on_progress:
+                    on_progress(report)
+    finally:
+        # bulk_create does not send signals: refresh question counts here,
+        # and invalidate answer keys once the caller's transaction commits
+        touched_quiz_ids = set(resolver.touched_quiz_ids)
+        for quiz_id in touched_quiz_ids:
+            quiz_stats.refresh_question_counts(quiz_id, create=True)
+        if touched_quiz_ids:
+            transaction.on_commit(partial(_invalidate_quizzes, touched_quiz_ids))
+
+    report.seconds = time.monotonic() - started
+    return report
+
+
+@transaction.atomic
+def import_parsed_data(parsed_data, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Creates Category, Quiz, Question & Choices from parsed excel data
+    (all rows or none)
+    """
+    return import_rows(parsed_data, batch_size=batch_size)
@@ -0,0 +1,115 @@
+from django.db import transaction
+from django.utils import timezone
+
+from myapp.models import Attempt, Answer
+from myapp.signals import attempt_completed
+
+
+# ------------------------------------------------
+# SCORING (IN MEMORY)
+# ------------------------------------------------
+def grade_question(entry, selected_ids):
+    """
+    Returns (is_correct, marks_awarded) for one question
+    """
+    correct_ids = entry["correct_ids"]
+
+    # ❌ Unanswered
+    if not selected_ids:
+        return False, 0
+
+    # ❌ Any wrong option selected
+    if not selected_ids.issubset(correct_ids):
+        return False, 0
+
+    # ✅ All correct selected
+    if selected_ids == correct_ids:
+        return True, entry["marks"]
+
+    # 🟡 Partial correct (multi-correct only)
+    return False, round(
+        entry["marks"] * (len(selected_ids) / len(correct_ids)), 2
+    )
+
+
+def selections_from_post(post_data, question_ids):
+    """
+    Reads question_<id> checkboxes / radios into {question_id: set(choice_ids)}
+    """
+    selections = {}
+
+    for question_id in question_ids:
+        selected_ids = post_data.getlist(f"question_{question_id}")
+        selections[question_id] = {
+            int(choice_id) for choice_id in selected_ids if choice_id.isdigit()
+        }
+
+    return selections
+
+
+def grade_submission(answer_key, question_ids, selections):
+    """
+    Scores every question in memory against a compiled answer key
+    (see myapp.utils.answer_key).
+    Returns (results, score) where results is a list of row dictionaries.
+    """
+    results = []
+    score = 0
+
+    for question_id in question_ids:
+        selected_ids = selections.get(question_id, set())
+        is_correct, marks_awarded = grade_question(
+            answer_key[question_id],
+            selected_ids,
+        )
+
+        results.append({
+            "question_id": question_id,
+            "selected_choice_ids": sorted(selected_ids),
+            "is_correct": is_correct,
+            "marks_awarded": marks_awarded,
+        })
+
+        score += marks_awarded
+
+    return results, score
+
+
+# ------------------------------------------------
+# PERSIST ATTEMPT + ANSWERS
+# ------------------------------------------------
+@transaction.atomic
+def complete_attempt(attempt, results, score):
+    """
+    Marks an in-progress Attempt as completed and writes all its Answers
+    in one transaction (one UPDATE, one bulk INSERT), then sends
+    attempt_completed so summary tables update in the same transaction.
+    Returns False if the attempt was already completed (double submit).
+    """
+    now = timezone.now()
+
+    updated = Attempt.objects.filter(
+        pk=attempt.pk,
+        completed_at__isnull=True,
+    ).update(score=score, completed_at=now)
+
+    if not updated:
+        return False
+
+    attempt.score = score
+    attempt.completed_at = now
+
+    Answer.objects.bulk_create([
+        Answer(
+            attempt=attempt,
+            question_id=row["question_id"],
+            selected_choice_ids=row["selected_choice_ids"],
+            is_correct=row["is_correct"],
+            marks_awarded=row["marks_awarded"],
+        )
+        for row in results
+    ])
+
+    attempt_completed.send(sender=Attempt, attempt=attempt)
+
+    return True
@@ -0,0 +1,151 @@
+import logging
+from datetime import timedelta
+from itertools import islice
+
+from django.db.models import Q
+from django.utils import timezone
+
+from myapp.models import ImportJob
+from myapp.utils.excel_importer import iter_excel_rows, import_rows
+
+
+logger = logging.getLogger(__name__)
+
+# Keep the error list small enough to poll cheaply
+MAX_STORED_ERRORS = 100
+
+# A running job with no heartbeat for this long lost its worker (killed,
+# OOM, deploy). Much longer than one chunk takes to import.
+STALE_JOB_TIMEOUT = timedelta(minutes=10)
+
+
+# ------------------------------------------------
+# ENQUEUE
+# ------------------------------------------------
+def enqueue_import(file_name, user=None, original_name="", total_rows=None):
+    """
+    Records a pending job for a file already saved to default storage.
+    The request path stops here; a worker picks the job up.
+    """
+    return ImportJob.objects.create(
+        file=file_name,
+        original_name=original_name,
+        created_by=user,
+        total_rows=total_rows,
+    )
+
+
+# ------------------------------------------------
+# WORKER
+# ------------------------------------------------
+def claim_next_job():
+    """
+    Atomically moves the oldest pending job, or a running job whose worker
+    went away, to running.
+    Safe with several workers: only one conditional UPDATE can win.
+    """
+    now = timezone.now()
+    claimable = (
+        ImportJob.objects
+        .filter(Q(status="pending") | Q(status="running", heartbeat_at__lt=now - STALE_JOB_TIMEOUT))
+        .order_by("created_at", "id")
+    )
+
+    for job_id, status, heartbeat_at in claimable.values_list("id", "status", "heartbeat_at")[:5]:
+        # Matching the heartbeat too: two workers cannot take over the same job
+        claimed = ImportJob.objects.filter(
+            id=job_id, status=status, heartbeat_at=heartbeat_at,
+        ).update(
+            status="running",
+            heartbeat_at=now,
+            **({"started_at": now} if status == "pending" else {}),
+        )
+        if claimed:
+            return ImportJob.objects.get(id=job_id)
+
+    return None
+
+
+def _finish(job, **fields):
+    """
+    Deletes the staged upload and records the final status.
+    original_name still says which file it was.
+    """
+    try:
+        job.file.delete(save=False)
+        fields["file"] = ""
+    except OSError:
+        logger.warning("Import #%s: could not delete %s", job.pk, job.file.name)
+
+    ImportJob.objects.filter(pk=job.pk).update(finished_at=timezone.now(), **fields)
+
+
+def run_job(job):
+    """
+    Streams the job's file through the bulk importer, saving progress
+    and errors after every chunk. A job taken over from a dead worker
+    resumes after the rows that worker already committed.
+    """
+    # Progress is saved in each chunk's transaction, so these rows are
+    # exactly the ones already imported (or reported as failed)
+    skipped = job.processed_rows + job.failed_rows
+    processed_before, failed_before = job.processed_rows, job.failed_rows
+
+    def progress(report):
+        ImportJob.objects.filter(pk=job.pk).update(
+            processed_rows=processed_before + report.rows,
+            failed_rows=failed_before + report.failed_rows,
+            heartbeat_at=timezone.now(),
+        )
+
+    def chunk_failed(first_row, chunk_size, exc):
+        first_row += skipped
+        last_row = first_row + chunk_size - 1
+        logger.warning("Import #%s rows %s-%s failed: %s", job.pk, first_row, last_row, exc)
+
+        if len(job.errors) < MAX_STORED_ERRORS:
+            job.errors.append(f"Rows {first_row}-{last_row}: {exc}")
+            ImportJob.objects.filter(pk=job.pk).update(errors=job.errors)
+
+    if skipped:
+        logger.info("Import #%s resuming after row %s", job.pk, skipped)
+
+    try:
+        with job.file.open("rb") as f:
+            report = import_rows(
+                islice(iter_excel_rows(f), skipped, None),
+                on_progress=progress,
+                on_error=chunk_failed,
+            )
+    except Exception as e:
+        logger.exception("Import #%s failed", job.pk)
+        job.errors.append(str(e))
+        _finish(job, status="failed", errors=job.errors[:MAX_STORED_ERRORS + 1])
+        return
+
+    processed_rows = processed_before + report.rows
+    failed_rows = failed_before + report.failed_rows
+
+    _finish(
+        job,
+        status="done",
+        processed_rows=processed_rows,
+        failed_rows=failed_rows,
+        total_rows=processed_rows + failed_rows,
+    )
+    logger.info("Import #%s done: %s", job.pk, report)
+
+
+def run_pending_jobs():
+    """
+    Processes jobs until the queue is empty. Returns the number run.
+    """
+    count = 0
+
+    while True:
+        job = claim_next_job()
+        if job is None:
+            return count
+
+        run_job(job)
+        count += 1
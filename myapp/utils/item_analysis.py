@@ -0,0 +1,261 @@
+from datetime import timedelta
+from itertools import chain
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from myapp.models import Attempt, Answer, QuestionStats
+
+
+ANALYSIS_CHUNK_SIZE = 20_000
+
+# Classic item-analysis split: top and bottom 27% of attempts by score
+GROUP_FRACTION = 0.27
+
+COUNT_FIELDS = (
+    "responses", "correct", "marks_total",
+    "upper_responses", "upper_correct", "lower_responses", "lower_correct",
+)
+DERIVED_FIELDS = ("difficulty_index", "discrimination_index", "avg_marks")
+
+# Answers are only analysed once their attempt completed this long ago.
+# Ids are allocated before commit: a grading transaction still open could
+# hold ids below the newest committed answer, and the watermark would
+# skip them forever.
+SETTLE_TIME = timedelta(minutes=5)
+
+
+# ------------------------------------------------
+# SCORE GROUPS (UPPER / LOWER 27% PER QUIZ)
+# ------------------------------------------------
+def _score_ratios(scores, totals):
+    return np.divide(scores, totals, out=np.zeros_like(scores), where=totals > 0)
+
+
+class _GroupCutoffs:
+    """
+    Per-quiz score-ratio cutoffs, computed once per run from the quiz's
+    completed attempts. Answers are classified with the cutoffs of the
+    run that first counts them; a full refresh reclassifies everything.
+    """
+
+    def __init__(self):
+        self._cutoffs = {}
+
+    def for_quizzes(self, quiz_ids):
+        """
+        (lower, upper) arrays aligned with `quiz_ids`. NaN where the quiz
+        has no spread of scores to split.
+        """
+        missing = set(quiz_ids.tolist()) - self._cutoffs.keys()
+        if missing:
+            self._load(missing)
+
+        pairs = np.array([self._cutoffs[q] for q in quiz_ids.tolist()], dtype=float)
+        return pairs[:, 0], pairs[:, 1]
+
+    def _load(self, quiz_ids):
+        rows = np.array(
+            Attempt.objects
+            .filter(quiz_id__in=quiz_ids, completed_at__isnull=False)
+            .values_list("quiz_id", "score", "total_marks"),
+            dtype=float,
+        ).reshape(-1, 3)
+
+        ratios = _score_ratios(rows[:, 1], rows[:, 2])
+
+        for quiz_id in quiz_ids:
+            quiz_ratios = ratios[rows[:, 0] == quiz_id]
+            lower, upper = (
+                np.quantile(quiz_ratios, [GROUP_FRACTION, 1 - GROUP_FRACTION])
+                if len(quiz_ratios) else (np.nan, np.nan)
+            )
+            # Everyone scored the same: no upper / lower group
+            self._cutoffs[quiz_id] = (lower, upper) if upper > lower else (np.nan, np.nan)
+
+
+# ------------------------------------------------
+# ONE CHUNK OF ANSWERS -> PER-QUESTION SUMS
+# ------------------------------------------------
+def _attempt_groups(attempt_ids, cutoffs):
+    """
+    +1 (upper), -1 (lower) or 0 for each of `attempt_ids` (unique ids)
+    """
+    rows = np.array(
+        Attempt.objects
+        .filter(id__in=attempt_ids.tolist())
+        .order_by("id")
+        .values_list("id", "quiz_id", "score", "total_marks"),
+        dtype=float,
+    ).reshape(-1, 4)
+
+    ratios = _score_ratios(rows[:, 2], rows[:, 3])
+    lower, upper = cutoffs.for_quizzes(rows[:, 1].astype(np.int64))
+
+    groups = np.zeros(len(rows), dtype=np.int8)
+    groups[ratios >= upper] = 1
+    groups[ratios <= lower] = -1
+
+    # Align with attempt_ids (both sorted by id)
+    order = np.searchsorted(rows[:, 0].astype(np.int64), attempt_ids)
+    return groups[order]
+
+
+def summarize_chunk(answers, cutoffs):
+    """
+    answers: list of (id, question_id, attempt_id, is_correct, marks_awarded,
+    selected_choice_ids, selected_choice_id) tuples.
+    Returns (question_ids, {count field: array}, {question_id: {choice_id: n}}).
+    """
+    question_col = np.fromiter((a[1] for a in answers), dtype=np.int64, count=len(answers))
+    attempt_col = np.fromiter((a[2] for a in answers), dtype=np.int64, count=len(answers))
+    correct_col = np.fromiter((a[3] for a in answers), dtype=np.float64, count=len(answers))
+    marks_col = np.fromiter((a[4] for a in answers), dtype=np.float64, count=len(answers))
+
+    question_ids, question_idx = np.unique(question_col, return_inverse=True)
+    attempt_ids, attempt_idx = np.unique(attempt_col, return_inverse=True)
+    groups = _attempt_groups(attempt_ids, cutoffs)[attempt_idx]
+
+    upper = (groups == 1).astype(np.float64)
+    lower = (groups == -1).astype(np.float64)
+    size = len(question_ids)
+
+    sums = {
+        "responses": np.bincount(question_idx, minlength=size),
+        "correct": np.bincount(question_idx, weights=correct_col, minlength=size),
+        "marks_total": np.bincount(question_idx, weights=marks_col, minlength=size),
+        "upper_responses": np.bincount(question_idx, weights=upper, minlength=size),
+        "upper_correct": np.bincount(question_idx, weights=upper * correct_col, minlength=size),
+        "lower_responses": np.bincount(question_idx, weights=lower, minlength=size),
+        "lower_correct": np.bincount(question_idx, weights=lower * correct_col, minlength=size),
+    }
+
+    # Distractor frequency: one (question, choice) pair per selected choice.
+    # Answers stored before selected_choice_ids existed only have the FK.
+    selections = [
+        a[5] or ([a[6]] if a[6] is not None else []) for a in answers
+    ]
+    per_answer = np.fromiter((len(s) for s in selections), dtype=np.int64, count=len(answers))
+    pairs = np.column_stack((
+        np.repeat(question_col, per_answer),
+        np.fromiter(chain.from_iterable(selections), dtype=np.int64, count=int(per_answer.sum())),
+    ))
+
+    choice_counts = {}
+    if len(pairs):
+        unique_pairs, counts = np.unique(pairs, axis=0, return_counts=True)
+        for (question_id, choice_id), n in zip(unique_pairs.tolist(), counts.tolist()):
+            choice_counts.setdefault(question_id, {})[str(choice_id)] = n
+
+    return question_ids, sums, choice_counts
+
+
+# ------------------------------------------------
+# MERGE INTO QuestionStats
+# ------------------------------------------------
+def _derive(stats):
+    if stats.responses:
+        stats.difficulty_index = stats.correct / stats.responses
+        stats.avg_marks = stats.marks_total / stats.responses
+    if stats.upper_responses and stats.lower_responses:
+        stats.discrimination_index = (
+            stats.upper_correct / stats.upper_responses
+            - stats.lower_correct / stats.lower_responses
+        )
+
+
+@transaction.atomic
+def _merge(question_ids, sums, choice_counts, last_answer_id):
+    existing = QuestionStats.objects.select_for_update().in_bulk(question_ids.tolist())
+    now = timezone.now()
+    merged = []
+
+    for i, question_id in enumerate(question_ids.tolist()):
+        stats = existing.get(question_id) or QuestionStats(question_id=question_id)
+
+        for field in COUNT_FIELDS:
+            value = sums[field][i]
+            setattr(stats, field, getattr(stats, field) + (
+                float(value) if field == "marks_total" else int(round(value))
+            ))
+
+        for choice_id, n in choice_counts.get(question_id, {}).items():
+            stats.choice_counts[choice_id] = stats.choice_counts.get(choice_id, 0) + n
+
+        _derive(stats)
+        stats.last_answer_id = last_answer_id
+        stats.updated_at = now
+        merged.append(stats)
+
+    # One upsert instead of bulk_update()'s CASE WHEN per column
+    QuestionStats.objects.bulk_create(
+        merged,
+        update_conflicts=True,
+        unique_fields=["question"],
+        update_fields=[
+            *COUNT_FIELDS, *DERIVED_FIELDS, "choice_counts", "last_answer_id", "updated_at",
+        ],
+    )
+
+
+# ------------------------------------------------
+# REFRESH
+# ------------------------------------------------
+def last_analyzed_answer_id():
+    return QuestionStats.objects.aggregate(n=Max("last_answer_id"))["n"] or 0
+
+
+def settled_answer_id():
+    """
+    Newest answer id at or below which every grading transaction has
+    ended. Found by walking answer ids down from the newest.
+    """
+    return (
+        Answer.objects
+        .filter(attempt__completed_at__lt=timezone.now() - SETTLE_TIME)
+        .order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    ) or 0
+
+
+def refresh(full=False, chunk_size=ANALYSIS_CHUNK_SIZE, on_progress=None):
+    """
+    Folds answers newer than the last run into QuestionStats, streaming
+    them by id in chunks. full=True starts over from the first answer.
+    Returns the number of answers processed.
+    """
+    if full:
+        QuestionStats.objects.all().delete()
+
+    after = last_analyzed_answer_id()
+    # Fixed upper bound: answers newer than it wait for the next run
+    upto = settled_answer_id()
+    cutoffs = _GroupCutoffs()
+    processed = 0
+
+    answers = (
+        Answer.objects
+        .filter(attempt__completed_at__isnull=False)
+        .order_by("id")
+        .values_list(
+            "id", "question_id", "attempt_id", "is_correct", "marks_awarded",
+            "selected_choice_ids", "selected_choice_id",
+        )
+    )
+
+    while after < upto:
+        chunk = list(answers.filter(id__gt=after, id__lte=upto)[:chunk_size])
+        if not chunk:
+            break
+
+        after = chunk[-1][0]
+        _merge(*summarize_chunk(chunk, cutoffs), after)
+        processed += len(chunk)
+
+        if on_progress:
+            on_progress(processed)
+
+    return processed
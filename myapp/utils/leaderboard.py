@@ -0,0 +1,138 @@
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from myapp.models import LeaderboardEntry
+from myapp.utils.cache_versions import versioned_key, bump_version
+
+
+TOP_N = 10
+TOP_TIMEOUT = 60 * 10
+
+
+def _top_key(quiz_id):
+    return versioned_key("leaderboard", "top", quiz_id or "global")
+
+
+def invalidate_all():
+    bump_version("leaderboard")
+
+
+def ranked(quiz_id=None):
+    """
+    Entries of one board in rank order (served by leaderboard_rank_idx)
+    """
+    return (
+        LeaderboardEntry.objects
+        .filter(quiz_id=quiz_id, attempt_count__gt=0)
+        .order_by("-best_score", "best_at", "id")
+    )
+
+
+# ------------------------------------------------
+# INCREMENTAL UPDATE (ATTEMPT COMPLETED)
+# ------------------------------------------------
+def _bump(entry, score, completed_at):
+    """
+    Applies one completed attempt to an entry. Returns the best-score gain.
+    """
+    gain = 0
+
+    if entry.attempt_count == 0 or score > entry.best_score:
+        gain = score - entry.best_score if entry.attempt_count else score
+        entry.best_score = score
+        entry.best_at = completed_at
+
+    entry.attempt_count += 1
+    entry.last_completed = completed_at
+    return gain
+
+
+@transaction.atomic
+def record_attempt(attempt):
+    """
+    Updates the user's quiz row and global row for a completed attempt
+    """
+    entry, _ = LeaderboardEntry.objects.select_for_update().get_or_create(
+        user_id=attempt.user_id,
+        quiz_id=attempt.quiz_id,
+    )
+    gain = _bump(entry, attempt.score, attempt.completed_at)
+    entry.save()
+
+    overall, _ = LeaderboardEntry.objects.select_for_update().get_or_create(
+        user_id=attempt.user_id,
+        quiz=None,
+    )
+    if gain or overall.attempt_count == 0:
+        overall.best_score += gain
+        overall.best_at = attempt.completed_at
+    overall.attempt_count += 1
+    overall.last_completed = attempt.completed_at
+    overall.save()
+
+    # A new row can join a top list that is not full yet, even scoring 0
+    for row in (entry, overall):
+        if gain or row.attempt_count == 1:
+            transaction.on_commit(partial(_invalidate_top, row))
+
+
+def _invalidate_top(entry):
+    """
+    Drops a cached top-N list only if this entry can now appear in it
+    """
+    key = _top_key(entry.quiz_id)
+    top = cache.get(key)
+
+    if top is None:
+        return
+
+    in_top = any(row["user_id"] == entry.user_id for row in top)
+
+    if in_top or len(top) < TOP_N or entry.best_score >= top[-1]["best_score"]:
+        cache.delete(key)
+
+
+# ------------------------------------------------
+# READS
+# ------------------------------------------------
+def get_top(quiz_id=None):
+    """
+    Cached top-N rows as plain dictionaries
+    """
+    key = _top_key(quiz_id)
+    top = cache.get(key)
+
+    if top is None:
+        top = [
+            {
+                "user_id": e.user_id,
+                "username": e.user.username,
+                "best_score": e.best_score,
+                "attempt_count": e.attempt_count,
+            }
+            for e in ranked(quiz_id).select_related("user")[:TOP_N]
+        ]
+        cache.set(key, top, timeout=TOP_TIMEOUT)
+
+    return top
+
+
+def get_rank(user, quiz_id=None):
+    """
+    (rank, entry) for a user, or (None, None). The count is a range
+    scan on leaderboard_rank_idx, not a scan of attempts.
+    """
+    entry = ranked(quiz_id).filter(user=user).first()
+
+    if entry is None:
+        return None, None
+
+    ahead = ranked(quiz_id).filter(
+        Q(best_score__gt=entry.best_score)
+        | Q(best_score=entry.best_score, best_at__lt=entry.best_at)
+    ).count()
+
+    return ahead + 1, entry
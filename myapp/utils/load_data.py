@@ -0,0 +1,197 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from myapp.models import Category, Quiz, Question, Choice, Attempt, Answer
+
+User = get_user_model()
+
+
+CHOICES_PER_QUESTION = 4
+LOAD_USER_PREFIX = "load_user_"
+LOAD_USER_PASSWORD = "load-password"
+
+_DIFFICULTIES = [value for value, _ in Question.DIFFICULTY_CHOICES]
+
+_WORDS = (
+    "algebra biology chemistry databases economics finance geography history "
+    "literature mathematics networks physics programming statistics "
+    "astronomy grammar geometry music philosophy psychology"
+).split()
+
+
+def _sentence(rng, words=8):
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+
+# ------------------------------------------------
+# CATALOGUE
+# ------------------------------------------------
+def _seed_quiz_content(rng, quizzes, questions_per_quiz, batch_size):
+    """
+    Bulk inserts questions (4 choices each, the first correct) for the quizzes.
+    Returns {quiz_id: [(question_id, marks)]}.
+    """
+    content = {}
+
+    for quiz in quizzes:
+        questions = Question.objects.bulk_create(
+            [
+                Question(
+                    quiz=quiz,
+                    text=f"{_sentence(rng)}?",
+                    marks=rng.choice((1, 1, 1, 2)),
+                    difficulty=rng.choice(_DIFFICULTIES),
+                )
+                for _ in range(questions_per_quiz)
+            ],
+            batch_size=batch_size,
+        )
+
+        Choice.objects.bulk_create(
+            [
+                Choice(question=q, text=_sentence(rng, 3), is_correct=j == 0)
+                for q in questions
+                for j in range(CHOICES_PER_QUESTION)
+            ],
+            batch_size=batch_size,
+        )
+
+        content[quiz.id] = [(q.id, q.marks) for q in questions]
+
+    return content
+
+
+# ------------------------------------------------
+# ATTEMPTS
+# ------------------------------------------------
+def _seed_attempts(rng, users, quizzes, content, attempts_per_user,
+                   questions_per_attempt, batch_size):
+    """
+    Completed attempts with graded answers, spread over the last 90 days
+    """
+    now = timezone.now()
+    total = 0
+    users_per_batch = max(1, batch_size // max(1, attempts_per_user))
+
+    for start in range(0, len(users), users_per_batch):
+        chunk = users[start:start + users_per_batch]
+
+        attempts, graded = [], []
+
+        for user in chunk:
+            for _ in range(attempts_per_user):
+                quiz = rng.choice(quizzes)
+                rows = content[quiz.id]
+                picked = rng.sample(rows, min(questions_per_attempt, len(rows)))
+
+                answers = [
+                    (qid, marks, rng.random() < 0.6)
+                    for qid, marks in picked
+                ]
+
+                attempts.append(Attempt(
+                    user=user,
+                    quiz=quiz,
+                    question_ids=[qid for qid, _, _ in answers],
+                    total_marks=sum(marks for _, marks, _ in answers),
+                    score=sum(marks for _, marks, ok in answers if ok),
+                    completed_at=now - timedelta(minutes=rng.randint(10, 90 * 24 * 60)),
+                ))
+                graded.append(answers)
+
+        attempts = Attempt.objects.bulk_create(attempts, batch_size=batch_size)
+
+        # started_at is auto_now_add; move it before completed_at in one UPDATE
+        Attempt.objects.filter(pk__in=[a.pk for a in attempts]).update(
+            started_at=F("completed_at") - timedelta(minutes=15)
+        )
+
+        Answer.objects.bulk_create(
+            (
+                Answer(
+                    attempt=attempt,
+                    question_id=qid,
+                    is_correct=ok,
+                    marks_awarded=marks if ok else 0,
+                )
+                for attempt, answers in zip(attempts, graded)
+                for qid, marks, ok in answers
+            ),
+            batch_size=batch_size,
+        )
+
+        total += len(attempts)
+
+    return total
+
+
+# ------------------------------------------------
+# ENTRY POINT
+# ------------------------------------------------
+@transaction.atomic
+def seed(categories=10, quizzes=100, questions_per_quiz=200, users=1000,
+         attempts_per_user=5, questions_per_attempt=20, batch_size=1000, seed=None):
+    """
+    Inserts a synthetic dataset with bulk inserts only (no per-row signals).
+    Summary tables, caches and the search index must be rebuilt afterwards.
+    Returns a dictionary of created row counts.
+    """
+    rng = random.Random(seed)
+    suffix = f"{rng.getrandbits(32):08x}"
+
+    created_categories = Category.objects.bulk_create(
+        Category(name=f"Load {suffix} {i}", slug=f"load-{suffix}-{i}")
+        for i in range(categories)
+    )
+
+    created_quizzes = Quiz.objects.bulk_create(
+        (
+            Quiz(
+                title=f"{_sentence(rng, 3)} {i}",
+                description=_sentence(rng, 20),
+                topics_covered=", ".join(rng.sample(_WORDS, 4)),
+                category=created_categories[i % categories] if categories else None,
+                selection_mode=rng.choice(("random", "stratified")),
+                is_published=rng.random() < 0.9,
+            )
+            for i in range(quizzes)
+        ),
+        batch_size=batch_size,
+    )
+
+    content = _seed_quiz_content(rng, created_quizzes, questions_per_quiz, batch_size)
+
+    # Hashing once keeps seeding fast; every load user shares the password
+    password = make_password(LOAD_USER_PASSWORD)
+    existing = User.objects.filter(username__startswith=LOAD_USER_PREFIX).count()
+    created_users = User.objects.bulk_create(
+        (
+            User(username=f"{LOAD_USER_PREFIX}{existing + i}", password=password)
+            for i in range(users)
+        ),
+        batch_size=batch_size,
+    )
+
+    published = [q for q in created_quizzes if q.is_published and content[q.id]]
+    attempt_count = 0
+    if published:
+        attempt_count = _seed_attempts(
+            rng, created_users, published, content,
+            attempts_per_user, questions_per_attempt, batch_size,
+        )
+
+    return {
+        "categories": len(created_categories),
+        "quizzes": len(created_quizzes),
+        "questions": quizzes * questions_per_quiz,
+        "choices": quizzes * questions_per_quiz * CHOICES_PER_QUESTION,
+        "users": len(created_users),
+        "attempts": attempt_count,
+        "answers": attempt_count * min(questions_per_attempt, questions_per_quiz),
+    }
@@ -0,0 +1,137 @@
+import threading
+from bisect import bisect_left
+
+
+# Upper bounds (le) of the histogram buckets; +Inf is implicit
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """
+    Cumulative Prometheus-style histogram, one series per label value
+    """
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, label, value):
+        series = self.series.get(label)
+        if series is None:
+            # [per-bucket counts..., +Inf count], sum
+            series = self.series[label] = [[0] * (len(self.buckets) + 1), 0.0]
+
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self, label_name):
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+
+        for label, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{self.name}_sum{{{label_name}="{label}"}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{label_name}="{label}"}} {cumulative}')
+
+        return lines
+
+
+class Counter:
+    """
+    Prometheus-style counter, one series per label value
+    """
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.series = dict.fromkeys(labels, 0)
+
+    def inc(self, label, amount=1):
+        with _lock:
+            self.series[label] = self.series.get(label, 0) + amount
+
+    def clear(self):
+        self.series = dict.fromkeys(self.labels, 0)
+
+    def render(self, label_name):
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+        ]
+        for label, value in sorted(self.series.items()):
+            lines.append(f'{self.name}{{{label_name}="{label}"}} {value}')
+
+        return lines
+
+
+# ------------------------------------------------
+# REGISTRY (IN-PROCESS, PER WORKER)
+# ------------------------------------------------
+# Cheap enough for every request: nothing here touches the cache or DB
+_lock = threading.Lock()
+
+REQUEST_SECONDS = Histogram(
+    "myapp_request_duration_seconds", "Total request latency", SECONDS_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "myapp_request_db_seconds", "Time spent in SQL per request", SECONDS_BUCKETS,
+)
+TEMPLATE_SECONDS = Histogram(
+    "myapp_request_template_seconds", "Time spent rendering templates per request",
+    SECONDS_BUCKETS,
+)
+QUERIES = Histogram(
+    "myapp_request_queries", "SQL statements per request", QUERY_BUCKETS,
+)
+
+_HISTOGRAMS = (REQUEST_SECONDS, DB_SECONDS, TEMPLATE_SECONDS, QUERIES)
+
+ANSWER_KEY_CACHE = Counter(
+    "myapp_answer_key_cache_total", "Answer key cache lookups", ("hit", "miss"),
+)
+PAGE_CACHE = Counter(
+    "myapp_page_cache_total", "Anonymous page cache lookups", ("hit", "miss"),
+)
+
+_COUNTERS = (ANSWER_KEY_CACHE, PAGE_CACHE)
+
+
+def record_request(view, seconds, db_seconds, template_seconds, queries):
+    with _lock:
+        REQUEST_SECONDS.observe(view, seconds)
+        DB_SECONDS.observe(view, db_seconds)
+        TEMPLATE_SECONDS.observe(view, template_seconds)
+        QUERIES.observe(view, queries)
+
+
+def reset():
+    with _lock:
+        for histogram in _HISTOGRAMS:
+            histogram.series.clear()
+        for counter in _COUNTERS:
+            counter.clear()
+
+
+def render_prometheus():
+    """
+    Text exposition format (version 0.0.4)
+    """
+    with _lock:
+        lines = []
+        for histogram in _HISTOGRAMS:
+            lines.extend(histogram.render("view"))
+        for counter in _COUNTERS:
+            lines.extend(counter.render("result"))
+
+    return "\n".join(lines) + "\n"
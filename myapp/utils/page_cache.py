@@ -0,0 +1,104 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from myapp.utils.cache_versions import get_version
+from myapp.utils.metrics import PAGE_CACHE
+
+
+# ------------------------------------------------
+# WHOLE-PAGE CACHE FOR ANONYMOUS VISITORS
+# ------------------------------------------------
+# Pages are keyed by path + query string and by the version stamps they
+# depend on, so the signals that bump "catalogue" / "quiz:<id>" expire
+# them in every worker at once (the cache backend is shared).
+
+def _page_key(request, versions, view_kwargs):
+    stamps = ":".join(
+        str(get_version(name.format(**view_kwargs))) for name in versions
+    )
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"page:{path}:{stamps}"
+
+
+def _cacheable_request(request, user):
+    # Pending flash messages are per visitor (cookie storage)
+    return (
+        request.method in ("GET", "HEAD")
+        and not user.is_authenticated
+        and "messages" not in request.COOKIES
+    )
+
+
+def _cacheable_response(response):
+    # Responses that set cookies (CSRF, session) are per visitor
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+    )
+
+
+def _to_cache(response):
+    return response.content, response["Content-Type"]
+
+
+def _from_cache(cached):
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response["X-Page-Cache"] = "hit"
+    return response
+
+
+def cache_anonymous_page(timeout, versions=()):
+    """
+    Caches a view's full response for anonymous GETs. `versions` are
+    version-stamp names, formatted with the view's kwargs ("quiz:{pk}").
+    Works on sync and async views.
+    """
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not _cacheable_request(request, await request.auser()):
+                    return await view(request, *args, **kwargs)
+
+                key = await sync_to_async(_page_key)(request, versions, kwargs)
+                cached = await cache.aget(key)
+                if cached is not None:
+                    PAGE_CACHE.inc("hit")
+                    return _from_cache(cached)
+
+                PAGE_CACHE.inc("miss")
+                response = await view(request, *args, **kwargs)
+                if _cacheable_response(response):
+                    await cache.aset(key, _to_cache(response), timeout)
+                return response
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable_request(request, request.user):
+                return view(request, *args, **kwargs)
+
+            key = _page_key(request, versions, kwargs)
+            cached = cache.get(key)
+            if cached is not None:
+                PAGE_CACHE.inc("hit")
+                return _from_cache(cached)
+
+            PAGE_CACHE.inc("miss")
+            response = view(request, *args, **kwargs)
+            if _cacheable_response(response):
+                cache.set(key, _to_cache(response), timeout)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,171 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from myapp.models import (
+    Category, Quiz, Question, Choice, Attempt, Answer,
+    UserStats, ImportJob,
+)
+from myapp.utils.leaderboard import ranked
+
+User = get_user_model()
+
+
+# ------------------------------------------------
+# HOT QUERIES (mirrors myapp.views / myapp.utils)
+# ------------------------------------------------
+# Each entry: (name, function(ctx) -> queryset). ctx holds ids from the seed.
+HOT_QUERIES = [
+    ("active_attempt", lambda ctx: (
+        Attempt.objects
+        .filter(user_id=ctx["user_id"], quiz_id=ctx["quiz_id"], completed_at__isnull=True)
+        .order_by("-started_at")[:1]
+    )),
+    ("recent_attempts", lambda ctx: (
+        Attempt.objects
+        .filter(user_id=ctx["user_id"], completed_at__isnull=False)
+        .select_related("quiz")
+        .order_by("-completed_at")[:5]
+    )),
+    ("score_history_page", lambda ctx: (
+        Attempt.objects
+        .filter(user_id=ctx["user_id"], completed_at__isnull=False)
+        .filter(
+            Q(completed_at__lt=timezone.now())
+            | Q(completed_at=timezone.now(), id__lt=ctx["attempt_id"])
+        )
+        .select_related("quiz")
+        .order_by("-completed_at", "-id")[:26]
+    )),
+    ("attempt_answers", lambda ctx: (
+        Answer.objects.filter(attempt_id=ctx["attempt_id"]).select_related("question")
+    )),
+    ("answer_key_questions", lambda ctx: (
+        Question.objects
+        .filter(quiz_id=ctx["quiz_id"])
+        .order_by("id")
+        .values_list("id", "marks", "difficulty")
+    )),
+    ("answer_key_choices", lambda ctx: (
+        Choice.objects
+        .filter(question__quiz_id=ctx["quiz_id"], is_correct=True)
+        .values_list("question_id", "id")
+    )),
+    ("attempt_questions", lambda ctx: (
+        Question.objects.filter(id__in=ctx["question_ids"])
+    )),
+    ("attempt_choices", lambda ctx: (
+        Choice.objects.filter(question_id__in=ctx["question_ids"])
+    )),
+    ("catalogue_page", lambda ctx: (
+        Quiz.objects.filter(is_published=True).order_by("-created_at", "-id")[:13]
+    )),
+    ("catalogue_category_page", lambda ctx: (
+        Quiz.objects
+        .filter(is_published=True, category_id=ctx["category_id"])
+        .order_by("-created_at", "-id")[:13]
+    )),
+    ("leaderboard_page", lambda ctx: (
+        ranked(ctx["quiz_id"])[:25]
+    )),
+    ("leaderboard_rank", lambda ctx: (
+        ranked(ctx["quiz_id"]).filter(
+            Q(best_score__gt=5) | Q(best_score=5, best_at__lt=timezone.now())
+        )
+    )),
+    ("user_stats", lambda ctx: (
+        UserStats.objects.filter(user_id=ctx["user_id"])
+    )),
+    ("claimable_import_jobs", lambda ctx: (
+        ImportJob.objects
+        .filter(Q(status="pending") | Q(status="running", heartbeat_at__lt=timezone.now()))
+        .order_by("created_at", "id")[:5]
+    )),
+]
+
+
+# ------------------------------------------------
+# SEED
+# ------------------------------------------------
+def seed(rows=500, tag="plan_check"):
+    """
+    Small but non-trivial dataset so the planner has something to choose
+    between. Meant for the test database (myapp.tests); a distinct `tag`
+    lets a test seed more than once.
+    """
+    category = Category.objects.create(name=f"__{tag}__", slug=f"__{tag}__")
+    users = User.objects.bulk_create(
+        User(username=f"__{tag}_{i}__") for i in range(20)
+    )
+    quizzes = Quiz.objects.bulk_create(
+        Quiz(title=f"Plan check {i}", category=category, is_published=i % 10 != 0)
+        for i in range(max(rows // 5, 20))
+    )
+    questions = Question.objects.bulk_create(
+        Question(quiz=quizzes[i % len(quizzes)], text=f"Question {i}")
+        for i in range(rows)
+    )
+    Choice.objects.bulk_create(
+        Choice(question=q, text=str(j), is_correct=j == 0)
+        for q in questions for j in range(4)
+    )
+    attempts = Attempt.objects.bulk_create(
+        Attempt(user=users[i % len(users)], quiz=quizzes[i % len(quizzes)])
+        for i in range(rows)
+    )
+    Answer.objects.bulk_create(
+        Answer(attempt=a, question=questions[i])
+        for i, a in enumerate(attempts)
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    return {
+        "user_id": users[0].id,
+        "quiz_id": quizzes[0].id,
+        "category_id": category.id,
+        "attempt_id": attempts[0].id,
+        "question_ids": [q.id for q in questions[:20]],
+    }
+
+
+# ------------------------------------------------
+# PLAN INSPECTION
+# ------------------------------------------------
+_SQLITE_FULL_SCAN = re.compile(r"\bSCAN (myapp_\w+)\b(?! USING)")
+_POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (myapp_\w+)")
+
+
+def explain(queryset):
+    return queryset.explain()
+
+
+def full_scans(plan):
+    """
+    Tables of this app read in full according to an EXPLAIN output
+    """
+    pattern = _SQLITE_FULL_SCAN if connection.vendor == "sqlite" else _POSTGRES_FULL_SCAN
+    return sorted(set(pattern.findall(plan)))
+
+
+def check_plans(ctx):
+    """
+    Returns [(name, plan, scanned_tables)] for every hot query
+    """
+    if connection.vendor == "postgresql":
+        # Small seeded tables make seq scans cheap; ask whether an index
+        # *can* serve the query instead of whether it is worth using yet.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    results = []
+
+    for name, build in HOT_QUERIES:
+        plan = explain(build(ctx))
+        results.append((name, plan, full_scans(plan)))
+
+    return results
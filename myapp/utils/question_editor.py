@@ -0,0 +1,140 @@
+from django.db import transaction
+
+from myapp.models import Question, Choice, Answer
+from myapp.utils.answer_key import invalidate_quiz
+
+
+EDITOR_PAGE_SIZE = 50
+MIN_CHOICES = 2
+MAX_CHOICES = 10
+CHOICE_TEXT_MAX_LENGTH = Choice._meta.get_field("text").max_length
+
+
+# ------------------------------------------------
+# READ: ONE PAGE OF QUESTIONS WITH THEIR CHOICES
+# ------------------------------------------------
+def serialize_question(question, choices):
+    return {
+        "id": question.id,
+        "text": question.text,
+        "marks": question.marks,
+        "difficulty": question.difficulty,
+        "choices": [
+            {"id": c.id, "text": c.text, "is_correct": c.is_correct}
+            for c in choices
+        ],
+    }
+
+
+def question_page(quiz_id, after=None, size=EDITOR_PAGE_SIZE):
+    """
+    Keyset page of the quiz's questions (by id) with their choices, in two
+    queries. Returns (questions, next_after); next_after is None on the
+    last page.
+    """
+    questions = Question.objects.filter(quiz_id=quiz_id).order_by("id")
+    if after is not None:
+        questions = questions.filter(id__gt=after)
+
+    questions = list(questions.only("id", "text", "marks", "difficulty")[:size + 1])
+    has_more = len(questions) > size
+    questions = questions[:size]
+
+    choices = {q.id: [] for q in questions}
+    for choice in Choice.objects.filter(question__in=questions).order_by("id"):
+        choices[choice.question_id].append(choice)
+
+    return (
+        [serialize_question(q, choices[q.id]) for q in questions],
+        questions[-1].id if has_more else None,
+    )
+
+
+# ------------------------------------------------
+# WRITE: ONE QUESTION AND ITS CHOICES
+# ------------------------------------------------
+def parse_choices(raw):
+    """
+    Validates [{"id": int | null, "text": str, "is_correct": bool}, ...].
+    Returns the list with text stripped. Raises ValueError for anything
+    malformed.
+    """
+    if not isinstance(raw, list) or not MIN_CHOICES <= len(raw) <= MAX_CHOICES:
+        raise ValueError(f"A question needs {MIN_CHOICES} to {MAX_CHOICES} choices")
+
+    choices = []
+
+    for item in raw:
+        if not isinstance(item, dict):
+            raise ValueError("Invalid choice")
+
+        choice_id = item.get("id")
+        text = item.get("text")
+
+        if choice_id is not None and (not isinstance(choice_id, int) or isinstance(choice_id, bool)):
+            raise ValueError(f"Invalid choice id: {choice_id!r}")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Choice text is required")
+        if len(text.strip()) > CHOICE_TEXT_MAX_LENGTH:
+            raise ValueError(f"Choice text is limited to {CHOICE_TEXT_MAX_LENGTH} characters")
+
+        choices.append({
+            "id": choice_id,
+            "text": text.strip(),
+            "is_correct": item.get("is_correct") is True,
+        })
+
+    if not any(c["is_correct"] for c in choices):
+        raise ValueError("Mark at least one choice as correct")
+
+    return choices
+
+
+@transaction.atomic
+def save_question(question, choices):
+    """
+    Saves an edited (or new) question and syncs its choices with one
+    bulk UPDATE, one bulk INSERT and one DELETE, whatever the number of
+    choices. `choices` comes from parse_choices(); ids must belong to
+    this question.
+    """
+    is_new = question.pk is None
+    question.save()
+
+    existing = {} if is_new else {c.id: c for c in question.choices.all()}
+
+    to_update = []
+    to_create = []
+
+    for item in choices:
+        if item["id"] is None:
+            to_create.append(Choice(
+                question=question, text=item["text"], is_correct=item["is_correct"],
+            ))
+            continue
+
+        choice = existing.get(item["id"])
+        if choice is None:
+            raise ValueError(f"Choice {item['id']} does not belong to this question")
+
+        if (choice.text, choice.is_correct) != (item["text"], item["is_correct"]):
+            choice.text = item["text"]
+            choice.is_correct = item["is_correct"]
+            to_update.append(choice)
+
+    removed = set(existing) - {item["id"] for item in choices}
+    if removed:
+        # What the delete collector would do, minus a post_delete (and its
+        # quiz lookup) per choice: the invalidation below covers them all
+        Answer.objects.filter(selected_choice_id__in=removed).update(selected_choice=None)
+        removed_choices = Choice.objects.filter(id__in=removed)
+        removed_choices._raw_delete(removed_choices.db)
+
+    Choice.objects.bulk_update(to_update, ["text", "is_correct"])
+    Choice.objects.bulk_create(to_create)
+
+    # Bulk writes send no signals. After commit, so a concurrent reader
+    # cannot cache the old key under the new version.
+    transaction.on_commit(lambda: invalidate_quiz(question.quiz_id))
+
+    return serialize_question(question, question.choices.order_by("id"))
@@ -0,0 +1,136 @@
+from functools import partial
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+
+from myapp.models import Quiz, Question, Attempt, QuizStats
+
+
+SCORE_BUCKETS = 101
+
+
+def score_percent(score, total_marks):
+    if not total_marks:
+        return 0.0
+    return 100 * score / total_marks
+
+
+def _bucket(percent):
+    return min(max(int(percent), 0), SCORE_BUCKETS - 1)
+
+
+def count_questions(quiz_id):
+    """
+    {difficulty: question count}, from question_quiz_difficulty_idx
+    """
+    return dict(
+        Question.objects
+        .filter(quiz_id=quiz_id)
+        .values("difficulty")
+        .annotate(n=Count("id"))
+        .order_by()
+        .values_list("difficulty", "n")
+    )
+
+
+# ------------------------------------------------
+# INCREMENTAL UPDATE (ATTEMPT COMPLETED)
+# ------------------------------------------------
+def record_attempt(attempt):
+    """
+    Applies one completed attempt to the quiz's stats row once the grading
+    transaction commits, so submissions for one quiz do not queue on the
+    row's lock for the whole grading transaction
+    """
+    transaction.on_commit(partial(
+        _apply_attempt,
+        attempt.quiz_id,
+        score_percent(attempt.score, attempt.total_marks),
+        (attempt.completed_at - attempt.started_at).total_seconds(),
+    ))
+
+
+def _apply_attempt(quiz_id, percent, seconds):
+    try:
+        with transaction.atomic():
+            stats, _ = QuizStats.objects.select_for_update().get_or_create(
+                quiz_id=quiz_id,
+                # Callable: counted only when the row is created
+                defaults={"question_counts": partial(count_questions, quiz_id)},
+            )
+
+            histogram = stats.score_histogram or [0] * SCORE_BUCKETS
+            histogram[_bucket(percent)] += 1
+
+            stats.attempt_count += 1
+            stats.score_total += percent
+            stats.duration_total += seconds
+            stats.score_histogram = histogram
+            stats.save()
+    except IntegrityError:
+        # The quiz was deleted after the attempt committed
+        pass
+
+
+def refresh_question_counts(quiz_id, create=False):
+    """
+    Recounts the quiz's questions per difficulty. Only updates an existing
+    row unless `create`: callers inside a quiz's cascade delete must not
+    add a new row for it.
+    """
+    counts = count_questions(quiz_id)
+
+    if create:
+        QuizStats.objects.update_or_create(
+            quiz_id=quiz_id, defaults={"question_counts": counts}
+        )
+    else:
+        QuizStats.objects.filter(quiz_id=quiz_id).update(question_counts=counts)
+
+
+# ------------------------------------------------
+# RECOMPUTE FROM ATTEMPTS
+# ------------------------------------------------
+@transaction.atomic
+def rebuild(quiz_ids=None):
+    """
+    Recomputes every stats row (or those of `quiz_ids`) from Attempt and
+    Question. Returns the number of rows written.
+    """
+    quizzes = Quiz.objects.all()
+    if quiz_ids is not None:
+        quizzes = quizzes.filter(id__in=quiz_ids)
+
+    rows = {
+        quiz_id: QuizStats(quiz_id=quiz_id, score_histogram=[0] * SCORE_BUCKETS)
+        for quiz_id in quizzes.values_list("id", flat=True)
+    }
+
+    questions = (
+        Question.objects
+        .filter(quiz_id__in=rows.keys())
+        .values("quiz_id", "difficulty")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    for row in questions:
+        rows[row["quiz_id"]].question_counts[row["difficulty"]] = row["n"]
+
+    attempts = (
+        Attempt.objects
+        .filter(quiz_id__in=rows.keys(), completed_at__isnull=False)
+        .values_list("quiz_id", "score", "total_marks", "started_at", "completed_at")
+    )
+    for quiz_id, score, total_marks, started_at, completed_at in attempts.iterator(chunk_size=5000):
+        stats = rows[quiz_id]
+        percent = score_percent(score, total_marks)
+
+        stats.attempt_count += 1
+        stats.score_total += percent
+        stats.duration_total += (completed_at - started_at).total_seconds()
+        stats.score_histogram[_bucket(percent)] += 1
+
+    QuizStats.objects.filter(quiz_id__in=rows.keys()).delete()
+    QuizStats.objects.bulk_create(rows.values(), batch_size=1000)
+
+    return len(rows)
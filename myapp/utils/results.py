@@ -0,0 +1,81 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+from myapp.models import Answer
+from myapp.utils.cache_versions import versioned_key
+
+
+RESULT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _result_answers_queryset(attempt):
+    return (
+        Answer.objects
+        .filter(attempt=attempt)
+        .select_related("question")
+        .prefetch_related("question__choices")
+        .order_by("id")
+    )
+
+
+def _attach_choices(answers):
+    for answer in answers:
+        selected = set(answer.selected_choice_ids)
+        choices = answer.question.choices.all()
+
+        answer.selected_choices = [c for c in choices if c.id in selected]
+        answer.correct_choices = [c for c in choices if c.is_correct]
+
+    return answers
+
+
+def load_result_answers(attempt):
+    """
+    Answers with their question, selected choices and correct choices,
+    in two queries however many questions the attempt has
+    """
+    return _attach_choices(list(_result_answers_queryset(attempt)))
+
+
+def _result_key(attempt):
+    return versioned_key(f"quiz:{attempt.quiz_id}", "result", attempt.id)
+
+
+def _render(answers):
+    return render_to_string("myapp/result_answers.html", {"answers": answers})
+
+
+def render_result_answers(attempt):
+    """
+    HTML for the per-question breakdown. Completed attempts never change,
+    so it is cached per attempt; the quiz version stamp drops it if the
+    questions or choices are edited.
+    """
+    cacheable = attempt.completed_at is not None
+    key = _result_key(attempt)
+    html = cache.get(key) if cacheable else None
+
+    if html is None:
+        html = _render(load_result_answers(attempt))
+        if cacheable:
+            cache.set(key, html, timeout=RESULT_CACHE_TIMEOUT)
+
+    return html
+
+
+async def arender_result_answers(attempt):
+    """
+    render_result_answers() for async views
+    """
+    cacheable = attempt.completed_at is not None
+    key = await sync_to_async(_result_key)(attempt)
+    html = await cache.aget(key) if cacheable else None
+
+    if html is None:
+        answers = [a async for a in _result_answers_queryset(attempt)]
+        html = _render(_attach_choices(answers))
+        if cacheable:
+            await cache.aset(key, html, timeout=RESULT_CACHE_TIMEOUT)
+
+    return html
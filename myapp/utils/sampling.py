@@ -0,0 +1,132 @@
+import random
+import threading
+from array import array
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from myapp.models import Question
+from myapp.utils.cache_versions import versioned_key
+
+
+POOL_TIMEOUT = 60 * 60 * 24
+
+# Pools kept in process memory, keyed by their versioned cache key
+LOCAL_POOL_LIMIT = 256
+
+
+# ------------------------------------------------
+# QUESTION ID POOLS
+# ------------------------------------------------
+def build_question_pool(quiz_id):
+    """
+    Returns {difficulty: array of question ids} for a quiz.
+    One narrow (id, difficulty) query; no question text or choices.
+    """
+    pool = {}
+
+    ids = (
+        Question.objects
+        .filter(quiz_id=quiz_id)
+        .order_by("id")
+        .values_list("id", "difficulty")
+    )
+
+    for question_id, difficulty in ids.iterator(chunk_size=5000):
+        pool.setdefault(difficulty, array("q")).append(question_id)
+
+    return pool
+
+
+_local_pools = OrderedDict()
+_local_pools_lock = threading.Lock()
+
+
+def get_question_pool(quiz_id):
+    """
+    Cached per-difficulty ID arrays, invalidated with the quiz version.
+    Also memoised in process (LRU) so adaptive attempts, which draw one
+    question per answer, only pay for the version-stamp lookup.
+    """
+    key = versioned_key(f"quiz:{quiz_id}", "question_pool")
+
+    with _local_pools_lock:
+        pool = _local_pools.get(key)
+        if pool is not None:
+            _local_pools.move_to_end(key)
+            return pool
+
+    pool = cache.get(key)
+
+    if pool is None:
+        pool = build_question_pool(quiz_id)
+        cache.set(key, pool, timeout=POOL_TIMEOUT)
+
+    with _local_pools_lock:
+        _local_pools[key] = pool
+        if len(_local_pools) > LOCAL_POOL_LIMIT:
+            _local_pools.popitem(last=False)
+
+    return pool
+
+
+# ------------------------------------------------
+# SAMPLING
+# ------------------------------------------------
+def _allocate(sizes, count):
+    """
+    Splits `count` across strata in proportion to their sizes
+    (largest remainder), never asking a stratum for more than it has.
+    """
+    total = sum(sizes.values())
+    shares = {name: count * size / total for name, size in sizes.items()}
+    allocation = {name: int(share) for name, share in shares.items()}
+
+    leftover = count - sum(allocation.values())
+    by_remainder = sorted(
+        sizes,
+        key=lambda name: shares[name] - allocation[name],
+        reverse=True,
+    )
+
+    while leftover > 0:
+        for name in by_remainder:
+            if leftover and allocation[name] < sizes[name]:
+                allocation[name] += 1
+                leftover -= 1
+
+    return allocation
+
+
+def sample_question_ids(quiz, count, stratified=False):
+    """
+    Picks `count` question ids from the cached pool.
+    Stratified sampling keeps the quiz's easy / medium / hard mix.
+    """
+    pool = get_question_pool(quiz.id)
+    sizes = {difficulty: len(ids) for difficulty, ids in pool.items() if ids}
+    count = min(count, sum(sizes.values()))
+
+    if not count:
+        return []
+
+    if stratified:
+        question_ids = []
+        for difficulty, n in _allocate(sizes, count).items():
+            question_ids.extend(random.sample(pool[difficulty], n))
+        random.shuffle(question_ids)
+        return question_ids
+
+    # Uniform sample across strata without concatenating the arrays
+    strata = list(sizes)
+    positions = random.sample(range(sum(sizes.values())), count)
+    question_ids = []
+
+    for position in positions:
+        for difficulty in strata:
+            if position < sizes[difficulty]:
+                question_ids.append(pool[difficulty][position])
+                break
+            position -= sizes[difficulty]
+
+    return question_ids
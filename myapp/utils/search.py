@@ -0,0 +1,216 @@
+import re
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection
+
+from myapp.models import Quiz, Question
+
+
+# Tables are created by migration 0016_search_index.
+# Both backends key documents by one integer:
+# quiz -> pk * 2, question -> pk * 2 + 1
+QUIZ, QUESTION = 0, 1
+
+SQLITE_TABLE = "myapp_search_fts"
+POSTGRES_TABLE = "myapp_search_document"
+
+REBUILD_BATCH_SIZE = 2000
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def doc_id(kind, pk):
+    return pk * 2 + kind
+
+
+def is_available():
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+# ------------------------------------------------
+# WRITES
+# ------------------------------------------------
+def _write(docs):
+    """
+    docs: iterable of (doc_id, quiz_id, title, body); replaces existing rows
+    """
+    docs = list(docs)
+    if not docs or not is_available():
+        return
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.executemany(
+                f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s",
+                [(d[0],) for d in docs],
+            )
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_TABLE} (rowid, quiz_id, title, body) "
+                "VALUES (%s, %s, %s, %s)",
+                docs,
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {POSTGRES_TABLE} (id, quiz_id, document) "
+                "VALUES (%s, %s, setweight(to_tsvector('english', %s), 'A') "
+                "|| setweight(to_tsvector('english', %s), 'B')) "
+                "ON CONFLICT (id) DO UPDATE SET "
+                "quiz_id = EXCLUDED.quiz_id, document = EXCLUDED.document",
+                docs,
+            )
+
+
+def _quiz_doc(quiz):
+    body = "\n".join(filter(None, [quiz.description, quiz.topics_covered]))
+    return doc_id(QUIZ, quiz.pk), quiz.pk, quiz.title, body
+
+
+def _question_doc(question):
+    return doc_id(QUESTION, question.pk), question.quiz_id, "", question.text
+
+
+def index_quizzes(quizzes):
+    _write(_quiz_doc(q) for q in quizzes)
+
+
+def index_questions(questions):
+    _write(_question_doc(q) for q in questions)
+
+
+def remove(kind, pks):
+    if not is_available():
+        return
+
+    table = SQLITE_TABLE if connection.vendor == "sqlite" else POSTGRES_TABLE
+    key = "rowid" if connection.vendor == "sqlite" else "id"
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {table} WHERE {key} = %s",
+            [(doc_id(kind, pk),) for pk in pks],
+        )
+
+
+def remove_quiz(quiz_id):
+    """
+    Removes a quiz's document and those of all its questions
+    """
+    if not is_available():
+        return
+
+    table = SQLITE_TABLE if connection.vendor == "sqlite" else POSTGRES_TABLE
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE quiz_id = %s", [quiz_id])
+
+
+def rebuild(batch_size=REBUILD_BATCH_SIZE):
+    """
+    Re-indexes every quiz and question. Returns the number of documents.
+    """
+    if not is_available():
+        return 0
+
+    table = SQLITE_TABLE if connection.vendor == "sqlite" else POSTGRES_TABLE
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}")
+
+    count = 0
+
+    quizzes = Quiz.objects.only("id", "title", "description", "topics_covered")
+    batch = []
+    for quiz in quizzes.iterator(chunk_size=batch_size):
+        batch.append(quiz)
+        if len(batch) >= batch_size:
+            index_quizzes(batch)
+            count += len(batch)
+            batch = []
+    index_quizzes(batch)
+    count += len(batch)
+
+    questions = Question.objects.only("id", "quiz_id", "text")
+    batch = []
+    for question in questions.iterator(chunk_size=batch_size):
+        batch.append(question)
+        if len(batch) >= batch_size:
+            index_questions(batch)
+            count += len(batch)
+            batch = []
+    index_questions(batch)
+    count += len(batch)
+
+    return count
+
+
+# ------------------------------------------------
+# QUERIES
+# ------------------------------------------------
+def _terms(query):
+    return _TOKEN.findall(query.lower())[:10]
+
+
+def _match(kind, query, limit, group_by_quiz, quizzes=None):
+    """
+    Runs a ranked search. Returns quiz ids (grouped) or document pks, best first.
+    With group_by_quiz, `quizzes` (a Quiz queryset) restricts the results
+    before the limit is applied.
+    """
+    terms = _terms(query)
+    if not terms or not is_available():
+        return []
+
+    within, within_params = "", []
+    if quizzes is not None:
+        try:
+            subquery, within_params = quizzes.order_by().values("id").query.sql_with_params()
+        except EmptyResultSet:
+            return []
+        within = f"WHERE quiz_id IN ({subquery}) "
+
+    if connection.vendor == "sqlite":
+        # Prefix match on every term. The hidden rank column is bm25
+        # (lower is better) with the title weighted 10x; unlike bm25()
+        # it may be aggregated.
+        table, key = SQLITE_TABLE, "rowid"
+        match = " ".join(f'"{t}"*' for t in terms)
+        rank, rank_params = "rank", []
+        where = f"{SQLITE_TABLE} MATCH %s AND rank MATCH 'bm25(10.0, 1.0)'"
+        order, best = "ASC", "MIN"
+    else:
+        table, key = POSTGRES_TABLE, "id"
+        match = " & ".join(f"{t}:*" for t in terms)
+        rank, rank_params = "ts_rank(document, to_tsquery('english', %s))", [match]
+        where = "document @@ to_tsquery('english', %s)"
+        order, best = "DESC", "MAX"
+
+    if kind is not None:
+        where += f" AND {key} %% 2 = {int(kind)}"
+
+    if group_by_quiz:
+        sql = (
+            f"SELECT quiz_id, {best}(r) AS best_r FROM ("
+            f"SELECT quiz_id, {rank} AS r FROM {table} WHERE {where}"
+            f") matches {within}GROUP BY quiz_id ORDER BY best_r {order} LIMIT %s"
+        )
+    else:
+        sql = (
+            f"SELECT {key} / 2, {rank} AS r FROM {table} "
+            f"WHERE {where} ORDER BY r {order} LIMIT %s"
+        )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, rank_params + [match, *within_params, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_quiz_ids(query, limit=50, quizzes=None):
+    """
+    Quiz ids ranked by their best matching document
+    (title / description / topics or any of their questions),
+    limited to `quizzes` (a Quiz queryset) when given
+    """
+    return _match(None, query, limit, group_by_quiz=True, quizzes=quizzes)
+
+
+def search_question_ids(query, limit=1000):
+    return _match(QUESTION, query, limit, group_by_quiz=False)
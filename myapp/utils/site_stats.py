@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from myapp.models import SiteCounter, Quiz, Attempt
+
+
+PUBLISHED_QUIZZES = "published_quizzes"
+ACTIVE_USERS = "active_users"
+TOTAL_ATTEMPTS = "total_attempts"
+
+COUNTER_NAMES = (PUBLISHED_QUIZZES, ACTIVE_USERS, TOTAL_ATTEMPTS)
+
+STATS_CACHE_KEY = "site_stats"
+STATS_TIMEOUT = 60
+
+
+# ------------------------------------------------
+# WRITES
+# ------------------------------------------------
+def increment(name, delta=1):
+    """
+    Adds to a counter after the surrounding transaction commits, so the
+    counter row is locked only for one short UPDATE
+    """
+    def apply():
+        updated = SiteCounter.objects.filter(name=name).update(
+            value=F("value") + delta
+        )
+        if not updated:
+            SiteCounter.objects.get_or_create(name=name)
+            SiteCounter.objects.filter(name=name).update(value=F("value") + delta)
+
+    transaction.on_commit(apply)
+
+
+def set_counter(name, value):
+    SiteCounter.objects.update_or_create(name=name, defaults={"value": value})
+    cache.delete(STATS_CACHE_KEY)
+
+
+def refresh_published_quizzes():
+    set_counter(PUBLISHED_QUIZZES, Quiz.objects.filter(is_published=True).count())
+
+
+def refresh_all():
+    """
+    Recomputes every counter from the source tables (periodic job)
+    """
+    completed = Attempt.objects.filter(completed_at__isnull=False)
+
+    refresh_published_quizzes()
+    set_counter(ACTIVE_USERS, completed.values("user_id").distinct().count())
+    set_counter(TOTAL_ATTEMPTS, completed.count())
+
+
+# ------------------------------------------------
+# READS
+# ------------------------------------------------
+def get_site_stats():
+    """
+    {counter name: value}, cached briefly; one small query on a miss
+    """
+    stats = cache.get(STATS_CACHE_KEY)
+
+    if stats is None:
+        stats = dict.fromkeys(COUNTER_NAMES, 0)
+        stats.update(
+            SiteCounter.objects
+            .filter(name__in=COUNTER_NAMES)
+            .values_list("name", "value")
+        )
+        cache.set(STATS_CACHE_KEY, stats, timeout=STATS_TIMEOUT)
+
+    return stats
@@ -0,0 +1,113 @@
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+
+from myapp.models import Attempt, UserStats
+
+
+STAT_FIELDS = ("total_attempts", "total_score", "best_score", "last_attempt_at")
+
+
+# ------------------------------------------------
+# INCREMENTAL UPDATE (ATTEMPT COMPLETED)
+# ------------------------------------------------
+@transaction.atomic
+def record_attempt(attempt):
+    """
+    Applies one completed attempt to the user's stats row.
+    Returns True when the row was created (user's first attempt).
+    """
+    stats, created = UserStats.objects.select_for_update().get_or_create(
+        user_id=attempt.user_id
+    )
+
+    if stats.total_attempts == 0 or attempt.score > stats.best_score:
+        stats.best_score = attempt.score
+
+    stats.total_attempts += 1
+    stats.total_score += attempt.score
+    stats.last_attempt_at = attempt.completed_at
+    stats.save()
+
+    return created
+
+
+# ------------------------------------------------
+# RECOMPUTE FROM ATTEMPTS
+# ------------------------------------------------
+def aggregate_stats(user_ids=None):
+    """
+    Recomputes stats from Attempt: {user_id: {field: value}}
+    """
+    attempts = Attempt.objects.filter(completed_at__isnull=False)
+
+    if user_ids is not None:
+        attempts = attempts.filter(user_id__in=user_ids)
+
+    rows = (
+        attempts
+        .values("user_id")
+        .annotate(
+            total_attempts=Count("id"),
+            total_score=Sum("score"),
+            best_score=Max("score"),
+            last_attempt_at=Max("completed_at"),
+        )
+        .order_by()
+    )
+
+    return {row.pop("user_id"): row for row in rows.iterator()}
+
+
+def backfill(batch_size=1000):
+    """
+    Upserts every user's stats row from Attempt. Returns rows written.
+    """
+    objs = [
+        UserStats(user_id=user_id, **values)
+        for user_id, values in aggregate_stats().items()
+    ]
+
+    UserStats.objects.bulk_create(
+        objs,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=list(STAT_FIELDS),
+    )
+
+    return len(objs)
+
+
+def find_mismatches(tolerance=1e-6):
+    """
+    Compares stored rows with fresh aggregates.
+    Returns a list of (user_id, field, stored, expected).
+    """
+    expected = aggregate_stats()
+    stored = {
+        row.pop("user_id"): row
+        for row in UserStats.objects.values("user_id", *STAT_FIELDS).iterator()
+    }
+
+    mismatches = []
+
+    for user_id in expected.keys() | stored.keys():
+        want = expected.get(user_id)
+        have = stored.get(user_id)
+
+        if want is None:
+            if have["total_attempts"]:
+                mismatches.append((user_id, "total_attempts", have["total_attempts"], 0))
+            continue
+
+        for field in STAT_FIELDS:
+            got = have[field] if have else None
+            value = want[field]
+
+            if isinstance(value, float) and got is not None:
+                if abs(got - value) > tolerance:
+                    mismatches.append((user_id, field, got, value))
+            elif got != value:
+                mismatches.append((user_id, field, got, value))
+
+    return mismatches
@@ -1,34 +1,77 @@
-import random
+import csv
+import json
+from itertools import chain
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from django.contrib.auth import login
 from django.utils import timezone
-from django.db.models import Count
 from django.urls import reverse
+from django.core.paginator import Paginator
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
 
-from .models import Quiz, Question, Choice, Attempt, Answer, Category
+from .models import Quiz, Attempt, AttemptDraft, UserStats
 from .forms import SignUpForm, EmailLoginForm
-
-from django.db.models import Avg, Max
+from .utils.answer_key import get_answer_key
+from .utils import leaderboard as leaderboard_utils
+from .utils import site_stats, catalogue, search
+from .utils.cache_versions import get_version
+from .utils.metrics import render_prometheus
+from .utils.page_cache import cache_anonymous_page
+from .utils.results import render_result_answers
+from .utils.grading import (
+    selections_from_post,
+    grade_submission,
+    complete_attempt,
+)
+from .utils.attempts import (
+    start_attempt,
+    get_active_attempt,
+    is_submission_late,
+    load_attempt_questions,
+    history_page,
+    iter_history_rows,
+    parse_draft_updates,
+    save_draft,
+    draft_selections,
+    fetch_questions,
+    QUESTIONS_PER_ATTEMPT,
+)
+from .utils import adaptive
 
 from .forms import ProfileUpdateForm
 from django.contrib import messages
 
+QUIZ_PAGE_SIZE = 12
+SEARCH_RESULTS_LIMIT = 48
+LEADERBOARD_PAGE_SIZE = 25
+SCORES_PAGE_SIZE = 25
+
+# Whole-page cache lifetimes for anonymous visitors (utils.page_cache).
+# Catalogue pages are also dropped as soon as a quiz / category changes;
+# the home page timeout bounds how stale its site counters get.
+INDEX_CACHE_TIMEOUT = 60
+CATALOGUE_CACHE_TIMEOUT = 60 * 10
+STATIC_PAGE_CACHE_TIMEOUT = 60 * 60
+
 # =========================
 # HOME PAGE
 # =========================
 
+@cache_anonymous_page(INDEX_CACHE_TIMEOUT, versions=("catalogue",))
 def index(request):
+    # Evaluated only when the cached fragment in index.html has expired
     latest_quizzes = Quiz.objects.filter(is_published=True).order_by("-created_at")[:6]
-    total_quizzes = Quiz.objects.filter(is_published=True).count()
-    total_users = Attempt.objects.values("user").distinct().count()
-    total_attempts = Attempt.objects.count()
+    stats = site_stats.get_site_stats()
 
     return render(request, "myapp/index.html", {
         "latest_quizzes": latest_quizzes,
-        "total_quizzes": total_quizzes,
-        "total_users": total_users,
-        "total_attempts": total_attempts,
+        "catalogue_version": get_version("catalogue"),
+        "total_quizzes": stats[site_stats.PUBLISHED_QUIZZES],
+        "total_users": stats[site_stats.ACTIVE_USERS],
+        "total_attempts": stats[site_stats.TOTAL_ATTEMPTS],
     })
 
 
@@ -36,126 +79,253 @@ def index(request):
 # QUIZ LIST
 # =========================
 
+@cache_anonymous_page(CATALOGUE_CACHE_TIMEOUT, versions=("catalogue",))
 def quiz_list(request):
+    query = request.GET.get("q", "").strip()
+    category_slug = request.GET.get("category", "").strip()
+
     quizzes = Quiz.objects.filter(is_published=True)
 
-    categories = (
-        Category.objects
-        .annotate(question_count=Count("quizzes__questions"))
-        .filter(question_count__gte=1)
-        .order_by("name")
+    categories = catalogue.category_question_counts()
+    active_category = next(
+        (c for c in categories if c["slug"] == category_slug), None
     )
 
+    if active_category:
+        quizzes = quizzes.filter(category_id=active_category["id"])
+    elif category_slug:
+        quizzes = quizzes.none()
+
+    if query:
+        categories = [c for c in categories if query.lower() in c["name"].lower()]
+
+    if query and search.is_available():
+        # Ranked full-text results (one page, best match first)
+        # Published / category filters run inside the search, before its limit
+        ranked_ids = search.search_quiz_ids(
+            query, limit=SEARCH_RESULTS_LIMIT, quizzes=quizzes
+        )
+        by_id = quizzes.in_bulk(ranked_ids)
+        quizzes = [by_id[qid] for qid in ranked_ids if qid in by_id]
+        next_cursor = None
+    else:
+        if query:
+            quizzes = quizzes.filter(title__icontains=query)
+
+        quizzes, next_cursor = catalogue.keyset_page(
+            quizzes, request.GET.get("after"), QUIZ_PAGE_SIZE
+        )
+
     return render(request, "myapp/quiz_list.html", {
         "quizzes": quizzes,
         "categories": categories,
+        "query": query,
+        "active_category": active_category,
+        "next_cursor": next_cursor,
     })
+
+
 # =========================
 # QUIZ DETAIL
 # =========================
 
+@cache_anonymous_page(CATALOGUE_CACHE_TIMEOUT, versions=("quiz:{pk}",))
 def quiz_detail(request, pk):
-    quiz = get_object_or_404(Quiz, pk=pk, is_published=True)
-    return render(request, "myapp/quiz_detail.html", {"quiz": quiz})
+    # Summary row joined in: no aggregates over Attempt / Question here
+    quiz = get_object_or_404(
+        Quiz.objects.select_related("stats"), pk=pk, is_published=True
+    )
+    return render(request, "myapp/quiz_detail.html", {
+        "quiz": quiz,
+        "stats": getattr(quiz, "stats", None),
+    })
 
 
 # =========================
-# TAKE QUIZ (MULTI-CORRECT + SAFE)
+# TAKE QUIZ (START / SUBMIT)
 # =========================
 
 @login_required
 def take_quiz(request, pk):
     quiz = get_object_or_404(Quiz, pk=pk, is_published=True)
 
-    questions = list(
-        quiz.questions.prefetch_related("choices")
-    )
+    attempt = get_active_attempt(request.user, quiz)
 
-    selected_questions = random.sample(questions, min(20, len(questions)))
+    if attempt is None and quiz.selection_mode == "adaptive":
+        attempt, questions = adaptive.start_adaptive_attempt(request.user, quiz)
+        return _render_adaptive(request, quiz, attempt, questions)
 
-    # Attach correct_count (used in template)
-    for q in selected_questions:
-        q.correct_count = q.choices.filter(is_correct=True).count()
+    if attempt is not None and attempt.adaptive_level is not None:
+        return _render_adaptive(request, quiz, attempt, fetch_questions(attempt.question_ids[-1:]))
 
-    if request.method == "POST":
-        attempt = Attempt.objects.create(
-            user=request.user,
-            quiz=quiz,
-            started_at=timezone.now(),
-            total_marks=sum(q.marks for q in selected_questions),
-        )
+    saved_choice_ids = set()
 
-        score = 0
-
-        for q in selected_questions:
-            selected_ids = request.POST.getlist(f"question_{q.id}")
-            selected_ids = set(map(int, selected_ids)) if selected_ids else set()
-
-            correct_ids = set(
-                q.choices.filter(is_correct=True).values_list("id", flat=True)
-            )
-
-            # ❌ Unanswered
-            if not selected_ids:
-                is_correct = False
-                marks_awarded = 0
-
-            # ❌ Any wrong option selected
-            elif not selected_ids.issubset(correct_ids):
-                is_correct = False
-                marks_awarded = 0
-
-            # ✅ All correct selected
-            elif selected_ids == correct_ids:
-                is_correct = True
-                marks_awarded = q.marks
-
-            # 🟡 Partial correct (multi-correct only)
-            else:
-                is_correct = False
-                marks_awarded = round(
-                    q.marks * (len(selected_ids) / len(correct_ids)), 2
-                )
-
-            Answer.objects.create(
-                attempt=attempt,
-                question=q,
-                is_correct=is_correct,
-                marks_awarded=marks_awarded,
-            )
-
-            score += marks_awarded
-
-        attempt.score = score
-        attempt.completed_at = timezone.now()
-        attempt.save()
-
-        return redirect(
-            "myapp:result",
-            pk=quiz.id,
-            attempt_id=attempt.id,
-        )
+    if attempt is None:
+        attempt, questions = start_attempt(request.user, quiz)
+    else:
+        questions = load_attempt_questions(attempt)
+        # Resuming: restore what autosave already stored
+        saved_choice_ids = set().union(*draft_selections(attempt).values())
+
+    # Attach correct_count (used in template) from the prefetched choices
+    for q in questions:
+        q.correct_count = sum(1 for c in q.choices.all() if c.is_correct)
+
+    seconds_left = max(0, int((attempt.deadline - timezone.now()).total_seconds()))
 
     return render(request, "myapp/take_quiz.html", {
         "quiz": quiz,
-        "questions": selected_questions,
+        "attempt": attempt,
+        "questions": questions,
+        "seconds_left": seconds_left,
+        "saved_choice_ids": saved_choice_ids,
+    })
+
+
+def _render_adaptive(request, quiz, attempt, questions):
+    # Only the current question: one question fetch with its choices
+    question = questions[0] if questions else None
+    if question is not None:
+        question.correct_count = sum(1 for c in question.choices.all() if c.is_correct)
+
+    seconds_left = max(0, int((attempt.deadline - timezone.now()).total_seconds()))
+
+    return render(request, "myapp/take_quiz_adaptive.html", {
+        "quiz": quiz,
+        "attempt": attempt,
+        "question": question,
+        "number": len(attempt.question_ids),
+        "total": QUESTIONS_PER_ATTEMPT,
+        "seconds_left": seconds_left,
+    })
+
+
+@login_required
+@require_POST
+def answer_question(request, pk, attempt_id):
+    """
+    Adaptive quizzes: records the current question's answer, then shows the
+    next question or, after the last one, the result
+    """
+    attempt = get_object_or_404(
+        Attempt.objects.select_related("quiz"),
+        id=attempt_id,
+        user=request.user,
+        quiz_id=pk,
+        adaptive_level__isnull=False,
+    )
+
+    if attempt.completed_at is not None:
+        return redirect("myapp:result", pk=pk, attempt_id=attempt.id)
+
+    if is_submission_late(attempt):
+        messages.warning(
+            request,
+            "Time limit exceeded. Only answers given before the deadline were counted.",
+        )
+        finished = True
+    else:
+        question_id = request.POST.get("question_id", "")
+        question_id = int(question_id) if question_id.isdigit() else None
+        selected = selections_from_post(request.POST, [question_id]).get(question_id, set())
+        finished = adaptive.answer_question(attempt, question_id, selected)
+
+    if not finished:
+        return redirect("myapp:take_quiz", pk=pk)
+
+    adaptive.finish_attempt(attempt)
+
+    return redirect("myapp:result", pk=pk, attempt_id=attempt.id)
+
+
+@login_required
+@require_POST
+def submit_quiz(request, pk, attempt_id):
+    attempt = get_object_or_404(
+        Attempt.objects.select_related("quiz"),
+        id=attempt_id,
+        user=request.user,
+        quiz_id=pk,
+        # Adaptive attempts go through answer_question, one question at a time
+        adaptive_level__isnull=True,
+    )
+
+    if attempt.completed_at is not None:
+        return redirect("myapp:result", pk=pk, attempt_id=attempt.id)
+
+    answer_key = get_answer_key(attempt.quiz_id)
+    question_ids = [qid for qid in attempt.question_ids if qid in answer_key]
+
+    # Answers arriving after the time limit are not counted. Autosave
+    # stops at the same cutoff, so the draft only holds in-time answers.
+    if is_submission_late(attempt):
+        selections = draft_selections(attempt)
+        messages.warning(
+            request,
+            "Time limit exceeded. Only answers saved before the deadline were counted.",
+        )
+    elif request.POST.get("from_draft"):
+        # quiz_autosave.js flushed everything first; the POST carries no answers
+        selections = draft_selections(attempt)
+    else:
+        selections = selections_from_post(request.POST, question_ids)
+
+    results, score = grade_submission(answer_key, question_ids, selections)
+
+    if complete_attempt(attempt, results, score):
+        AttemptDraft.objects.filter(attempt=attempt).delete()
+
+    return redirect(
+        "myapp:result",
+        pk=pk,
+        attempt_id=attempt.id,
+    )
+
+
+@login_required
+@require_POST
+def autosave_attempt(request, pk, attempt_id):
+    """
+    JSON: {"answers": {"<question_id>": [choice_id, ...]}} with only the
+    questions changed since the last save
+    """
+    attempt = get_object_or_404(
+        Attempt.objects.select_related("quiz"),
+        id=attempt_id,
+        user=request.user,
+        quiz_id=pk,
+        adaptive_level__isnull=True,
+    )
+
+    if attempt.completed_at is not None or is_submission_late(attempt):
+        return JsonResponse({"error": "This attempt is closed."}, status=409)
+
+    try:
+        updates = parse_draft_updates(json.loads(request.body), attempt.question_ids)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    draft = save_draft(attempt, updates)
+
+    return JsonResponse({
+        "saved": len(updates),
+        "answered": sum(1 for choice_ids in draft.selections.values() if choice_ids),
+        "saves": draft.saves,
     })
 
 
 @login_required
 def result(request, pk, attempt_id):
     attempt = get_object_or_404(
-        Attempt,
+        Attempt.objects.select_related("quiz"),
         id=attempt_id,
         user=request.user,
         quiz_id=pk
     )
 
-    answers = attempt.answers.select_related("question")
-
     return render(request, "myapp/result.html", {
         "attempt": attempt,
-        "answers": answers,
+        "answers_html": render_result_answers(attempt),
     })
 
 
@@ -163,7 +333,26 @@ def result(request, pk, attempt_id):
 # LEADERBOARD
 # =========================
 
+def leaderboard(request, pk=None):
+    quiz = get_object_or_404(Quiz, pk=pk, is_published=True) if pk else None
+    quiz_id = quiz.id if quiz else None
 
+    page_obj = Paginator(
+        leaderboard_utils.ranked(quiz_id).select_related("user"),
+        LEADERBOARD_PAGE_SIZE,
+    ).get_page(request.GET.get("page"))
+
+    my_rank, my_entry = (None, None)
+    if request.user.is_authenticated:
+        my_rank, my_entry = leaderboard_utils.get_rank(request.user, quiz_id)
+
+    return render(request, "myapp/leaderboard.html", {
+        "quiz": quiz,
+        "top": leaderboard_utils.get_top(quiz_id),
+        "page_obj": page_obj,
+        "my_rank": my_rank,
+        "my_entry": my_entry,
+    })
 
 
 # =========================
@@ -207,17 +396,17 @@ def signup(request):
 # STATIC PAGES
 # =========================
 
+@cache_anonymous_page(STATIC_PAGE_CACHE_TIMEOUT)
 def about(request):
     return render(request, "myapp/about.html")
 
 
+@cache_anonymous_page(STATIC_PAGE_CACHE_TIMEOUT)
 def contact(request):
     return render(request, "myapp/contact.html")
 
 @login_required
 def profile(request):
-    attempts = Attempt.objects.filter(user=request.user, completed_at__isnull=False)
-
     if request.method == "POST":
         form = ProfileUpdateForm(request.POST, instance=request.user)
         if form.is_valid():
@@ -227,12 +416,22 @@ def profile(request):
     else:
         form = ProfileUpdateForm(instance=request.user)
 
+    # Denormalised totals: one row instead of aggregating every attempt
+    stats = UserStats.objects.filter(user=request.user).first() or UserStats()
+
+    recent_attempts = (
+        Attempt.objects
+        .filter(user=request.user, completed_at__isnull=False)
+        .select_related("quiz")
+        .order_by("-completed_at")[:5]
+    )
+
     context = {
         "form": form,
-        "total_attempts": attempts.count(),
-        "avg_score": attempts.aggregate(avg=Avg("score"))["avg"] or 0,
-        "best_score": attempts.aggregate(max=Max("score"))["max"] or 0,
-        "recent_attempts": attempts.order_by("-completed_at")[:5],
+        "total_attempts": stats.total_attempts,
+        "avg_score": stats.avg_score,
+        "best_score": stats.best_score,
+        "recent_attempts": recent_attempts,
     }
 
     return render(request, "myapp/profile.html", context)
@@ -240,7 +439,50 @@ def profile(request):
 
 @login_required
 def my_scores(request):
-    attempts = Attempt.objects.filter(user=request.user).order_by("-completed_at")
+    after = request.GET.get("after")
+    attempts, next_cursor = history_page(request.user, after, SCORES_PAGE_SIZE)
+
     return render(request, "myapp/my_scores.html", {
         "attempts": attempts,
-    })
\ No newline at end of file
+        "next_cursor": next_cursor,
+        "is_first_page": not after,
+    })
+
+
+class _Echo:
+    """
+    File-like object whose write() hands the CSV line straight back
+    """
+
+    def write(self, value):
+        return value
+
+
+@login_required
+def my_scores_export(request):
+    writer = csv.writer(_Echo())
+    header = ["Quiz", "Score", "Total marks", "Started", "Completed"]
+
+    rows = (
+        [title, score, total, started.isoformat(), completed.isoformat()]
+        for title, score, total, started, completed in iter_history_rows(request.user)
+    )
+
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in chain([header], rows)),
+        content_type="text/csv",
+    )
+    response["Content-Disposition"] = 'attachment; filename="my-scores.csv"'
+    return response
+
+# =========================
+# METRICS (PROMETHEUS)
+# =========================
+
+@staff_member_required
+def metrics(request):
+    # Histograms live in this worker's memory; scrape every worker
+    return HttpResponse(
+        render_prometheus(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myapp.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -50,6 +51,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Request metrics (myapp.middleware.RequestMetricsMiddleware)
+# Requests slower than this are logged to "myapp.requests"; None disables it
+REQUEST_METRICS_SLOW_MS = 500
+# Most repeated SQL statements included in a slow-request log entry
+REQUEST_METRICS_TOP_SQL = 5
+REQUEST_METRICS_SERVER_TIMING = True
+
+# Serve the async variants in myapp.async_views (set by asgi.py)
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
+
 ROOT_URLCONF = 'myproject09.urls'
 
 TEMPLATES = [
@@ -82,6 +93,45 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Version stamps and cached pages must be shared by every worker
+# process, so the default is the file backend rather than per-process
+# LocMemCache. DJANGO_CACHE_BACKEND=redis / memcached need the redis /
+# pymemcache packages and a server at DJANGO_CACHE_LOCATION.
+
+_CACHE_BACKENDS = {
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    },
+    'memcached': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': '127.0.0.1:11211',
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'myapp',
+    },
+}
+
+CACHES = {
+    'default': {
+        **_CACHE_BACKENDS[os.environ.get('DJANGO_CACHE_BACKEND', 'file')],
+        'KEY_PREFIX': 'myapp',
+        'TIMEOUT': 600,
+    }
+}
+
+if os.environ.get('DJANGO_CACHE_LOCATION'):
+    CACHES['default']['LOCATION'] = os.environ['DJANGO_CACHE_LOCATION']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -122,6 +172,10 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Uploaded files (Excel import jobs)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 
 
 # Default primary key field type
@@ -0,0 +1,215 @@
+document.addEventListener("DOMContentLoaded", function () {
+    const root = document.getElementById("question-editor");
+    if (!root || !window.fetch) return;
+
+    const csrfToken = root.querySelector("[name=csrfmiddlewaretoken]").value;
+    const form = document.getElementById("question-form");
+    const rows = document.getElementById("question-rows");
+    const choiceRows = document.getElementById("choice-rows");
+    const errors = document.getElementById("question-errors");
+    const loadMore = document.getElementById("load-more");
+    const statusEl = document.getElementById("editor-status");
+    const countEl = document.getElementById("question-count");
+
+    const NEW_QUESTION_CHOICES = 4;
+
+    // Questions loaded so far, by id
+    const questions = new Map();
+    let nextAfter = null;
+    let editing = null;
+
+    function setStatus(text) {
+        statusEl.textContent = text;
+    }
+
+    function post(url, body) {
+        return fetch(url, {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json",
+                "X-CSRFToken": csrfToken,
+            },
+            body: JSON.stringify(body),
+            credentials: "same-origin",
+        }).then((response) => response.json().then((data) => ({ ok: response.ok, data: data })));
+    }
+
+    // ---------- LIST ----------
+    function cell(row, text) {
+        const td = row.insertCell();
+        td.textContent = text;
+        return td;
+    }
+
+    function renderRow(question, row) {
+        row = row || rows.insertRow();
+        row.innerHTML = "";
+        row.dataset.id = question.id;
+
+        cell(row, question.text.length > 120 ? question.text.slice(0, 120) + "…" : question.text);
+        cell(row, question.marks);
+        cell(row, question.difficulty);
+        cell(row, question.choices.length);
+
+        const actions = row.insertCell();
+        actions.innerHTML =
+            '<button type="button" class="button" data-action="edit">Edit</button> ' +
+            '<button type="button" class="button" data-action="delete">Delete</button>';
+        return row;
+    }
+
+    function loadPage() {
+        const url = new URL(root.dataset.pageUrl, window.location.href);
+        if (nextAfter !== null) url.searchParams.set("after", nextAfter);
+
+        loadMore.disabled = true;
+        setStatus("Loading…");
+
+        return fetch(url, { credentials: "same-origin" })
+            .then((response) => response.json())
+            .then((data) => {
+                data.questions.forEach((question) => {
+                    questions.set(question.id, question);
+                    renderRow(question);
+                });
+                nextAfter = data.next_after;
+                loadMore.hidden = nextAfter === null;
+                setStatus(`${questions.size} loaded`);
+            })
+            .catch(() => setStatus("Could not load questions"))
+            .finally(() => {
+                loadMore.disabled = false;
+            });
+    }
+
+    // ---------- FORM ----------
+    function addChoiceRow(choice) {
+        const row = choiceRows.insertRow();
+        row.dataset.id = choice.id === null ? "" : choice.id;
+        row.innerHTML =
+            '<td><input type="text" class="vTextField" maxlength="300" required></td>' +
+            '<td><input type="checkbox"></td>' +
+            '<td><button type="button" class="button" data-action="remove-choice">Remove</button></td>';
+        row.querySelector("input[type=text]").value = choice.text;
+        row.querySelector("input[type=checkbox]").checked = choice.is_correct;
+    }
+
+    function openForm(question) {
+        editing = question;
+        errors.innerHTML = "";
+        document.getElementById("question-form-title").textContent =
+            question.id === null ? "New question" : "Edit question";
+        form.elements.text.value = question.text;
+        form.elements.marks.value = question.marks;
+        form.elements.difficulty.value = question.difficulty;
+
+        choiceRows.innerHTML = "";
+        question.choices.forEach(addChoiceRow);
+
+        form.hidden = false;
+        form.scrollIntoView({ behavior: "smooth" });
+    }
+
+    function closeForm() {
+        editing = null;
+        form.hidden = true;
+    }
+
+    function showErrors(fieldErrors) {
+        errors.innerHTML = "";
+        Object.entries(fieldErrors).forEach(([field, messages]) => {
+            messages.forEach((message) => {
+                const li = document.createElement("li");
+                li.textContent = field === "__all__" ? message : `${field}: ${message}`;
+                errors.appendChild(li);
+            });
+        });
+    }
+
+    function formData() {
+        return {
+            id: editing.id,
+            text: form.elements.text.value,
+            marks: form.elements.marks.value,
+            difficulty: form.elements.difficulty.value,
+            choices: Array.from(choiceRows.rows).map((row) => ({
+                id: row.dataset.id ? parseInt(row.dataset.id) : null,
+                text: row.querySelector("input[type=text]").value,
+                is_correct: row.querySelector("input[type=checkbox]").checked,
+            })),
+        };
+    }
+
+    form.addEventListener("submit", function (event) {
+        event.preventDefault();
+        const isNew = editing.id === null;
+
+        post(root.dataset.saveUrl, formData()).then(({ ok, data }) => {
+            if (!ok) {
+                showErrors(data.errors || { __all__: ["Save failed"] });
+                return;
+            }
+
+            const question = data.question;
+            const existing = rows.querySelector(`tr[data-id="${question.id}"]`);
+            questions.set(question.id, question);
+            renderRow(question, existing);
+
+            if (isNew) countEl.textContent = parseInt(countEl.textContent) + 1;
+            setStatus("Saved");
+            closeForm();
+        });
+    });
+
+    document.getElementById("add-question").addEventListener("click", function () {
+        openForm({
+            id: null,
+            text: "",
+            marks: 1,
+            difficulty: "easy",
+            choices: Array.from({ length: NEW_QUESTION_CHOICES }, () => ({
+                id: null, text: "", is_correct: false,
+            })),
+        });
+    });
+
+    document.getElementById("add-choice").addEventListener("click", function () {
+        addChoiceRow({ id: null, text: "", is_correct: false });
+    });
+
+    document.getElementById("cancel-edit").addEventListener("click", closeForm);
+
+    choiceRows.addEventListener("click", function (event) {
+        if (event.target.dataset.action === "remove-choice") {
+            event.target.closest("tr").remove();
+        }
+    });
+
+    rows.addEventListener("click", function (event) {
+        const action = event.target.dataset.action;
+        if (!action) return;
+
+        const row = event.target.closest("tr");
+        const question = questions.get(parseInt(row.dataset.id));
+
+        if (action === "edit") {
+            openForm(question);
+        } else if (action === "delete" && window.confirm("Delete this question and its choices?")) {
+            const url = root.dataset.deleteUrl.replace(/\/0\/delete\/$/, `/${question.id}/delete/`);
+            post(url, {}).then(({ ok }) => {
+                if (!ok) {
+                    setStatus("Delete failed");
+                    return;
+                }
+                questions.delete(question.id);
+                row.remove();
+                countEl.textContent = parseInt(countEl.textContent) - 1;
+                if (editing && editing.id === question.id) closeForm();
+                setStatus("Deleted");
+            });
+        }
+    });
+
+    loadMore.addEventListener("click", loadPage);
+    loadPage();
+});
@@ -0,0 +1,98 @@
+document.addEventListener("DOMContentLoaded", function () {
+    const form = document.getElementById("quizForm");
+    const statusEl = document.getElementById("autosaveStatus");
+
+    if (!form || !form.dataset.autosaveUrl || !window.fetch) return;
+
+    const csrfToken = form.querySelector("[name=csrfmiddlewaretoken]").value;
+    const SAVE_DELAY = 2000;
+    // Spread periodic saves so a whole class does not hit the server together
+    const SAVE_INTERVAL = 15000 + Math.floor(Math.random() * 5000);
+
+    const dirty = new Set();
+    let saveTimer = null;
+    let inFlight = null;
+    let closed = false;
+
+    function questionInputs() {
+        return form.querySelectorAll("input[name^='question_']");
+    }
+
+    function setStatus(text) {
+        if (statusEl) statusEl.textContent = text;
+    }
+
+    function selectedChoices(questionId) {
+        return Array.from(
+            form.querySelectorAll(`input[name='question_${questionId}']:checked`)
+        ).map((input) => parseInt(input.value));
+    }
+
+    // Sends only the questions changed since the last successful save
+    function flush() {
+        if (inFlight) return inFlight.then(flush);
+        if (closed) return Promise.resolve(false);
+        if (dirty.size === 0) return Promise.resolve(true);
+
+        const answers = {};
+        dirty.forEach((questionId) => {
+            answers[questionId] = selectedChoices(questionId);
+        });
+        dirty.clear();
+
+        inFlight = fetch(form.dataset.autosaveUrl, {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/json",
+                "X-CSRFToken": csrfToken,
+            },
+            body: JSON.stringify({ answers: answers }),
+            credentials: "same-origin",
+        })
+            .then((response) => {
+                if (response.status === 409) closed = true;
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                setStatus("All answers saved");
+                return true;
+            })
+            .catch(() => {
+                Object.keys(answers).forEach((questionId) => dirty.add(questionId));
+                setStatus("Answers not saved yet; they will be sent with your submission");
+                return false;
+            })
+            .finally(() => {
+                inFlight = null;
+            });
+
+        return inFlight;
+    }
+
+    form.addEventListener("change", function (event) {
+        const match = /^question_(\d+)$/.exec(event.target.name || "");
+        if (!match) return;
+
+        dirty.add(match[1]);
+        setStatus("Saving…");
+        clearTimeout(saveTimer);
+        saveTimer = setTimeout(flush, SAVE_DELAY);
+    });
+
+    setInterval(flush, SAVE_INTERVAL);
+
+    // Final submit: if the draft is complete, post only the marker so the
+    // server grades from the draft; otherwise fall back to the full form.
+    form.addEventListener("submit", function (event) {
+        event.preventDefault();
+        clearTimeout(saveTimer);
+
+        flush().then((saved) => {
+            if (saved && dirty.size === 0) {
+                form.elements["from_draft"].value = "1";
+                questionInputs().forEach((input) => {
+                    input.disabled = true;
+                });
+            }
+            form.submit();
+        });
+    });
+});
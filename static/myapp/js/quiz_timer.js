@@ -4,7 +4,7 @@ document.addEventListener("DOMContentLoaded", function () {
 
     if (!timerEl || !form) return;
 
-    let timeLeft = parseInt(timerEl.dataset.minutes) * 60;
+    let timeLeft = parseInt(timerEl.dataset.seconds);
 
     function update() {
         const m = Math.floor(timeLeft / 60);
@@ -21,7 +21,12 @@ document.addEventListener("DOMContentLoaded", function () {
         if (timeLeft <= 0) {
             clearInterval(interval);
             alert("⏰ Time up! Submitting quiz.");
-            form.submit();
+            // requestSubmit() fires the submit event so autosave can flush first
+            if (form.requestSubmit) {
+                form.requestSubmit();
+            } else {
+                form.submit();
+            }
         }
     }, 1000);
 });